@@ -1,10 +1,84 @@
-from typing import Dict
+from typing import Dict, Optional
 from financial_news_intel.core.models import FinancialNewsState, RawArticle, ConsolidatedStory, ExtractedEntity
-from financial_news_intel.core.embedding_model import get_embeddings
+from financial_news_intel.core.embedding_model import get_embeddings, embedding_input
 from financial_news_intel.core.vector_db import vector_db_client
 from financial_news_intel.core.config import DEDUPLICATION_SIMILARITY_THRESHOLD
+from financial_news_intel.core.timestamps import to_utc_iso
+from financial_news_intel.core.story_ledger import story_ledger, DEDUPED
 import uuid
 
+def deduplicate_article(article: RawArticle) -> Optional[ConsolidatedStory]:
+    """
+    Checks one raw article against the Vector DB: a new ConsolidatedStory (whose vector is
+    indexed at once) if it is unique, None if it duplicates an indexed story.
+    Callers must not run it concurrently, or two copies of a story can both pass the check.
+    """
+    # A. Generate Embedding for the article content
+    # We'll use the title and content for a slightly richer embedding vector
+    text_to_embed = embedding_input(article.title, article.content)
+    article_embedding = get_embeddings([text_to_embed])[0]
+    
+    # B. Check Vector DB for duplicates
+    similar_results = vector_db_client.check_for_duplicates(
+        query_embedding=article_embedding
+    )
+
+    is_duplicate = False
+    
+    if similar_results:
+        # Check the closest match against the threshold
+        best_match = similar_results[0]
+        
+        if best_match['similarity'] >= DEDUPLICATION_SIMILARITY_THRESHOLD:
+            print(f"  [DUPLICATE] Article {article.id} matches Story ID {best_match['id']} with similarity {best_match['similarity']:.3f}")
+            is_duplicate = True
+            
+            # C. Handle Duplication (Add article to the existing ConsolidatedStory)
+            # This requires retrieving the original story from the existing 'deduplication_groups'
+            # or from the 'current_unique_stories' if it was found in this batch.
+            
+            # For simplicity in this first agent, we will only consolidate articles found
+            # in the *current batch* that map to the *same* representative article in this batch.
+            # A fully robust system would retrieve and update the story from a persistent DB.
+            
+            # However, for a clean LangGraph step, we'll focus on identifying the unique ones
+            # and put the unique story (represented by the first article) into the groups.
+            # Since we don't have a persistent DB for the story itself yet (only the vector ID),
+            # we'll create a new story for every unique article found.
+
+    
+    if not is_duplicate:
+        print(f"  [UNIQUE] Article {article.id} is a new unique story. Adding vector to DB.")
+        
+        # D. If unique, create a new ConsolidatedStory
+        new_story = ConsolidatedStory(
+            # Ensure the story text is the original article's content for the first stage
+            text=article.content, 
+            source_articles=[article],
+            # Initialize entities structure
+            entities=ExtractedEntity(),
+            # Normalized publication time, used for time-range queries on the stored story
+            published_at=to_utc_iso(article.timestamp),
+            # Reused by the local sentiment classifier, so the text is embedded only once
+            embedding=article_embedding,
+        )
+        
+        # Checkpoint before indexing: once its vector is in the DB, a story missing from the
+        # ledger would be lost as a "duplicate" of itself if the worker crashed now
+        story_ledger.record(new_story, DEDUPED)
+
+        # E. Add the new story's vector to the Vector DB
+        # We index the title/snippet, but use the new_story.unique_story_id as the DB ID
+        vector_db_client.add_article_embedding(
+            article_id=new_story.unique_story_id,
+            text=article.title + " " + article.content[:200],
+            embedding=article_embedding
+        )
+        
+        return new_story
+    return None
+
+
 def deduplication_agent(state: FinancialNewsState) -> FinancialNewsState:
     """
     Processes raw articles to identify unique stories, consolidates duplicates,
@@ -17,60 +91,8 @@ def deduplication_agent(state: FinancialNewsState) -> FinancialNewsState:
     
     # 1. Process all raw articles in the batch
     for article in state.raw_articles:
-        # A. Generate Embedding for the article content
-        # We'll use the title and content for a slightly richer embedding vector
-        text_to_embed = article.title + " " + article.content[:500] 
-        article_embedding = get_embeddings([text_to_embed])[0]
-        
-        # B. Check Vector DB for duplicates
-        similar_results = vector_db_client.check_for_duplicates(
-            query_embedding=article_embedding
-        )
-
-        is_duplicate = False
-        
-        if similar_results:
-            # Check the closest match against the threshold
-            best_match = similar_results[0]
-            
-            if best_match['similarity'] >= DEDUPLICATION_SIMILARITY_THRESHOLD:
-                print(f"  [DUPLICATE] Article {article.id} matches Story ID {best_match['id']} with similarity {best_match['similarity']:.3f}")
-                is_duplicate = True
-                
-                # C. Handle Duplication (Add article to the existing ConsolidatedStory)
-                # This requires retrieving the original story from the existing 'deduplication_groups'
-                # or from the 'current_unique_stories' if it was found in this batch.
-                
-                # For simplicity in this first agent, we will only consolidate articles found
-                # in the *current batch* that map to the *same* representative article in this batch.
-                # A fully robust system would retrieve and update the story from a persistent DB.
-                
-                # However, for a clean LangGraph step, we'll focus on identifying the unique ones
-                # and put the unique story (represented by the first article) into the groups.
-                # Since we don't have a persistent DB for the story itself yet (only the vector ID),
-                # we'll create a new story for every unique article found.
-
-        
-        if not is_duplicate:
-            print(f"  [UNIQUE] Article {article.id} is a new unique story. Adding vector to DB.")
-            
-            # D. If unique, create a new ConsolidatedStory
-            new_story = ConsolidatedStory(
-                # Ensure the story text is the original article's content for the first stage
-                text=article.content, 
-                source_articles=[article],
-                # Initialize entities structure
-                entities=ExtractedEntity(),
-            )
-            
-            # E. Add the new story's vector to the Vector DB
-            # We index the title/snippet, but use the new_story.unique_story_id as the DB ID
-            vector_db_client.add_article_embedding(
-                article_id=new_story.unique_story_id,
-                text=article.title + " " + article.content[:200],
-                embedding=article_embedding
-            )
-            
+        new_story = deduplicate_article(article)
+        if new_story is not None:
             current_unique_stories[new_story.unique_story_id] = new_story
 
     # 2. Update the LangGraph State
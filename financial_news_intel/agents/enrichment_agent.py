@@ -0,0 +1,176 @@
+# financial_news_intel/agents/enrichment_agent.py
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Optional, Tuple
+
+from financial_news_intel.core.models import FinancialNewsState, ConsolidatedStory
+from financial_news_intel.core.config import ENRICHMENT_CONCURRENCY, IMPACT_BATCH_SIZE
+from financial_news_intel.core.sentiment_classifier import sentiment_router
+from financial_news_intel.core.llm_guard import llm_guard, llm_retry_queue, LLMUnavailableError
+from financial_news_intel.core.structured_output import structured_output
+from financial_news_intel.core.llm_model import llm_service
+from financial_news_intel.core.story_ledger import story_ledger, ENRICHED
+from financial_news_intel.core.story_priority import story_prioritizer
+from financial_news_intel.agents.entity_agent import entity_extraction_agent
+from financial_news_intel.agents.impact_agent import impact_stock_agent, batched_impact_analysis
+from financial_news_intel.agents.storage_agent import storage_index_agent
+
+
+def enrich_story(story: ConsolidatedStory, analyze_impact: bool = True) -> Tuple[ConsolidatedStory, Optional[str]]:
+    """
+    Runs the Entity Extraction and Impacted Stock agents for one story on a private state,
+    so several stories can be enriched at the same time.
+    analyze_impact=False stops after entity extraction (impacts are then analyzed in batches).
+    Any exception is contained here, so one bad story cannot abort the batch.
+    Returns (story, error_message); error_message is None on success.
+    """
+    story_state = FinancialNewsState(current_story=story, status="PROCESSING")
+    try:
+        story_state = entity_extraction_agent(story_state)
+        if story.market_relevant is False:
+            # NER pre-pass found no ORG/GPE/MONEY entities: no stock impact to analyze
+            print(f"  -> Skipping impact analysis for non-market story {story.unique_story_id[:8]}")
+            story_state.current_story.impacted_stocks = []
+        elif analyze_impact:
+            story_state = impact_stock_agent(story_state)
+    except LLMUnavailableError as e:
+        # The story is already indexed for deduplication, so it is kept for a later batch
+        llm_retry_queue.add(story, str(e))
+        return story, f"Deferred (LLM unavailable): {e}"
+    except Exception as e:
+        print(f"ERROR enriching story {story.unique_story_id[:8]}: {e}")
+        return story, f"Enrichment failed: {e}"
+
+    if story_state.status == "ERROR":
+        return story_state.current_story, story_state.error_message or "Enrichment failed"
+    return story_state.current_story, None
+
+
+def enrich_stories(
+    stories: List[ConsolidatedStory],
+    max_concurrency: int = ENRICHMENT_CONCURRENCY,
+    impact_batch_size: int = IMPACT_BATCH_SIZE,
+) -> List[Tuple[ConsolidatedStory, Optional[str]]]:
+    """
+    Enriches stories with up to max_concurrency LLM pipelines in flight.
+    With impact_batch_size > 1, entities are extracted for all stories first and the impacts
+    of short stories are then analyzed several stories per request.
+    Results are returned in input order once all stories are done (the join before storage).
+    """
+    if not stories:
+        return []
+
+    batch_impacts = impact_batch_size > 1
+    enrich = partial(enrich_story, analyze_impact=not batch_impacts)
+    workers = max(1, min(max_concurrency, len(stories)))
+    if workers == 1:
+        results = [enrich(story) for story in stories]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="enrich") as executor:
+            results = list(executor.map(enrich, stories))
+
+    if not batch_impacts:
+        return results
+
+    ready = [story for story, error in results if error is None and story.market_relevant is not False]
+    impact_errors = batched_impact_analysis(ready, batch_size=impact_batch_size, max_concurrency=max_concurrency)
+    return [
+        (story, error if error is not None else impact_errors.get(story.unique_story_id))
+        for story, error in results
+    ]
+
+
+def record_enriched(story: ConsolidatedStory):
+    """Checkpoints a successfully enriched story (it leaves the LLM retry queue)."""
+    llm_retry_queue.done(story.unique_story_id)
+    story_ledger.record(story, ENRICHED)
+
+
+def record_failure(story_id: str, error: str):
+    """Counts a failed attempt in the story ledger; deferred stories are tracked by the retry queue."""
+    if story_id not in llm_retry_queue:
+        story_ledger.record_error(story_id, error)
+
+
+def concurrent_enrichment_agent(state: FinancialNewsState) -> FinancialNewsState:
+    """
+    Batch node: enriches all unique stories of the batch (up to ENRICHMENT_CONCURRENCY at a
+    time) inside a single graph step, so the graph depth does not grow with the batch size.
+    Successfully enriched stories move to state.enriched_stories for the storage node;
+    failures are recorded in state.story_errors.
+    """
+    # Stories deferred by earlier batches while the LLM backend was down go first
+    retried = llm_retry_queue.drain(llm_guard.breaker)
+    if retried:
+        print(f"  -> Retrying {len(retried)} stories deferred while the LLM backend was unavailable")
+    # Stories a previous run (or a crashed worker) left unfinished resume at their last stage
+    resumed, resumed_enriched = story_ledger.take_unfinished()
+    # Highest priority first (watchlist hits, recency, source), so their LLM calls start first
+    stories = story_prioritizer.order(retried + resumed + list(state.deduplication_groups))
+    print(
+        f"\n--- Running Enrichment for {len(stories)} stories (max {ENRICHMENT_CONCURRENCY} in flight, "
+        f"impact batch size {IMPACT_BATCH_SIZE}) ---"
+    )
+
+    retries_before = structured_output.total("retries")
+    # The resumed enriched stories wait for the whole batch before they are stored
+    with story_ledger.renewing([story.unique_story_id for story in stories + resumed_enriched]):
+        results = enrich_stories(stories)
+    structured_retries = structured_output.total("retries") - retries_before
+
+    state.deduplication_groups = []
+    state.enriched_stories = list(resumed_enriched)
+    for story, error in results:
+        if error is None:
+            record_enriched(story)
+            state.enriched_stories.append(story)
+        else:
+            # A story whose enrichment failed is not stored; the rest of the batch continues
+            print(f"WARNING: Skipping storage of story {story.unique_story_id[:8]}: {error}")
+            record_failure(story.unique_story_id, error)
+            state.story_errors[story.unique_story_id] = error
+
+    state.status = "ENRICHMENT_COMPLETED"
+    print(f"--- Enrichment Finished: {len(state.enriched_stories)}/{len(stories)} stories enriched. ---")
+    if sentiment_router.get_classifier() is not None:
+        print(sentiment_router.summary())
+    print(f"{llm_guard.summary()}; {len(llm_retry_queue)} stories in the retry queue")
+    print(structured_output.summary())
+    print(llm_service.summary())
+    if stories:
+        print(f"Structured output retries this batch: {structured_retries / len(stories):.2f} per story")
+    return state
+
+
+def store_story(story: ConsolidatedStory) -> Optional[str]:
+    """Runs the Storage & Indexing agent for one enriched story; returns the error message or None."""
+    try:
+        story_state = storage_index_agent(FinancialNewsState(current_story=story, status="STOCKS_IMPACTED"))
+    except Exception as e:
+        story_state = FinancialNewsState(status="ERROR", error_message=f"Storage failed: {e}")
+
+    if story_state.status == "COMPLETED":
+        story_ledger.mark_stored(story.unique_story_id)
+        return None
+    print(f"WARNING: Story {story.unique_story_id[:8]} was not stored: {story_state.error_message}")
+    story_ledger.record_error(story.unique_story_id, story_state.error_message or "Storage failed")
+    return story_state.error_message or "Storage failed"
+
+
+def batch_storage_agent(state: FinancialNewsState) -> FinancialNewsState:
+    """
+    Join node: stores the enriched stories one after another (the SQLite connection and the
+    ChromaDB client are shared, so writes stay sequential).
+    """
+    stored = 0
+    for story in state.enriched_stories:
+        error = store_story(story)
+        if error is None:
+            stored += 1
+        else:
+            state.story_errors[story.unique_story_id] = error
+
+    print(f"--- Batch Storage Finished: stored {stored}/{len(state.enriched_stories)} stories. ---")
+    state.status = "COMPLETED"
+    return state
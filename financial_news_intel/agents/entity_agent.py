@@ -1,15 +1,225 @@
 from langchain_core.prompts import ChatPromptTemplate
 # We will use PydanticOutputParser if the model doesn't natively support StructuredOutput
 from langchain_core.output_parsers import JsonOutputParser 
+from typing import List, Optional, Tuple
 
 # Import all models from the single file
 from financial_news_intel.core.models import (
     FinancialNewsState, 
     ConsolidatedStory, 
     ExtractedEntity, 
+    EntitySentimentExtraction,
+    SentimentLabel,
     ImpactedStock,
 )
 from financial_news_intel.core.llm_model import llm_service
+from financial_news_intel.core.llm_cache import llm_cache
+from financial_news_intel.core.llm_guard import llm_guard, LLMUnavailableError
+from financial_news_intel.core.structured_output import structured_output, normalize_enum, normalize_string_list
+from financial_news_intel.core.embedding_model import get_embeddings, story_embedding_input
+from financial_news_intel.core.sentiment_classifier import sentiment_router
+from financial_news_intel.core.token_budget import shape_story_text
+from financial_news_intel.core.config import ENTITY_AGENT_COMBINED_EXTRACTION
+
+# --- Prompts ---
+
+# Bump whenever the prompts below change, so cached LLM outputs are not reused
+ENTITY_PROMPT_VERSION = "2"
+
+# 1. Combined prompt: entities AND sentiment from a single LLM call (one prompt-processing pass)
+COMBINED_EXTRACTION_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        ("system", "You are an expert financial analyst. Your task is to accurately extract key entities (companies, sectors, regulators, people, events) from the provided news story, and to assign the story a single overall sentiment label: 'Positive', 'Negative', or 'Neutral'. Ensure the output strictly conforms to the JSON schema. Do not hallucinate data; if an entity type is not present, return an empty list for that field. Focus only on financially relevant information."),
+        ("user", "Extract structured entities and the sentiment from the following story.\n\nSTORY CONTENT:\n{story_content}\n\n{format_instructions}"),
+    ]
+)
+
+# 2. Fallback: Entity Extraction prompt
+ENTITY_EXTRACTION_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        ("system", "You are an expert financial analyst. Your task is to accurately extract key entities (companies, sectors, regulators, people, events) from the provided news story. Ensure the output strictly conforms to the JSON schema. Do not hallucinate data; if an entity type is not present, return an empty list for that field. Focus only on financially relevant information."),
+        ("user", "Extract structured entities from the following story.\n\nSTORY CONTENT:\n{story_content}\n\n{format_instructions}"),
+    ]
+)
+
+# 3. Fallback: Sentiment Extraction prompt (simple string output)
+SENTIMENT_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        ("system", "Analyze the financial news story and assign a single sentiment label: 'Positive', 'Negative', or 'Neutral'. Respond only with the label, nothing else. Do not use quotes or punctuation."),
+        ("user", "Determine the sentiment for this story:\n\n{story_content}"),
+    ]
+)
+
+
+# --- Chains (built once at import; the LLM client and its connection pool are shared) ---
+
+# The JSON answers are decoded under the model's JSON schema (Ollama `format`) by the model tier
+# of the 'entity' agent; the format instructions stay in the prompt so the model also sees the
+# field descriptions. The sentiment-only fallback runs on the 'sentiment' agent's tier.
+COMBINED_PARSER = JsonOutputParser(pydantic_object=EntitySentimentExtraction)
+COMBINED_PROMPT = COMBINED_EXTRACTION_PROMPT.partial(format_instructions=COMBINED_PARSER.get_format_instructions())
+
+ENTITY_PARSER = JsonOutputParser(pydantic_object=ExtractedEntity)
+ENTITY_PROMPT = ENTITY_EXTRACTION_PROMPT.partial(format_instructions=ENTITY_PARSER.get_format_instructions())
+
+
+def repair_entities(data):
+    """Local repair of an entity answer: null or single-string entity fields become lists, sentiment case is fixed."""
+    if isinstance(data, dict):
+        for field in ExtractedEntity.__fields__:
+            if field in data:
+                data[field] = normalize_string_list(data[field])
+        if "sentiment" in data:
+            data["sentiment"] = normalize_enum(data["sentiment"], SentimentLabel)
+    return data
+
+
+def _parse_combined(data) -> Tuple[Optional[ExtractedEntity], Optional[str]]:
+    """
+    Validates the entity and sentiment halves of a combined answer separately; raises
+    ValueError only when neither is usable (a half that fails is re-asked separately).
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"the answer is not a JSON object: {data!r}"[:200])
+
+    entities: Optional[ExtractedEntity] = None
+    sentiment: Optional[str] = None
+    errors = []
+    fields = {field: data[field] for field in ExtractedEntity.__fields__ if field in data}
+    if not fields:
+        # A sentiment-only answer has no entity half (an empty ExtractedEntity would hide that)
+        errors.append("no entity fields")
+    else:
+        try:
+            entities = ExtractedEntity(**fields)
+        except ValueError as e:
+            errors.append(f"invalid entities: {e}")
+    try:
+        sentiment = EntitySentimentExtraction(sentiment=data.get("sentiment")).sentiment.value
+    except ValueError as e:
+        errors.append(f"invalid sentiment: {e}")
+
+    if entities is None and sentiment is None:
+        raise ValueError("; ".join(errors))
+    for error in errors:
+        print(f"WARNING: combined output has {error}")
+    return entities, sentiment
+
+
+def _extract_combined(story_content: str) -> Tuple[Optional[ExtractedEntity], Optional[str]]:
+    """
+    Single LLM call returning entities and sentiment together.
+    Each half is validated separately; a half that fails is returned as None so the
+    caller only re-asks for the missing part.
+    """
+    try:
+        # A combined answer missing either half escalates to a larger model tier, if there is one
+        (entities, sentiment), _ = structured_output.invoke(
+            "entity", EntitySentimentExtraction, COMBINED_PROMPT.format_messages(story_content=story_content),
+            _parse_combined, repair_entities, accept=lambda halves: None not in halves,
+        )
+    except LLMUnavailableError:
+        raise
+    except Exception as e:
+        print(f"WARNING: combined entity/sentiment output could not be parsed: {e}")
+        return None, None
+    return entities, sentiment
+
+
+def _extract_entities(story_content: str) -> ExtractedEntity:
+    """Fallback: entity-only LLM call."""
+    entities, _ = structured_output.invoke(
+        "entity", ExtractedEntity, ENTITY_PROMPT.format_messages(story_content=story_content),
+        lambda data: ExtractedEntity(**data), repair_entities,
+    )
+    return entities
+
+
+def _extract_sentiment(story_content: str) -> str:
+    """Fallback: sentiment-only LLM call (escalates to a larger model tier when the label is not valid)."""
+    def call(tier: str, final: bool) -> str:
+        llm_response = llm_guard.invoke(SENTIMENT_PROMPT | llm_service.get_llm(tier=tier), {"story_content": story_content})
+        # Extract the string content of the AIMessage and clean it up (remove quotes)
+        label = llm_response.content.strip().replace('"', '')
+        normalized = normalize_enum(label, SentimentLabel)
+        if normalized not in [member.value for member in SentimentLabel]:
+            if not final:
+                raise ValueError(f"not a sentiment label: {label[:50]!r}")
+            return label
+        return normalized
+
+    return llm_service.route("sentiment", call)
+
+
+def extract_entities_and_sentiment(
+    story_content: str,
+    combined: bool = ENTITY_AGENT_COMBINED_EXTRACTION,
+    embedding: Optional[List[float]] = None,
+) -> Tuple[Optional[ExtractedEntity], Optional[str]]:
+    """
+    Extracts entities and sentiment for one story text.
+    When the local sentiment classifier is confident about the story embedding, its label is
+    used and only the entity-only LLM call is made; otherwise sentiment escalates to the LLM.
+    With combined=True a single LLM call is made, and the separate entity/sentiment calls
+    are only used for whichever part of the combined output failed to parse.
+    Results are served from the LLM response cache when the same text was already processed.
+    Returns (entities, sentiment); either may be None if extraction failed.
+    """
+    prediction = sentiment_router.classify(embedding)
+    local_sentiment = prediction[0] if sentiment_router.is_confident(prediction) else None
+
+    entities, sentiment = _extract_with_cache(story_content, combined, local_sentiment)
+    if prediction is not None:
+        sentiment_router.record(prediction, sentiment, escalated=local_sentiment is None)
+    return entities, sentiment
+
+
+def _extract_with_cache(
+    story_content: str,
+    combined: bool,
+    local_sentiment: Optional[str],
+) -> Tuple[Optional[ExtractedEntity], Optional[str]]:
+    cache_inputs = {"story_content": story_content, "combined": combined}
+    if local_sentiment is not None:
+        cache_inputs["local_sentiment"] = local_sentiment
+    cache_args = (
+        "entity_extraction", llm_service.model_name_for("entity"), llm_service.temperature, ENTITY_PROMPT_VERSION, cache_inputs,
+    )
+    cached = llm_cache.get(*cache_args)
+    if cached is not None:
+        return ExtractedEntity(**cached["entities"]), cached["sentiment"]
+
+    if local_sentiment is not None:
+        # Sentiment answered locally: the entity-only prompt is shorter than the combined one
+        entities, sentiment = None, local_sentiment
+    else:
+        entities, sentiment = _extract_combined(story_content) if combined else (None, None)
+
+    # --- A. Entity Extraction (fallback) ---
+    if entities is None:
+        try:
+            entities = _extract_entities(story_content)
+        except LLMUnavailableError:
+            # Backend down: the story is deferred as a whole instead of stored without entities
+            raise
+        except Exception as e:
+            print(f"ERROR extracting entities: {e}")
+
+    # --- B. Sentiment Extraction (fallback) ---
+    if sentiment is None:
+        try:
+            sentiment = _extract_sentiment(story_content)
+        except LLMUnavailableError:
+            raise
+        except Exception as e:
+            print(f"ERROR extracting sentiment: {e}")
+
+    # Only complete results are cached, so failures are retried next time
+    if entities is not None and sentiment is not None:
+        llm_cache.put(*cache_args, {"entities": entities.dict(), "sentiment": sentiment})
+
+    return entities, sentiment
+
 
 def entity_extraction_agent(state: FinancialNewsState) -> FinancialNewsState:
     """
@@ -17,76 +227,34 @@ def entity_extraction_agent(state: FinancialNewsState) -> FinancialNewsState:
     to extract structured entities and sentiment, updating the story objects in place.
     """
     print("\n--- Running Entity Extraction Agent ---")
-    
-    llm = llm_service.get_llm()
-    # The parser is for the main structured output: ExtractedEntity
-    entity_parser = JsonOutputParser(pydantic_object=ExtractedEntity)
-    
-    # 1. Define the Entity Extraction prompt
-    entity_extraction_prompt = ChatPromptTemplate.from_messages(
-        [
-            ("system", "You are an expert financial analyst. Your task is to accurately extract key entities (companies, sectors, regulators, people, events) from the provided news story. Ensure the output strictly conforms to the JSON schema. Do not hallucinate data; if an entity type is not present, return an empty list for that field. Focus only on financially relevant information."),
-            ("user", "Extract structured entities from the following story.\n\nSTORY CONTENT:\n{story_content}\n\n{format_instructions}"),
-        ]
-    )
-    # Note: For JSON output, sometimes it's more reliable to use llm.bind_tools or llm.with_structured_output 
-    # if the LLM supports it, rather than chaining with JsonOutputParser, but we will stick to your chain for now.
-    entity_chain = entity_extraction_prompt | llm | entity_parser 
-
-    # 2. Define the Sentiment Extraction prompt (simple string output)
-    sentiment_prompt = ChatPromptTemplate.from_messages(
-        [
-            ("system", "Analyze the financial news story and assign a single sentiment label: 'Positive', 'Negative', or 'Neutral'. Respond only with the label, nothing else. Do not use quotes or punctuation."),
-            ("user", "Determine the sentiment for this story:\n\n{story_content}"),
-        ]
-    )
-    sentiment_chain = sentiment_prompt | llm
 
-    # 3. Iterate and Process
-    stories_processed = 0
-    
     # Iterate over the list of ConsolidatedStory objects already in the state
     # for story in state.deduplication_groups:
     story = state.current_story
     print(f"  -> Processing Story ID: {story.unique_story_id[:8]}...")
-    story_content = story.text
-    
-    # --- A. Entity Extraction ---
-    try:
-        # Invocation is fine here as the JsonOutputParser handles the AIMessage
-        extracted_data = entity_chain.invoke({
-            "story_content": story_content,
-            "format_instructions": entity_parser.get_format_instructions(),
-        })
-        
-        # The LLM output (dict) is converted to the Pydantic model
-        story.entities = ExtractedEntity(**extracted_data)
-        print(f"Entities: Companies={story.entities.companies}")
 
-    except Exception as e:
-        print(f"ERROR extracting entities for {story.unique_story_id[:8]}: {e}")
+    embedding = story.embedding
+    if embedding is None and sentiment_router.get_classifier() is not None:
+        embedding = get_embeddings([story_embedding_input(story)])[0]
+    # Long texts are shaped to ENTITY_INPUT_TOKEN_BUDGET (lead + entity-bearing sentences)
+    entities, sentiment = extract_entities_and_sentiment(shape_story_text(story, "entity"), embedding=embedding)
+
+    if entities is not None:
+        story.entities = entities
+        print(f"Entities: Companies={story.entities.companies}")
+    else:
+        print(f"ERROR extracting entities for {story.unique_story_id[:8]}")
         print(f"{state.status}")
         # state.status = "ERROR"
-        
-    # --- B. Sentiment Extraction ---
-    try:
-        #  CRITICAL FIX: Access the .content attribute before using .strip()
-        llm_response = sentiment_chain.invoke({"story_content": story_content})
-        
-        # Ensure llm_response is treated as an AIMessage, extract the string content, 
-        # and then clean it up (remove quotes).
-        sentiment_label = llm_response.content.strip().replace('"', '')
-        
-        story.sentiment = sentiment_label
-        print(f"Sentiment: {sentiment_label}")
-        
-    except Exception as e:
-        print(f"ERROR extracting sentiment for {story.unique_story_id[:8]}: {e}")
+
+    if sentiment is not None:
+        story.sentiment = sentiment
+        print(f"Sentiment: {sentiment}")
+    else:
+        print(f"ERROR extracting sentiment for {story.unique_story_id[:8]}")
         # state.status = "ERROR"
 
-    stories_processed += 1
-            
-    print(f"\n--- Entity Extraction Agent Finished. Updated {stories_processed} Story Records. ---")
+    print(f"\n--- Entity Extraction Agent Finished. Updated 1 Story Record. ---")
     
     # The state is updated because we modified the objects *in* the list (state.deduplication_groups)
     return state
@@ -96,7 +264,6 @@ def entity_extraction_agent(state: FinancialNewsState) -> FinancialNewsState:
 
 
 
-
 # from langchain_core.prompts import ChatPromptTemplate
 # # Remove the two lines below:
 # # We will use PydanticOutputParser if the model doesn't natively support StructuredOutput
@@ -1,8 +1,11 @@
-# from langchain_community.chat_models import ChatOllama
-from langchain_ollama import ChatOllama
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.pydantic_v1 import BaseModel, Field
-from typing import List, Optional
+from langchain_core.messages import HumanMessage, ToolMessage
+from langchain_core.tools import BaseTool
+from concurrent.futures import ThreadPoolExecutor
+from pydantic.v1 import ValidationError
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import json
+import time
 
 # --- Import ALL required structures from models.py ---
 # Assumes models.py contains FinancialNewsState, ImpactedStock, ImpactDirection, ImpactType, and ImpactedStockList
@@ -12,16 +15,454 @@ from financial_news_intel.core.models import (
     ImpactDirection,        
     ImpactType,             
     ImpactedStockList,      # The wrapper model for the list output
+    ConsolidatedStory,
+    StoryImpactBatch,       # Multi-story (batched) output schema
 )
 
-from financial_news_intel.agents.tools import ALL_TOOLS # Import the custom tool list
-from financial_news_intel.core.config import OLLAMA_BASE_URL, OLLAMA_MODEL_NAME
+from financial_news_intel.core.ticker_resolver import ticker_resolver, format_resolved_tickers
+from financial_news_intel.core.sector_index import sector_index
+from financial_news_intel.core.token_budget import shape_story_text
+from financial_news_intel.core.config import (
+    IMPACT_AGENT_TOOL_CALLING, IMPACT_BATCH_SIZE, IMPACT_BATCH_MAX_CHARS, SECTOR_EXPANSION_ENABLED,
+)
+from financial_news_intel.agents.tools import ALL_TOOLS
+from financial_news_intel.core.llm_cache import llm_cache
+from financial_news_intel.core.llm_guard import llm_guard, llm_retry_queue, LLMUnavailableError
+from financial_news_intel.core.llm_model import llm_service
+from financial_news_intel.core.structured_output import structured_output, normalize_enum
+
+# Bump whenever the impact prompt changes, so cached LLM outputs are not reused
+IMPACT_PROMPT_VERSION = "5" if SECTOR_EXPANSION_ENABLED else "5-symbols"
+IMPACT_TEMPERATURE = 0.1
+# Upper bound on tool-calling rounds before the final structured answer is requested
+MAX_TOOL_TURNS = 4
+# Symbols the model writes when it has no ticker (a fuzzy name match may fill these in)
+MISSING_TICKERS = {"", "N/A", "NA", "NONE", "NULL", "UNKNOWN"}
+
+# Confidence range per impact type (the prompt's Confidence Rules), enforced on every answer
+CONFIDENCE_BOUNDS = {
+    ImpactType.DIRECT: (1.0, 1.0),
+    ImpactType.SECTOR: (0.60, 0.80),
+    ImpactType.REGULATORY: (0.80, 0.95),
+}
+
+# How sector-wide and regulatory impacts are reported: one finding per sector or regulator,
+# expanded to its constituents in code (core/sector_index.py), or model-chosen symbols
+SECTOR_INSTRUCTIONS = (
+    "\n2. For a sector-wide or regulatory impact, add ONE entry per affected sector or regulator instead of listing its companies: "
+    "'company_name' is the sector or regulator name (e.g., 'Banking', 'IT', 'RBI', 'USFDA') and 'stock_ticker' is 'SECTOR'. "
+    "The sector's companies are added from the sector index. A regulatory action against a named company is reported for that company and its ticker."
+    if SECTOR_EXPANSION_ENABLED else
+    "\n2. For sector or regulatory impacts, choose an appropriate symbol (e.g., 'TECH_SECTOR', 'RBI_ACTION')."
+)
+
+# Convert Enum values to strings for prompt clarity
+impact_types_str = ", ".join([f"'{t.value}'" for t in ImpactType]) 
+
+# Shared by the single-story and the multi-story (batched) prompts
+IMPACT_PROCESS_INSTRUCTIONS = (
+    "\n\n*** Process Instructions: ***"
+    "\n1. For every named company, use its ticker from 'Resolved Tickers' as the 'stock_ticker'. For a company not listed there, use 'NOT_FOUND' unless you are certain of its exchange symbol."
+    + SECTOR_INSTRUCTIONS +
+    "\n3. **Confidence Rules (MUST be applied strictly):**"
+    "\n   - **Direct Mention (type='direct'):** Confidence MUST be **1.0**."
+    "\n   - **Sector-Wide Impact (type='sector'):** Confidence MUST be between **0.60 and 0.80**."
+    "\n   - **Regulatory Impact (type='regulatory'):** Confidence MUST be between **0.80 and 0.95**."
+    "\n4. The 'type' MUST be one of: " + impact_types_str + "."
+    "\n5. The 'impact_direction' MUST be one of: 'POSITIVE', 'NEGATIVE', 'NEUTRAL', 'UNCLEAR'."
+    "\n6. The final output must conform strictly to the required JSON schema."
+)
+
+# --- UPDATED SYSTEM PROMPT with Confidence and Type Logic ---
+IMPACT_SYSTEM_PROMPT = (
+    "You are an expert financial analyst. Your task is to determine the stock ticker, "
+    "directional impact, **confidence score**, and **impact type** for every relevant entity "
+    "mentioned in the news story. You MUST analyze the entire context (content, entities, sentiment) "
+    "to generate the final structured output."
+    
+    "\n\nStory Content:\n{story_text}"
+    "\n\nExtracted Companies:\n{companies_list}"
+    "\n\nExtracted Sectors:\n{sectors_list}"
+    "\n\nExtracted Regulators:\n{regulators_list}"
+    "\n\nSentiment (for context):\n{sentiment}"
+    "\n\nResolved Tickers (authoritative, from the ticker database):\n{resolved_tickers}"
+    + IMPACT_PROCESS_INSTRUCTIONS +
+    "{tool_instructions}"
+)
+# -------------------------------------------------------------
+
+IMPACT_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", IMPACT_SYSTEM_PROMPT),
+    ("human", "Analyze the story and the extracted entities. Resolve all symbols and determine the financial impact (direction, confidence, and type). Output the final result using the structured JSON schema."),
+])
+
+# Multi-story prompt: the instructions are sent once for up to IMPACT_BATCH_SIZE short stories
+IMPACT_BATCH_SYSTEM_PROMPT = (
+    "You are an expert financial analyst. You are given several news stories, each starting with a "
+    "'=== STORY ID: ... ===' line. For EVERY story, determine the stock ticker, directional impact, "
+    "**confidence score**, and **impact type** for every relevant entity mentioned in that story. "
+    "Analyze each story on its own context (content, entities, sentiment); never mix entities between stories."
+    + IMPACT_PROCESS_INSTRUCTIONS +
+    "\n7. Return exactly one entry in 'results' per story, with 'story_id' copied exactly from its STORY ID line."
+    "\n\n{stories_block}"
+)
+
+IMPACT_BATCH_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", IMPACT_BATCH_SYSTEM_PROMPT),
+    ("human", "Analyze every story above. Resolve all symbols and determine the financial impact (direction, confidence, and type) per story. Output the final result using the structured JSON schema."),
+])
+
+IMPACT_BATCH_STORY_TEMPLATE = (
+    "=== STORY ID: {story_id} ==="
+    "\nStory Content:\n{story_text}"
+    "\nExtracted Companies: {companies_list}"
+    "\nExtracted Sectors: {sectors_list}"
+    "\nExtracted Regulators: {regulators_list}"
+    "\nSentiment (for context): {sentiment}"
+    "\nResolved Tickers (authoritative, from the ticker database):\n{resolved_tickers}"
+)
+
+TOOL_INSTRUCTIONS = (
+    "\n7. For companies missing from 'Resolved Tickers', CALL the `{tool_name}` tool to get their tickers "
+    "before answering. Do not call it for companies that are already resolved."
+    "\n8. Once every ticker is known, answer with the JSON object {{\"impacts\": [...]}} and nothing else."
+)
+
+# Answers are decoded under the ImpactedStockList / StoryImpactBatch JSON schemas by the model
+# tier of the 'impact' / 'impact_batch' agent (core/structured_output.py); the LLM client (and
+# its HTTP connection pool) is the shared llm_service instance. Tickers are resolved before the
+# call and injected into the prompt, so by default no tools are bound and the model answers in
+# a single turn. The batched answer is validated per story, so one bad entry only sends that
+# story to the single-story fallback.
+
+
+def _repair_confidence(value):
+    """'85%', '0.85' or 85 -> 0.85"""
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            value = float(text.rstrip("%")) / (100 if text.endswith("%") else 1)
+        except ValueError:
+            return value
+    if isinstance(value, (int, float)) and 1 < value <= 100:
+        value = value / 100
+    return value
+
+
+def repair_impacts(data):
+    """Local repair of an impact answer: a bare list is wrapped, enum case and confidence formats are fixed."""
+    if isinstance(data, list):
+        data = {"impacts": data}
+    if isinstance(data, dict) and isinstance(data.get("impacts"), list):
+        for impact in data["impacts"]:
+            if not isinstance(impact, dict):
+                continue
+            impact["impact_direction"] = normalize_enum(impact.get("impact_direction"), ImpactDirection)
+            impact["type"] = normalize_enum(impact.get("type"), ImpactType)
+            impact["confidence"] = _repair_confidence(impact.get("confidence"))
+    return data
+
+
+def _clamp_confidence(impacts: List[ImpactedStock]) -> List[ImpactedStock]:
+    """Clamps each confidence into the range the Confidence Rules allow for its impact type."""
+    for impact in impacts:
+        low, high = CONFIDENCE_BOUNDS.get(impact.type, (0.0, 1.0))
+        impact.confidence = min(high, max(low, impact.confidence))
+    return impacts
+
+
+def _confident_impacts(story) -> Callable[[ImpactedStockList], bool]:
+    """
+    Low-confidence check for escalation to a larger model: no impacts although the story
+    names companies, or only UNCLEAR directions.
+    """
+    def accept(result: ImpactedStockList) -> bool:
+        if not result.impacts:
+            return not story.entities.companies
+        return any(impact.impact_direction != ImpactDirection.UNCLEAR for impact in result.impacts)
+    return accept
+
+
+def parse_impacts(data) -> ImpactedStockList:
+    """Validates an impact answer (raises ValueError/TypeError) and enforces the confidence ranges."""
+    result = ImpactedStockList(**data)
+    _clamp_confidence(result.impacts)
+    return result
+
+
+def _invoke_with_tools(
+    prompt_inputs: dict,
+    tools: Sequence[BaseTool],
+    accept: Optional[Callable[[ImpactedStockList], bool]] = None,
+) -> Tuple[ImpactedStockList, int]:
+    """
+    Explicit tool-calling loop: the model may call the ticker tools (results are fed back as
+    ToolMessages) for up to MAX_TOOL_TURNS rounds. An answer without tool calls is parsed as
+    the result; the structured answer is requested only when it is unusable (or not accepted),
+    or when the model was still calling tools. Returns (result, number of model turns).
+    """
+    llm_with_tools = llm_service.get_llm(
+        temperature=IMPACT_TEMPERATURE, tier=llm_service.tier_for("impact")
+    ).bind_tools(list(tools))
+    tools_by_name = {t.name: t for t in tools}
+    messages = IMPACT_PROMPT.format_messages(**prompt_inputs)
+    turns = 0
+
+    for _ in range(MAX_TOOL_TURNS):
+        response = llm_guard.invoke(llm_with_tools, messages)
+        turns += 1
+        messages.append(response)
+        if not response.tool_calls:
+            result = structured_output.try_parse("impact", response.content, parse_impacts, repair_impacts)
+            if result is not None and (accept is None or accept(result)):
+                return result, turns
+            break
+        for call in response.tool_calls:
+            tool = tools_by_name.get(call["name"])
+            output = tool.invoke(call["args"]) if tool else f"Unknown tool: {call['name']}"
+            messages.append(ToolMessage(content=json.dumps(output), tool_call_id=call["id"]))
+
+    messages.append(HumanMessage(content="Output the final result using the structured JSON schema."))
+    result, _ = structured_output.invoke(
+        "impact", ImpactedStockList, messages, parse_impacts, repair_impacts, IMPACT_TEMPERATURE, accept,
+    )
+    return result, turns + 1
+
+
+def _story_prompt_inputs(story, pre_resolve: bool = True) -> dict:
+    """
+    Per-story prompt fields, with tickers resolved deterministically (extracted names + full text).
+    The story text is shaped to IMPACT_INPUT_TOKEN_BUDGET.
+    """
+    if pre_resolve:
+        resolved, unresolved = ticker_resolver.resolve_story(story.entities.companies, story.text)
+    else:
+        resolved, unresolved = [], []
+    if unresolved:
+        print(f"  -> Unresolved companies (no ticker in universe): {unresolved}")
+
+    return {
+        "story_text": shape_story_text(story, "impact"),
+        "companies_list": ", ".join(story.entities.companies),
+        "sectors_list": ", ".join(story.entities.sectors),
+        "regulators_list": ", ".join(story.entities.regulators),
+        "sentiment": story.sentiment or "Neutral (Not Extracted)",
+        "resolved_tickers": format_resolved_tickers(resolved),
+    }
+
+
+def analyze_story_impacts(
+    story,
+    tools: Optional[Sequence[BaseTool]] = None,
+    pre_resolve: bool = True,
+) -> Tuple[ImpactedStockList, int]:
+    """
+    Determines the stock impacts of one enriched story (ConsolidatedStory).
+    With tools, the model can look up tickers the resolver missed (extra model turns);
+    pre_resolve=False leaves all lookups to the tools (used by the model-turn benchmark).
+    Returns (impacts, number of model turns; 0 when served from the LLM cache).
+    """
+    prompt_inputs = _story_prompt_inputs(story, pre_resolve)
+    prompt_inputs["tool_instructions"] = TOOL_INSTRUCTIONS.format(tool_name=tools[0].name) if tools else ""
+
+    # Invoke the chain, providing all context (cached by prompt fingerprint)
+    model_name = llm_service.model_name_for("impact")
+    cached = llm_cache.get("impact_stock", model_name, IMPACT_TEMPERATURE, IMPACT_PROMPT_VERSION, prompt_inputs)
+    if cached is not None:
+        return ImpactedStockList(**cached), 0
+
+    accept = _confident_impacts(story)
+    if tools:
+        result, turns = _invoke_with_tools(prompt_inputs, tools, accept)
+    else:
+        messages = IMPACT_PROMPT.format_messages(**prompt_inputs)
+        result, _ = structured_output.invoke(
+            "impact", ImpactedStockList, messages, parse_impacts, repair_impacts, IMPACT_TEMPERATURE, accept,
+        )
+        turns = 1
+
+    llm_cache.put(
+        "impact_stock", model_name, IMPACT_TEMPERATURE, IMPACT_PROMPT_VERSION,
+        prompt_inputs, json.loads(result.json()),
+    )
+    return result, turns
+
+
+def _validate_batch_results(parsed, story_ids: Dict[str, str]) -> Dict[str, ImpactedStockList]:
+    """
+    Validates each per-story entry of a batched response on its own (raises ValueError when
+    the response has no 'results' list at all).
+    story_ids maps the prompt's short story ID to unique_story_id; entries with an unknown or
+    repeated ID, or impacts that do not match the schema even after repair, are dropped
+    (those stories fall back).
+    """
+    entries = parsed.get("results") if isinstance(parsed, dict) else None
+    if not isinstance(entries, list):
+        raise ValueError("the batched answer has no 'results' list")
+
+    results: Dict[str, ImpactedStockList] = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        unique_id = story_ids.get(str(entry.get("story_id", "")).strip())
+        if unique_id is None or unique_id in results:
+            continue
+        try:
+            results[unique_id] = parse_impacts({"impacts": entry.get("impacts")})
+        except ValidationError:
+            try:
+                results[unique_id] = parse_impacts(repair_impacts({"impacts": entry.get("impacts")}))
+            except ValidationError as e:
+                print(f"WARNING: Batched impact result for story {unique_id[:8]} is invalid: {e}")
+    return results
+
+
+def analyze_story_impacts_batch(
+    stories: List[ConsolidatedStory],
+) -> Tuple[Dict[str, ImpactedStockList], Dict[str, float]]:
+    """
+    Determines the stock impacts of several stories with one LLM request (the instructions are
+    sent once). Stories are addressed by short IDs (S1, S2, ...) in the prompt, which are cheaper
+    to copy back than UUIDs. Per-story results are validated and cached individually.
+    Returns (validated impacts by unique_story_id, usage); stories missing from the result
+    must be analyzed with single-story calls. usage has stories, input_tokens, output_tokens, seconds.
+    """
+    results: Dict[str, ImpactedStockList] = {}
+    usage = {"stories": 0, "input_tokens": 0, "output_tokens": 0, "seconds": 0.0}
+
+    model_name = llm_service.model_name_for("impact_batch")
+    pending: Dict[str, Tuple[ConsolidatedStory, dict]] = {}
+    for story in stories:
+        inputs = _story_prompt_inputs(story)
+        cached = llm_cache.get("impact_stock_batch", model_name, IMPACT_TEMPERATURE, IMPACT_PROMPT_VERSION, inputs)
+        if cached is not None:
+            results[story.unique_story_id] = ImpactedStockList(**cached)
+        else:
+            pending[f"S{len(pending) + 1}"] = (story, inputs)
+    if not pending:
+        return results, usage
+
+    stories_block = "\n\n".join(
+        IMPACT_BATCH_STORY_TEMPLATE.format(story_id=short_id, **inputs) for short_id, (_, inputs) in pending.items()
+    )
+    story_ids = {short_id: story.unique_story_id for short_id, (story, _) in pending.items()}
+    start = time.perf_counter()
+    validated, response = structured_output.invoke(
+        "impact_batch", StoryImpactBatch, IMPACT_BATCH_PROMPT.format_messages(stories_block=stories_block),
+        lambda parsed: _validate_batch_results(parsed, story_ids), temperature=IMPACT_TEMPERATURE,
+    )
+    usage["seconds"] = time.perf_counter() - start
+    usage["stories"] = len(pending)
+    token_usage = getattr(response, "usage_metadata", None) or {}
+    usage["input_tokens"] = token_usage.get("input_tokens", 0)
+    usage["output_tokens"] = token_usage.get("output_tokens", 0)
+    for story, inputs in pending.values():
+        result = validated.get(story.unique_story_id)
+        if result is not None:
+            results[story.unique_story_id] = result
+            llm_cache.put(
+                "impact_stock_batch", model_name, IMPACT_TEMPERATURE, IMPACT_PROMPT_VERSION,
+                inputs, json.loads(result.json()),
+            )
+    return results, usage
+
+
+def _run_impact_chunk(stories: List[ConsolidatedStory]) -> Dict[str, Optional[str]]:
+    """One batched request for the chunk, then single-story calls for the stories it did not answer."""
+    errors: Dict[str, Optional[str]] = {}
+    results: Dict[str, ImpactedStockList] = {}
+    if len(stories) > 1:
+        try:
+            results, usage = analyze_story_impacts_batch(stories)
+            if usage["stories"]:
+                print(
+                    f"  -> Batched impact request: {usage['stories']} stories, "
+                    f"{usage['input_tokens'] / usage['stories']:.0f} prompt + {usage['output_tokens'] / usage['stories']:.0f} "
+                    f"completion tokens/story, {usage['seconds'] / usage['stories']:.2f}s/story"
+                )
+        except LLMUnavailableError as e:
+            # Backend down: single-story fallbacks would fail too
+            return {story.unique_story_id: _defer(story, e) for story in stories}
+        except Exception as e:
+            print(f"WARNING: Batched impact request failed, falling back to single-story calls: {e}")
+
+    for story in stories:
+        result = results.get(story.unique_story_id)
+        if result is not None:
+            story.impacted_stocks = _apply_resolved_tickers(result.impacts)
+            errors[story.unique_story_id] = None
+            continue
+        if len(stories) > 1:
+            print(f"  -> Story {story.unique_story_id[:8]} missing from batched result; single-story fallback")
+        try:
+            story_state = impact_stock_agent(FinancialNewsState(current_story=story, status="ENTITIES_EXTRACTED"))
+        except LLMUnavailableError as e:
+            errors[story.unique_story_id] = _defer(story, e)
+            continue
+        errors[story.unique_story_id] = story_state.error_message if story_state.status == "ERROR" else None
+    return errors
+
+
+def _defer(story: ConsolidatedStory, error: Exception) -> str:
+    llm_retry_queue.add(story, str(error))
+    return f"Deferred (LLM unavailable): {error}"
+
+
+def batched_impact_analysis(
+    stories: List[ConsolidatedStory],
+    batch_size: int = IMPACT_BATCH_SIZE,
+    max_chars: int = IMPACT_BATCH_MAX_CHARS,
+    max_concurrency: int = 1,
+) -> Dict[str, Optional[str]]:
+    """
+    Sets impacted_stocks on every story. Short stories (text up to max_chars) are packed into
+    multi-story requests of up to batch_size stories; long stories and stories whose batched
+    result failed validation use the single-story Impacted Stock Agent.
+    Returns {unique_story_id: error message or None}.
+    """
+    short = [story for story in stories if len(story.text) <= max_chars]
+    chunks = [short[i:i + batch_size] for i in range(0, len(short), max(1, batch_size))]
+    chunks += [[story] for story in stories if len(story.text) > max_chars]
+
+    errors: Dict[str, Optional[str]] = {}
+    workers = max(1, min(max_concurrency, len(chunks)))
+    if workers == 1:
+        for chunk in chunks:
+            errors.update(_run_impact_chunk(chunk))
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="impact") as executor:
+            for chunk_errors in executor.map(_run_impact_chunk, chunks):
+                errors.update(chunk_errors)
+    return errors
+
+
+def _apply_resolved_tickers(impacts: List[ImpactedStock]) -> List[ImpactedStock]:
+    """
+    Replaces tickers the model invented (not in the ticker universe) when the company name
+    is an exact alias; a fuzzy match only fills a missing ticker (the model's symbol may name a
+    company outside the universe, e.g. RPOWER for "Reliance Power"). Then expands
+    sector/regulatory findings into per-ticker impacts (SECTOR_EXPANSION_ENABLED).
+    Symbols that name no known company or sector are kept.
+    """
+    for impact in impacts:
+        if ticker_resolver.is_known_ticker(impact.stock_ticker):
+            continue
+        if SECTOR_EXPANSION_ENABLED and impact.type != ImpactType.DIRECT and sector_index.lookup(impact.company_name) is not None:
+            continue
+        match = ticker_resolver.resolve(impact.company_name)
+        if match is None:
+            continue
+        if match.method == "exact" or impact.stock_ticker.strip().upper() in MISSING_TICKERS:
+            impact.stock_ticker = match.stock_ticker
+    if SECTOR_EXPANSION_ENABLED:
+        impacts = sector_index.expand(impacts, CONFIDENCE_BOUNDS)
+    return impacts
 
 # Agent function (runs as a node in LangGraph)
 def impact_stock_agent(state: FinancialNewsState) -> FinancialNewsState:
     """
-    Analyzes the current story and uses the ticker tool and LLM reasoning to determine 
-    stock tickers, directional impact, confidence, and impact type, adhering to 
+    Analyzes the current story: tickers are resolved deterministically (ticker resolver),
+    then LLM reasoning determines directional impact, confidence, and impact type, adhering to 
     the problem statement's business logic.
     """
     current_story = state.current_story
@@ -31,76 +472,21 @@ def impact_stock_agent(state: FinancialNewsState) -> FinancialNewsState:
 
     print(f"--- Running Impacted Stock Agent for Story ID: {current_story.unique_story_id[:8]}...")
 
-    # 1. Define LLM and Prompt
-    llm = ChatOllama(model=OLLAMA_MODEL_NAME, base_url=OLLAMA_BASE_URL, temperature=0.1)
-
-    # Convert Enum values to strings for prompt clarity
-    impact_types_str = ", ".join([f"'{t.value}'" for t in ImpactType]) 
-    
-    # --- UPDATED SYSTEM PROMPT with Confidence and Type Logic ---
-    system_prompt = (
-        "You are an expert financial analyst. Your task is to determine the stock ticker, "
-        "directional impact, **confidence score**, and **impact type** for every relevant entity "
-        "mentioned in the news story. You MUST analyze the entire context (content, entities, sentiment) "
-        "to generate the final structured output."
-        
-        "\n\nStory Content:\n{story_text}"
-        "\n\nExtracted Companies:\n{companies_list}"
-        "\n\nExtracted Sectors:\n{sectors_list}"
-        "\n\nExtracted Regulators:\n{regulators_list}"
-        "\n\nSentiment (for context):\n{sentiment}"
-        
-        "\n\n*** Process Instructions: ***"
-        "\n1. For every named company, CALL the `resolve_company_ticker` tool to get its stock ticker. This will be the 'symbol'."
-        "\n2. For sector or regulatory impacts, choose an appropriate symbol (e.g., 'TECH_SECTOR', 'RBI_ACTION')."
-        "\n3. **Confidence Rules (MUST be applied strictly):**"
-        "\n   - **Direct Mention (type='direct'):** Confidence MUST be **1.0**."
-        "\n   - **Sector-Wide Impact (type='sector'):** Confidence MUST be between **0.60 and 0.80**."
-        "\n   - **Regulatory Impact (type='regulatory'):** Confidence MUST be between **0.80 and 0.95**."
-        "\n4. The 'type' MUST be one of: " + impact_types_str + "."
-        "\n5. The 'impact_direction' MUST be one of: 'POSITIVE', 'NEGATIVE', 'NEUTRAL', 'UNCLEAR'."
-        "\n6. The final output must conform strictly to the required JSON schema."
-    )
-    # -------------------------------------------------------------
-
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("human", "Analyze the story and the extracted entities. Resolve all symbols and determine the financial impact (direction, confidence, and type). Output the final result using the structured JSON schema."),
-    ])
-
-    # 2. Bind Tools and Structure Output
-    # This uses the imported ImpactedStockList Pydantic model
-    structured_llm_with_tools = (
-        llm.bind_tools(ALL_TOOLS) 
-        .with_structured_output(ImpactedStockList)
-    )
-
-    # 3. Create Chain and Invoke
-    chain = prompt | structured_llm_with_tools
-
     try:
-        companies_list = ", ".join(current_story.entities.companies)
-        sectors_list = ", ".join(current_story.entities.sectors)
-        regulators_list = ", ".join(current_story.entities.regulators)
-        
-        # Invoke the chain, providing all context
-        result: ImpactedStockList = chain.invoke({
-            "story_text": current_story.text,
-            "companies_list": companies_list,
-            "sectors_list": sectors_list,
-            "regulators_list": regulators_list,
-            "sentiment": current_story.sentiment or "Neutral (Not Extracted)"
-        })
+        result, turns = analyze_story_impacts(current_story, tools=ALL_TOOLS if IMPACT_AGENT_TOOL_CALLING else None)
 
         # 4. Update State
-        current_story.impacted_stocks = result.impacts
+        current_story.impacted_stocks = _apply_resolved_tickers(result.impacts)
         state.current_story = current_story
         state.status = "STOCKS_IMPACTED"
         
-        print(f"SUCCESS: Determined {len(result.impacts)} stock impacts for Story ID: {current_story.unique_story_id[:8]}")
+        print(f"SUCCESS: Determined {len(current_story.impacted_stocks)} stock impacts ({len(result.impacts)} findings) for Story ID: {current_story.unique_story_id[:8]} ({turns} model turns)")
         print("Impact Details (JSON):\n" + result.json(indent=2))
         print(f"length of deduplication_groups : {len(state.deduplication_groups)}")
 
+    except LLMUnavailableError:
+        # Not a story error: the caller defers the story until the backend recovers
+        raise
     except Exception as e:
         error_msg = f"ERROR in Impact Stock Agent: {e}"
         print(error_msg)
@@ -97,7 +97,7 @@
 import feedparser
 import time
 import uuid
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional
 # Assuming RawArticle is defined in financial_news_intel.core.models
 from financial_news_intel.core.models import FinancialNewsState, RawArticle 
 
@@ -109,13 +109,11 @@ RSS_FEEDS = [
     "https://www.financialexpress.com/feed/",
 ]
 
-def fetch_articles_from_rss(feeds: list) -> list:
+def iter_articles_from_rss(feeds: list) -> Iterator[Dict[str, Any]]:
     """
-    Fetches articles from a list of RSS feeds, extracts key fields, and 
-    formats them as a list of dictionaries.
+    Yields the articles of a list of RSS feeds as dictionaries, feed by feed, so a
+    streaming consumer can start on the first feed's articles while the next is fetched.
     """
-    articles_data = []
-    
     for url in feeds:
         print(f"  -> Fetching from: {url}")
         try:
@@ -129,20 +127,56 @@ def fetch_articles_from_rss(feeds: list) -> list:
                 if title and content and len(content) > 100:
                     article_id = str(uuid.uuid4())
                     
-                    articles_data.append({
+                    yield {
                         "id": article_id, 
                         "title": title.strip(),
                         "content": content.strip(),
                         "source_url": source_url,
                         "timestamp": entry.published if hasattr(entry, 'published') else None 
-                    })
+                    }
             
             time.sleep(1) 
             
         except Exception as e:
             print(f"  -> Error fetching {url}: {e}")
 
-    return articles_data
+def fetch_articles_from_rss(feeds: list) -> list:
+    """
+    Fetches articles from a list of RSS feeds, extracts key fields, and 
+    formats them as a list of dictionaries.
+    """
+    return list(iter_articles_from_rss(feeds))
+
+def to_raw_article(article_data: Dict[str, Any]) -> RawArticle:
+    """Validates one article dictionary (live feed or golden_data fields) into a RawArticle."""
+    # Map test data fields to Pydantic model fields (ID, Content, URL, Timestamp)
+    mapped_data = {
+        # ID: Use injected ID if available, otherwise generate a new one
+        "id": article_data.get("id", str(uuid.uuid4())), 
+        "title": article_data.get("title", "No Title"),
+        
+        # CONTENT: Map "summary" (from golden_data) to "content"
+        "content": article_data.get("content", article_data.get("summary", "")), 
+        
+        # SOURCE_URL: Map "link" (from golden_data) to "source_url"
+        "source_url": article_data.get("source_url", article_data.get("link", "")), 
+        
+        # TIMESTAMP: Map "published_at" (from golden_data) to "timestamp"
+        "timestamp": article_data.get("timestamp", article_data.get("published_at", None)), 
+    }
+    return RawArticle(**mapped_data)
+
+def iter_raw_articles(raw_news_data: Optional[List[Dict[str, Any]]] = None) -> Iterator[RawArticle]:
+    """
+    Article source of the streaming pipeline: the injected test articles if given, otherwise
+    the live RSS feeds. Articles that fail validation are skipped.
+    """
+    source = raw_news_data if raw_news_data else iter_articles_from_rss(RSS_FEEDS)
+    for article_data in source:
+        try:
+            yield to_raw_article(article_data)
+        except Exception as e:
+            print(f"  -> WARNING: Skipping invalid article {article_data.get('id', '?')}: {e}")
 
 def news_ingestion_agent(state: FinancialNewsState) -> FinancialNewsState:
     """
@@ -180,26 +214,8 @@ def news_ingestion_agent(state: FinancialNewsState) -> FinancialNewsState:
     # 2. Convert raw dictionaries to Pydantic models, mapping fields if necessary
     try:
         for article_data in raw_articles_data:
-            
-            # Map test data fields to Pydantic model fields (ID, Content, URL, Timestamp)
-            mapped_data = {
-                # ID: Use injected ID if available, otherwise generate a new one
-                "id": article_data.get("id", str(uuid.uuid4())), 
-                "title": article_data.get("title", "No Title"),
-                
-                # CONTENT: Map "summary" (from golden_data) to "content"
-                "content": article_data.get("content", article_data.get("summary", "")), 
-                
-                # SOURCE_URL: Map "link" (from golden_data) to "source_url"
-                "source_url": article_data.get("source_url", article_data.get("link", "")), 
-                
-                # TIMESTAMP: Map "published_at" (from golden_data) to "timestamp"
-                "timestamp": article_data.get("timestamp", article_data.get("published_at", None)), 
-            }
-            
             # Validate and convert the mapped dictionary to the RawArticle model
-            raw_article = RawArticle(**mapped_data)
-            raw_articles_pydantic.append(raw_article)
+            raw_articles_pydantic.append(to_raw_article(article_data))
         
         print(f"  -> Successfully converted {len(raw_articles_pydantic)} articles to RawArticle objects.")
         
@@ -0,0 +1,55 @@
+# financial_news_intel/agents/ner_agent.py
+
+from typing import Dict, List
+
+from financial_news_intel.core.models import FinancialNewsState, ConsolidatedStory, ExtractedEntity
+from financial_news_intel.core.config import NER_MARKET_LABELS
+from financial_news_intel.core.ner_model import extract_entities_batch
+
+
+def _dedupe(values: List[str]) -> List[str]:
+    """Keeps the first spelling of each entity (case-insensitive), in order of appearance."""
+    seen, result = set(), []
+    for value in values:
+        key = value.lower()
+        if value and key not in seen:
+            seen.add(key)
+            result.append(value)
+    return result
+
+
+def seed_story_entities(story: ConsolidatedStory, entities: List[Dict[str, str]]) -> ConsolidatedStory:
+    """
+    Seeds the story's entity lists from spaCy entities and flags whether it is market relevant.
+    The seeded lists are kept if LLM entity extraction fails, and are replaced when it succeeds.
+    """
+    labels = {e["label"] for e in entities}
+    story.market_relevant = bool(labels & NER_MARKET_LABELS)
+    story.entities = ExtractedEntity(
+        companies=_dedupe([e["entity"] for e in entities if e["label"] == "ORG"]),
+        people=_dedupe([e["entity"] for e in entities if e["label"] == "PERSON"]),
+    )
+    return story
+
+
+def ner_prepass_agent(state: FinancialNewsState) -> FinancialNewsState:
+    """
+    Cheap NER pre-pass over all unique stories of the batch, run before any LLM call.
+    Runs spaCy once over the whole batch (nlp.pipe) instead of once per story.
+    """
+    stories = state.deduplication_groups
+    print(f"\n--- Running NER Pre-pass over {len(stories)} stories ---")
+
+    try:
+        batch_entities = extract_entities_batch([story.text for story in stories])
+    except Exception as e:
+        # Without NER every story goes through the full LLM enrichment, as before
+        print(f"WARNING: NER pre-pass failed, continuing without it: {e}")
+        return state
+
+    for story, entities in zip(stories, batch_entities):
+        seed_story_entities(story, entities)
+
+    skipped = sum(1 for story in stories if story.market_relevant is False)
+    print(f"--- NER Pre-pass Finished: {skipped}/{len(stories)} stories have no {sorted(NER_MARKET_LABELS)} entities and skip impact analysis. ---")
+    return state
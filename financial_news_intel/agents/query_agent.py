@@ -2,7 +2,9 @@
 from financial_news_intel.core.vector_db import vector_db_client
 from financial_news_intel.core.db_service import db_service
 from financial_news_intel.core.models import QueryFilter
-from typing import Dict, Any, List
+from financial_news_intel.core.config import HYBRID_SEARCH_ENABLED, HYBRID_RRF_K
+from financial_news_intel.core.timestamps import to_epoch_seconds
+from typing import Dict, Any, List, Optional
 
 
 # ----------------------------------------
@@ -27,23 +29,111 @@ def _extract_query_filters(query: str) -> QueryFilter:
 # ----------------------------------------
 # 2. Prepare Chroma Filters
 # ----------------------------------------
-def _prepare_chroma_filter(query_filters: QueryFilter) -> Dict[str, Any]:
+def _sentiment_filter(query_filters: QueryFilter) -> Optional[str]:
+    """Sentiment the results must have (shared by the vector and the keyword search), or None."""
+    if query_filters.impact_direction and query_filters.impact_direction.value.upper() != "ANY":
+        return query_filters.impact_direction.value
+    return None
+
+
+def _prepare_chroma_filter(
+    query_filters: QueryFilter,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+) -> Dict[str, Any]:
     """
     Converts QueryFilter → ChromaDB metadata filters.
-    Only sentiment is supported for now.
+    Supports sentiment and a [start_time, end_time) publication window.
     """
-    chroma_filter = {}
+    conditions = []
 
-    if query_filters.impact_direction and query_filters.impact_direction.value.upper() != "ANY":
-        chroma_filter["sentiment"] = {"$eq": query_filters.impact_direction.value}
+    sentiment = _sentiment_filter(query_filters)
+    if sentiment:
+        conditions.append({"sentiment": {"$eq": sentiment}})
 
-    return chroma_filter
+    start_ts, end_ts = to_epoch_seconds(start_time), to_epoch_seconds(end_time)
+    if start_ts is not None:
+        conditions.append({"published_ts": {"$gte": start_ts}})
+    if end_ts is not None:
+        conditions.append({"published_ts": {"$lt": end_ts}})
+
+    # Chroma expects a single-key dict, so multiple conditions are wrapped in $and
+    if not conditions:
+        return {}
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
 
 
 # ----------------------------------------
-# 3. Main Query Processing Agent
+# 3. Rank Fusion (BM25 + Vector)
 # ----------------------------------------
-def query_processing_agent(user_query: str) -> Dict[str, Any]:
+def _fuse_rankings(rankings: List[List[str]], k: int = HYBRID_RRF_K) -> List[str]:
+    """
+    Reciprocal Rank Fusion: each story scores sum(1 / (k + rank)) over the rankings
+    it appears in. Scale-free, so BM25 and vector distances need no calibration.
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, story_id in enumerate(ranking, start=1):
+            scores[story_id] = scores.get(story_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+# ----------------------------------------
+# 4. Format Results
+# ----------------------------------------
+def _format_story_results(matched_stories: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Converts fetch_full_story_details() rows into the QueryResponse story JSON."""
+    results_json = []
+    for s in matched_stories:
+
+        # ----- Clean companies list -----
+        companies_raw = s["companies"]
+        if isinstance(companies_raw, str):
+            companies = (
+                companies_raw.strip("[]")
+                .replace("'", "")
+                .split(",")
+            )
+            companies = [c.strip() for c in companies if c.strip()]
+        else:
+            companies = companies_raw
+
+        # ----- Impacts -----
+        impacts = []
+        for imp in s["impacts"]:
+            impacts.append({
+                "company_name": imp["company_name"],
+                "stock_ticker": imp["stock_ticker"],
+                "impact_direction": imp["impact_direction"],
+                "impact_type": imp["impact_type"],
+                "confidence": imp["confidence"],
+            })
+
+        # ----- Final story JSON -----
+        results_json.append({
+            "story_id": s["story_id"],
+            "sentiment": s["sentiment"],
+            "companies": companies,
+            "impacts": impacts,
+            "article": s["text"],
+            "published_at": s.get("published_at"),
+            "score": s.get("score"),
+        })
+    return results_json
+
+
+# ----------------------------------------
+# 5. Main Query Processing Agent
+# ----------------------------------------
+def query_processing_agent(
+    user_query: str,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    hybrid: Optional[bool] = None,
+    top_k: int = 7,
+) -> Dict[str, Any]:
     """
     Returns a JSON response:
     {
@@ -54,15 +144,22 @@ def query_processing_agent(user_query: str) -> Dict[str, Any]:
 
     No LLM used. Pure RAG pipeline:
     - vector DB → top matches
+    - (hybrid) SQLite FTS5 BM25 → top matches, fused with the vector ranking (RRF)
     - SQL → full story information
+
+    start_time/end_time optionally restrict results to stories published in that window.
+    hybrid defaults to HYBRID_SEARCH_ENABLED.
     """
+    if hybrid is None:
+        hybrid = HYBRID_SEARCH_ENABLED
+
     try:
         # STEP 1: Extract filters (NO LLM)
         filters = _extract_query_filters(user_query)
         print(f"[QueryAgent] Extracted Filters → {filters}")
 
         # STEP 2: Construct Chroma metadata filter (optional sentiment)
-        chroma_filter = _prepare_chroma_filter(filters)
+        chroma_filter = _prepare_chroma_filter(filters, start_time, end_time)
         print(f"[QueryAgent] Chroma Filter: {chroma_filter}")
 
         # STEP 3: Vector search
@@ -70,27 +167,40 @@ def query_processing_agent(user_query: str) -> Dict[str, Any]:
         retrieved_docs = vector_db_client.search(
             query=filters.search_query,
             chroma_filter=chroma_filter,
-            top_k=7,
+            top_k=top_k,
         )
+        story_ids = [
+            doc.get("metadata", {}).get("db_id")
+            for doc in retrieved_docs
+            if doc.get("metadata", {}).get("db_id")
+        ]
+        print(f"[QueryAgent] Vector matches → {len(story_ids)}")
+
+        # STEP 3b: Keyword search + rank fusion
+        if hybrid:
+            keyword_hits = db_service.search_keyword(
+                filters.search_query,
+                limit=top_k,
+                match_all=False,
+                start_time=start_time,
+                end_time=end_time,
+                sentiment=_sentiment_filter(filters),
+            )
+            print(f"[QueryAgent] Keyword matches → {len(keyword_hits)}")
+            story_ids = _fuse_rankings([story_ids, [hit["story_id"] for hit in keyword_hits]])[:top_k]
 
-        if not retrieved_docs:
+        if not story_ids:
             return {
                 "status": "SUCCESS",
                 "count": 0,
                 "results": []
             }
 
-        print(f"[QueryAgent] Vector matches → {len(retrieved_docs)}")
-
         # STEP 4: Fetch SQL details
         matched_stories = []
         print("[QueryAgent] Fetching full SQL stories...")
 
-        for doc in retrieved_docs:
-            story_id = doc.get("metadata", {}).get("db_id")
-            if not story_id:
-                continue
-
+        for story_id in story_ids:
             story = db_service.fetch_full_story_details(story_id)
             if story:
                 matched_stories.append(story)
@@ -105,40 +215,7 @@ def query_processing_agent(user_query: str) -> Dict[str, Any]:
         print(f"[QueryAgent] Final matched stories → {len(matched_stories)}")
 
         # STEP 5: Format structured JSON
-        results_json = []
-        for s in matched_stories:
-
-            # ----- Clean companies list -----
-            companies_raw = s["companies"]
-            if isinstance(companies_raw, str):
-                companies = (
-                    companies_raw.strip("[]")
-                    .replace("'", "")
-                    .split(",")
-                )
-                companies = [c.strip() for c in companies if c.strip()]
-            else:
-                companies = companies_raw
-
-            # ----- Impacts -----
-            impacts = []
-            for imp in s["impacts"]:
-                impacts.append({
-                    "company_name": imp["company_name"],
-                    "stock_ticker": imp["stock_ticker"],
-                    "impact_direction": imp["impact_direction"],
-                    "impact_type": imp["impact_type"],
-                    "confidence": imp["confidence"],
-                })
-
-            # ----- Final story JSON -----
-            results_json.append({
-                "story_id": s["story_id"],
-                "sentiment": s["sentiment"],
-                "companies": companies,
-                "impacts": impacts,
-                "article": s["text"],
-            })
+        results_json = _format_story_results(matched_stories)
 
         # Final output
         return {
@@ -154,3 +231,46 @@ def query_processing_agent(user_query: str) -> Dict[str, Any]:
             "count": 0,
             "results": []
         }
+
+
+# ----------------------------------------
+# 6. Keyword Query Agent (NO embeddings)
+# ----------------------------------------
+def keyword_query_agent(
+    user_query: str,
+    top_k: int = 10,
+    match_all: bool = True,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Lexical lookup (ticker symbols, exact phrases like "repo rate") answered from the
+    SQLite FTS5 index alone, without an embedding forward pass. Same JSON shape as
+    query_processing_agent, with each story's BM25 score.
+    """
+    try:
+        hits = db_service.search_keyword(
+            user_query, limit=top_k, match_all=match_all, start_time=start_time, end_time=end_time
+        )
+
+        matched_stories = []
+        for hit in hits:
+            story = db_service.fetch_full_story_details(hit["story_id"])
+            if story:
+                story["score"] = hit["score"]
+                matched_stories.append(story)
+
+        results_json = _format_story_results(matched_stories)
+        return {
+            "status": "SUCCESS",
+            "count": len(results_json),
+            "results": results_json
+        }
+
+    except Exception as e:
+        print(f"[KeywordQueryAgent ERROR] {e}")
+        return {
+            "status": "ERROR",
+            "count": 0,
+            "results": []
+        }
@@ -1,6 +1,7 @@
 from financial_news_intel.core.models import FinancialNewsState
 from financial_news_intel.core.db_service import db_service        
 from financial_news_intel.core.vector_db import vector_db_client  
+from financial_news_intel.core.timestamps import story_published_at, to_epoch_seconds
 from langgraph.graph import END
 
 def storage_index_agent(state: FinancialNewsState) -> FinancialNewsState:
@@ -22,10 +23,15 @@ def storage_index_agent(state: FinancialNewsState) -> FinancialNewsState:
     
     # 1. Store to Structured Database (SQL)
     try:
-        # save_story now inserts into both SQL tables and returns the story_id
-        story_id_pk = db_service.save_story(story)
+        # A story resumed from the story ledger may have been saved before its run crashed
+        if db_service.story_exists(story.unique_story_id):
+            story_id_pk = story.unique_story_id
+            print(f"  -> Already in Structured DB with ID: {story_id_pk}")
+        else:
+            # save_story now inserts into both SQL tables and returns the story_id
+            story_id_pk = db_service.save_story(story)
+            print(f"  -> Stored to Structured DB with ID: {story_id_pk}")
         story.db_id = story_id_pk
-        print(f"  -> Stored to Structured DB with ID: {story_id_pk}")
         
     except Exception as e:
         print(f"❌ ERROR saving to Structured DB for {story.unique_story_id[:8]}: {e}")
@@ -45,6 +51,11 @@ def storage_index_agent(state: FinancialNewsState) -> FinancialNewsState:
             "sentiment": story.sentiment,
             "db_id": story_id_pk, # Link back to the SQL record
         }
+        # Numeric publication time so RAG searches can be restricted to a time range
+        # (ChromaDB metadata cannot hold None, so the key is only set when known)
+        published_ts = to_epoch_seconds(story_published_at(story))
+        if published_ts is not None:
+            metadata["published_ts"] = published_ts
         
         # We assume vector_db_client has an add_document method for RAG indexing
         vector_id = vector_db_client.add_document(
@@ -1,35 +1,38 @@
 from langchain_core.tools import tool
-from typing import Dict
+from typing import Dict, List
 
-# Mock Ticker Database: Simulating an external API/database lookup
-# This handles common names and non-standard symbols (e.g., TSLA vs. 'Tesla')
-TICKER_DB: Dict[str, str] = {
-    "Jindal Steel and Power": "JSPL.NS", 
-    "Jindal Steel": "JSPL.NS",
-    "Omaxe": "OMAXE.NS",
-    "Caterpillar": "CAT", 
-    "Caterpillar Inc.": "CAT",
-    "Tesla": "TSLA",
-    "Apple": "AAPL"
-}
+from financial_news_intel.core.ticker_resolver import ticker_resolver
+
+# Ticker lookups are served by the deterministic resolver (core/ticker_resolver.py), which
+# indexes the ticker universe in data/stock_mapping.json (names, aliases, fuzzy variants)
+# and memoizes normalized names in an LRU cache.
 
 @tool
 def resolve_company_ticker(company_name: str) -> str:
     """
     Looks up the official stock ticker symbol for a given company name 
     by querying an external financial database. Returns 'NOT_FOUND' if the ticker 
-    cannot be reliably resolved. This tool must be called for every company mentioned.
+    cannot be reliably resolved.
     """
-    normalized_name = company_name.strip()
-    
-    # Simple, case-insensitive fuzzy lookup
-    # This allows the LLM to try variations (e.g., "Caterpillar" vs. "Caterpillar Inc.")
-    for name, ticker in TICKER_DB.items():
-        if normalized_name.lower() in name.lower() or name.lower() in normalized_name.lower():
-             return ticker
+    match = ticker_resolver.resolve(company_name)
+    if match is not None:
+        return match.stock_ticker
              
-    # Fallback when the ticker is not in our mock database
+    # Fallback when the ticker is not in the ticker universe
     return "NOT_FOUND"
 
-# List of all tools to be bound to the LLM
-ALL_TOOLS = [resolve_company_ticker]
\ No newline at end of file
+
+@tool
+def resolve_company_tickers(company_names: List[str]) -> Dict[str, str]:
+    """
+    Looks up the official stock ticker symbols of ALL the given company names in one call.
+    Returns a mapping of each company name to its ticker, or 'NOT_FOUND' if the ticker
+    cannot be reliably resolved. Call this once with every company name you need.
+    """
+    return {
+        name: match.stock_ticker if match is not None else "NOT_FOUND"
+        for name, match in ticker_resolver.resolve_many(company_names).items()
+    }
+
+# List of all tools to be bound to the LLM (the batch tool: one model turn for all names)
+ALL_TOOLS = [resolve_company_tickers]
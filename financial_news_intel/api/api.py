@@ -1,6 +1,15 @@
-from fastapi import FastAPI
-from financial_news_intel.agents.query_agent import query_processing_agent
-from financial_news_intel.api.models import QueryRequest, QueryResponse
+from fastapi import FastAPI, HTTPException
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from financial_news_intel.agents.query_agent import query_processing_agent, keyword_query_agent
+from financial_news_intel.api.models import (
+    QueryRequest, QueryResponse, TickerImpactsResponse, AggregateBucketModel, ImpactAggregatesResponse,
+    LLMCacheStatsResponse,
+)
+from financial_news_intel.core.config import IMPACT_AGGREGATE_BUCKET_MINUTES
+from financial_news_intel.core.db_service import db_service, AGGREGATE_VALUE_COLUMNS
+from financial_news_intel.core.llm_cache import llm_cache
+from financial_news_intel.core.timestamps import to_utc_iso
 
 # Initialize the FastAPI app
 app = FastAPI(
@@ -19,7 +28,12 @@ def handle_query(request: QueryRequest):
     try:
         # The Query Agent now returns a dict:
         # { "status": "...", "count": int, "results": [ ... ] }
-        results = query_processing_agent(request.query)
+        results = query_processing_agent(
+            request.query,
+            start_time=to_utc_iso(request.start_time),
+            end_time=to_utc_iso(request.end_time),
+            hybrid=request.hybrid,
+        )
 
         # Build the response model
         return QueryResponse(
@@ -40,6 +54,117 @@ def handle_query(request: QueryRequest):
             results=[]
         )
 
+@app.get("/search/keyword", response_model=QueryResponse)
+def keyword_search(
+    q: str,
+    limit: int = 10,
+    match: str = "all",
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+):
+    """
+    BM25 keyword search over story titles and text (SQLite FTS5), for exact lookups such as
+    ticker symbols or "repo rate". Does not use the embedding model.
+    match='all' requires every word, match='any' accepts any of them.
+    """
+    if match not in ("all", "any"):
+        raise HTTPException(status_code=400, detail="match must be 'all' or 'any'.")
+
+    results = keyword_query_agent(
+        q,
+        top_k=limit,
+        match_all=(match == "all"),
+        start_time=to_utc_iso(start_time),
+        end_time=to_utc_iso(end_time),
+    )
+    return QueryResponse(query=q, status=results["status"], count=results["count"], results=results["results"])
+
+@app.get("/impacts/{stock_ticker}", response_model=TickerImpactsResponse)
+def get_ticker_impacts(
+    stock_ticker: str,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    last_hours: Optional[float] = None,
+    limit: Optional[int] = None,
+):
+    """
+    Returns the stock impacts recorded for a ticker, newest first.
+    The window is either [start_time, end_time) or the last `last_hours` hours.
+    """
+    if last_hours is not None:
+        if start_time is not None:
+            raise HTTPException(status_code=400, detail="Use either start_time or last_hours, not both.")
+        start_time = datetime.now(timezone.utc) - timedelta(hours=last_hours)
+
+    start_iso, end_iso = to_utc_iso(start_time), to_utc_iso(end_time)
+    impacts = db_service.fetch_impacts_for_ticker(
+        stock_ticker, start_time=start_iso, end_time=end_iso, limit=limit
+    )
+
+    return TickerImpactsResponse(
+        stock_ticker=stock_ticker,
+        start_time=start_iso,
+        end_time=end_iso,
+        count=len(impacts),
+        impacts=impacts,
+    )
+
+def _to_bucket_model(bucket_start: Optional[str], row: dict) -> AggregateBucketModel:
+    """Builds a bucket response model, deriving the net sentiment score."""
+    confidence_sum = row["confidence_sum"]
+    net_sentiment = row["weighted_score"] / confidence_sum if confidence_sum else 0.0
+    return AggregateBucketModel(
+        bucket_start=bucket_start,
+        net_sentiment=net_sentiment,
+        **{column: row[column] for column in AGGREGATE_VALUE_COLUMNS},
+    )
+
+@app.get("/aggregates/{scope}/{key}", response_model=ImpactAggregatesResponse)
+def get_impact_aggregates(
+    scope: str,
+    key: str,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    last_hours: Optional[float] = None,
+):
+    """
+    Returns time-bucketed impact counts and confidence-weighted scores for a
+    ticker (scope='ticker') or sector (scope='sector'), read from the materialized
+    Impact_Aggregates table.
+    """
+    if scope not in ("ticker", "sector"):
+        raise HTTPException(status_code=400, detail="scope must be 'ticker' or 'sector'.")
+    if last_hours is not None:
+        if start_time is not None:
+            raise HTTPException(status_code=400, detail="Use either start_time or last_hours, not both.")
+        start_time = datetime.now(timezone.utc) - timedelta(hours=last_hours)
+
+    start_iso, end_iso = to_utc_iso(start_time), to_utc_iso(end_time)
+    rows = db_service.fetch_impact_aggregates(scope, key, start_time=start_iso, end_time=end_iso)
+
+    totals = {column: 0 for column in AGGREGATE_VALUE_COLUMNS}
+    for row in rows:
+        for column in AGGREGATE_VALUE_COLUMNS:
+            totals[column] += row[column]
+
+    return ImpactAggregatesResponse(
+        scope=scope,
+        key=key,
+        bucket_minutes=IMPACT_AGGREGATE_BUCKET_MINUTES,
+        start_time=start_iso,
+        end_time=end_iso,
+        totals=_to_bucket_model(start_iso, totals),
+        buckets=[_to_bucket_model(row["bucket_start"], row) for row in rows],
+    )
+
+@app.get("/metrics/llm-cache", response_model=LLMCacheStatsResponse)
+def get_llm_cache_stats():
+    """
+    Hit/miss counters of the persistent LLM response cache, as recorded by the
+    ingestion worker(s) sharing LLM_CACHE_PATH.
+    """
+    return LLMCacheStatsResponse(**llm_cache.stats())
+
 @app.get("/health")
 def health_check():
     """Simple health check endpoint."""
@@ -1,9 +1,15 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
+from datetime import datetime
 
 class QueryRequest(BaseModel):
     """Model for the incoming user query."""
     query: str
+    # Optional publication window [start_time, end_time)
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    # Fuse BM25 keyword and vector rankings (defaults to HYBRID_SEARCH_ENABLED)
+    hybrid: Optional[bool] = None
 
 class ImpactModel(BaseModel):
     company_name: str
@@ -18,9 +24,62 @@ class StoryModel(BaseModel):
     companies: List[str]
     impacts: List[ImpactModel]
     article: str
+    published_at: Optional[str] = None
+    # Relevance score (BM25 for keyword search)
+    score: Optional[float] = None
 
 class QueryResponse(BaseModel):
     query: str
     status: str
     count: int
     results: List[StoryModel]
+
+
+class TickerImpactModel(ImpactModel):
+    story_id: str
+    published_at: Optional[str] = None
+
+class TickerImpactsResponse(BaseModel):
+    stock_ticker: str
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    count: int
+    impacts: List[TickerImpactModel]
+
+class AggregateBucketModel(BaseModel):
+    # None for the window totals when no start time was requested
+    bucket_start: Optional[str] = None
+    impact_count: int
+    positive_count: int
+    negative_count: int
+    neutral_count: int
+    unclear_count: int
+    confidence_sum: float
+    weighted_score: float
+    # weighted_score / confidence_sum, in [-1.0, 1.0]
+    net_sentiment: float
+
+class ImpactAggregatesResponse(BaseModel):
+    scope: str
+    key: str
+    bucket_minutes: int
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    totals: AggregateBucketModel
+    buckets: List[AggregateBucketModel]
+
+
+class CacheCountersModel(BaseModel):
+    hits: int
+    misses: int
+    expired: int
+    writes: int
+    evictions: int
+    hit_rate: float
+
+class LLMCacheStatsResponse(BaseModel):
+    enabled: bool
+    entries: int
+    totals: CacheCountersModel
+    # Counters per agent namespace (e.g. entity_extraction, impact_stock)
+    namespaces: Dict[str, CacheCountersModel]
@@ -0,0 +1,141 @@
+# financial_news_intel/cli.py
+#
+# Maintenance commands for the structured database.
+# Usage: python -m financial_news_intel.cli --help
+
+import typer
+
+app = typer.Typer(help="Financial News Intelligence maintenance commands.")
+
+
+@app.command("rebuild-aggregates")
+def rebuild_aggregates():
+    """
+    Recomputes the Impact_Aggregates table from Stories/Stock_Impacts and reports
+    how many rows differed from the incrementally maintained version.
+    """
+    from financial_news_intel.core.db_service import db_service
+
+    result = db_service.rebuild_impact_aggregates()
+    if result["mismatched"]:
+        typer.echo(f"WARNING: {result['mismatched']} aggregate rows were out of sync and have been corrected.")
+    else:
+        typer.echo(f"Impact_Aggregates verified: {result['rows']} rows match the incremental state.")
+
+
+@app.command("backfill-published-at")
+def backfill_published_at():
+    """
+    Fills in published_at for stories saved without one (from their ingestion time) and
+    aligns the denormalized published_at of Stock_Impacts with their stories.
+    """
+    from financial_news_intel.core.db_service import db_service
+
+    result = db_service.backfill_published_at()
+    typer.echo(f"Backfilled published_at of {result['stories']} stories and {result['impacts']} impacts.")
+
+
+@app.command("export-parquet")
+def export_parquet(
+    output_dir: str = typer.Argument(..., help="Directory of the partitioned Parquet dataset."),
+    since: str = typer.Option(None, help="Only export stories ingested after this UTC timestamp."),
+    full: bool = typer.Option(False, "--full", help="Ignore the stored watermark and export everything."),
+    batch_size: int = typer.Option(5000, help="Rows per Arrow record batch."),
+):
+    """
+    Streams Stories and Stock_Impacts into Parquet files partitioned by publication date.
+    By default only stories ingested since the previous export are written.
+    """
+    from financial_news_intel.core.parquet_export import export_to_parquet
+    from financial_news_intel.core.timestamps import to_utc_iso
+
+    if since is not None and to_utc_iso(since) is None:
+        raise typer.BadParameter(f"'{since}' is not an ISO-8601 or RFC-822 timestamp.", param_hint="--since")
+    result = export_to_parquet(output_dir, since=since, incremental=not full, batch_size=batch_size)
+    typer.echo(f"Watermark is now {result['watermark']}.")
+
+
+@app.command("train-text-dictionary")
+def train_text_dictionary(
+    sample_size: int = typer.Option(2000, help="Number of stored stories to train on."),
+    dict_size: int = typer.Option(64 * 1024, help="Dictionary size in bytes."),
+):
+    """Trains the shared zstd dictionary used for STORY_TEXT_COMPRESSION=zstd."""
+    from financial_news_intel.core.db_service import db_service
+
+    dict_id = db_service.train_text_dictionary(sample_size=sample_size, dict_size=dict_size)
+    typer.echo(f"Dictionary {dict_id} is now used for new writes. Run 'recompress-stories' to apply it to existing rows.")
+
+
+@app.command("recompress-stories")
+def recompress_stories(batch_size: int = typer.Option(500, help="Rows rewritten per batch.")):
+    """Re-encodes all stored story texts with the configured STORY_TEXT_COMPRESSION."""
+    from financial_news_intel.core.db_service import db_service
+
+    db_service.recompress_story_texts(batch_size=batch_size)
+
+
+@app.command("llm-cache-stats")
+def llm_cache_stats(clear: bool = typer.Option(False, "--clear", help="Remove all cached entries afterwards.")):
+    """Prints hit/miss counters of the persistent LLM response cache."""
+    from financial_news_intel.core.llm_cache import llm_cache
+
+    stats = llm_cache.stats()
+    typer.echo(f"Entries: {stats['entries']} (enabled={stats['enabled']})")
+    for name, counters in sorted(stats["namespaces"].items()) + [("TOTAL", stats["totals"])]:
+        typer.echo(
+            f"{name:<20} hits={counters['hits']} misses={counters['misses']} hit_rate={counters['hit_rate']:.1%} "
+            f"expired={counters['expired']} writes={counters['writes']} evictions={counters['evictions']}"
+        )
+    if clear:
+        llm_cache.clear()
+        typer.echo("Cache cleared.")
+
+
+@app.command("story-ledger-stats")
+def story_ledger_stats(limit: int = typer.Option(20, help="Number of failed stories to list.")):
+    """Prints the stories per pipeline stage in the story ledger, and the last failed ones."""
+    from financial_news_intel.core.story_ledger import story_ledger
+
+    stats = story_ledger.stats()
+    typer.echo(" ".join(f"{stage}={count}" for stage, count in stats.items()) + f" (enabled={story_ledger.enabled})")
+    for story_id, error in story_ledger.failed(limit):
+        typer.echo(f"FAILED {story_id}: {error}")
+
+
+@app.command("job-queue-stats")
+def job_queue_stats(limit: int = typer.Option(20, help="Number of failed jobs to list.")):
+    """Prints the enrichment jobs per state (PIPELINE_MODE=queue), and the last failed ones."""
+    from financial_news_intel.core.job_queue import job_queue
+
+    stats = job_queue.stats()
+    typer.echo(" ".join(f"{state}={count}" for state, count in stats.items()))
+    for story_id, error in job_queue.failed(limit):
+        typer.echo(f"FAILED {story_id}: {error}")
+
+
+@app.command("train-sentiment-classifier")
+def train_sentiment_classifier(
+    source: str = typer.Option(
+        "db", help="'db' (LLM-labelled stored stories) or 'golden' (tests/golden_data.py; overlaps the golden evaluation)."
+    ),
+    threshold: float = typer.Option(None, help="Confidence threshold to evaluate (default SENTIMENT_CLASSIFIER_THRESHOLD)."),
+):
+    """
+    Trains the local sentiment classifier on story embeddings and reports its leave-one-out
+    accuracy and the share of stories that would still be escalated to the LLM.
+    """
+    from financial_news_intel.core.config import SENTIMENT_CLASSIFIER_THRESHOLD
+    from financial_news_intel.core.sentiment_classifier import train_sentiment_classifier as train
+
+    threshold = SENTIMENT_CLASSIFIER_THRESHOLD if threshold is None else threshold
+    metrics = train(source=source, threshold=threshold)
+    typer.echo(
+        f"Leave-one-out on {metrics['samples']} stories: accuracy={metrics['accuracy']:.1%}, "
+        f"escalation_rate={metrics['escalation_rate']:.1%} at threshold {threshold}, "
+        f"accuracy of local answers={metrics['local_accuracy']:.1%}"
+    )
+
+
+if __name__ == "__main__":
+    app()
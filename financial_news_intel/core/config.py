@@ -10,12 +10,188 @@ load_dotenv()
 # --- LLM Configuration (Ollama) ---
 OLLAMA_MODEL_NAME = os.getenv("OLLAMA_MODEL_NAME", "llama3")
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+# How long Ollama keeps the model loaded after a request (e.g. "30m", "-1" = forever)
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+try:
+    # Context window requested from Ollama; unset uses the model default. Keep it constant,
+    # since changing num_ctx between requests forces the model to be reloaded.
+    OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX")) if os.getenv("OLLAMA_NUM_CTX") else None
+except ValueError:
+    OLLAMA_NUM_CTX = None
+try:
+    # Per-call timeout of LLM requests (seconds); a dead backend fails at connect after OLLAMA_CONNECT_TIMEOUT
+    OLLAMA_REQUEST_TIMEOUT = float(os.getenv("OLLAMA_REQUEST_TIMEOUT", 300))
+    OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", 5))
+except ValueError:
+    OLLAMA_REQUEST_TIMEOUT, OLLAMA_CONNECT_TIMEOUT = 300.0, 5.0
+
+# --- Model Tiers (per-agent model routing) ---
+# Named model clients, smallest first; both default to OLLAMA_MODEL_NAME (a single model)
+OLLAMA_SMALL_MODEL_NAME = os.getenv("OLLAMA_SMALL_MODEL_NAME", OLLAMA_MODEL_NAME)
+OLLAMA_LARGE_MODEL_NAME = os.getenv("OLLAMA_LARGE_MODEL_NAME", OLLAMA_MODEL_NAME)
+MODEL_TIERS = {"small": OLLAMA_SMALL_MODEL_NAME, "large": OLLAMA_LARGE_MODEL_NAME}
+# Tier each agent starts on ("agent=tier" pairs); unlisted agents use the large tier
+AGENT_MODEL_TIERS = {
+    agent.strip(): tier.strip().lower() for agent, tier in (
+        pair.split("=", 1) for pair in os.getenv(
+            "AGENT_MODEL_TIERS", "sentiment=small,entity=small,impact=large,impact_batch=large,query=large"
+        ).split(",") if "=" in pair
+    )
+}
+# Re-run a call on the next larger tier when the answer fails validation or has low confidence
+MODEL_ESCALATION_ENABLED = os.getenv("MODEL_ESCALATION_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# --- Agent Configuration ---
+# Extract entities and sentiment with one LLM call (falls back to two calls on parse failure)
+ENTITY_AGENT_COMBINED_EXTRACTION = os.getenv("ENTITY_AGENT_COMBINED_EXTRACTION", "true").lower() in ("1", "true", "yes")
+try:
+    # Number of stories enriched (entity + impact LLM calls) concurrently; 1 processes them one at a time.
+    # Set OLLAMA_NUM_PARALLEL on the Ollama server to at least this value.
+    ENRICHMENT_CONCURRENCY = max(1, int(os.getenv("ENRICHMENT_CONCURRENCY", 1)))
+except ValueError:
+    ENRICHMENT_CONCURRENCY = 1
+# Let the impact model call the ticker tools for companies the resolver could not map
+# (adds model turns per story; tickers are always pre-resolved and injected into the prompt)
+IMPACT_AGENT_TOOL_CALLING = os.getenv("IMPACT_AGENT_TOOL_CALLING", "false").lower() in ("1", "true", "yes")
+try:
+    # Short stories packed into one impact request (the instructions are sent once); 1 disables batching
+    IMPACT_BATCH_SIZE = max(1, int(os.getenv("IMPACT_BATCH_SIZE", 1)))
+    # Stories longer than this (characters) always get their own impact request
+    IMPACT_BATCH_MAX_CHARS = int(os.getenv("IMPACT_BATCH_MAX_CHARS", 1500))
+except ValueError:
+    IMPACT_BATCH_SIZE, IMPACT_BATCH_MAX_CHARS = 1, 1500
+
+# --- Pipeline Execution Mode ---
+# "batch": the LangGraph pipeline, each stage over the whole batch before the next starts.
+# "streaming": fetch, dedup, enrichment and storage run as concurrent stages connected by
+# bounded queues (financial_news_intel/streaming_pipeline.py)
+# "queue": the ingestion worker only fetches and deduplicates; unique stories go to the
+# enrichment job queue, drained by any number of enrichment worker processes
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "batch").strip().lower()
+try:
+    # Capacity of each queue between streaming stages; a full queue blocks the stage before it
+    STREAM_QUEUE_SIZE = max(1, int(os.getenv("STREAM_QUEUE_SIZE", 16)))
+except ValueError:
+    STREAM_QUEUE_SIZE = 16
+
+# --- Story Stage Ledger (checkpointed, resumable progress) ---
+# Persistent per-story stage (deduped -> enriched -> stored), so a restarted worker resumes
+# stories that were deduplicated but never stored instead of losing them as "duplicates"
+STORY_LEDGER_ENABLED = os.getenv("STORY_LEDGER_ENABLED", "true").lower() in ("1", "true", "yes")
+STORY_LEDGER_PATH = os.getenv("STORY_LEDGER_PATH", "story_ledger.db")
+try:
+    # Runs a story is resumed in after enrichment/storage errors before it is marked failed
+    STORY_LEDGER_MAX_ATTEMPTS = int(os.getenv("STORY_LEDGER_MAX_ATTEMPTS", 3))
+    # Stored stories are kept in the ledger this long (seconds), then pruned
+    STORY_LEDGER_RETENTION_SECONDS = int(os.getenv("STORY_LEDGER_RETENTION_SECONDS", 7 * 24 * 3600))
+except ValueError:
+    STORY_LEDGER_MAX_ATTEMPTS, STORY_LEDGER_RETENTION_SECONDS = 3, 7 * 24 * 3600
+try:
+    # A story claimed by a process (in progress there) is not resumed by another process for
+    # this long (seconds); the claims of a crashed process expire after it
+    STORY_LEDGER_CLAIM_SECONDS = float(os.getenv("STORY_LEDGER_CLAIM_SECONDS", 900))
+except ValueError:
+    STORY_LEDGER_CLAIM_SECONDS = 900.0
+
+# --- Enrichment Job Queue (PIPELINE_MODE=queue, scheduler/enrichment_worker.py) ---
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "job_queue.db")
+try:
+    # A leased job is invisible to other workers this long (seconds) unless its lease is renewed
+    JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", 120))
+    # Interval (seconds) at which a worker renews the leases of the jobs it is working on
+    JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", 30))
+    # Leases (including those lost by crashed workers) before a job is marked failed
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+    # Jobs a worker leases at once (enriched with up to ENRICHMENT_CONCURRENCY in flight)
+    JOB_LEASE_BATCH = max(1, int(os.getenv("JOB_LEASE_BATCH", ENRICHMENT_CONCURRENCY)))
+    # Sleep (seconds) of an idle worker between polls of an empty queue
+    JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", 2.0))
+    # Completed jobs are kept this long (seconds), then pruned
+    JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", 24 * 3600))
+except ValueError:
+    JOB_LEASE_SECONDS, JOB_HEARTBEAT_SECONDS, JOB_MAX_ATTEMPTS = 120.0, 30.0, 3
+    JOB_LEASE_BATCH, JOB_POLL_SECONDS, JOB_RETENTION_SECONDS = ENRICHMENT_CONCURRENCY, 2.0, 24 * 3600
+
+# --- LLM Call Guard (retries, adaptive concurrency, circuit breaker) ---
+LLM_GUARD_ENABLED = os.getenv("LLM_GUARD_ENABLED", "true").lower() in ("1", "true", "yes")
+try:
+    # Retries of a call that failed with a timeout, connection error or HTTP 429/5xx
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+    # Exponential backoff with full jitter: sleep uniform(0, min(max, base * 2^attempt)) seconds
+    LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", 1.0))
+    LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", 20.0))
+    # AIMD concurrency limit of LLM calls, between min and max (default max: ENRICHMENT_CONCURRENCY)
+    LLM_AIMD_MIN_CONCURRENCY = int(os.getenv("LLM_AIMD_MIN_CONCURRENCY", 1))
+    LLM_AIMD_MAX_CONCURRENCY = int(os.getenv("LLM_AIMD_MAX_CONCURRENCY", ENRICHMENT_CONCURRENCY))
+    # A call slower than tolerance x the median recent call shrinks the limit by the backoff factor
+    LLM_AIMD_LATENCY_TOLERANCE = float(os.getenv("LLM_AIMD_LATENCY_TOLERANCE", 3.0))
+    LLM_AIMD_BACKOFF = float(os.getenv("LLM_AIMD_BACKOFF", 0.7))
+    # Consecutive backend failures that open the circuit, and how long it stays open
+    LLM_BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", 5))
+    LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", 30))
+    # Batches a deferred story is retried in before it is dropped
+    LLM_RETRY_QUEUE_MAX_ATTEMPTS = int(os.getenv("LLM_RETRY_QUEUE_MAX_ATTEMPTS", 5))
+except ValueError:
+    LLM_MAX_RETRIES, LLM_RETRY_BASE_DELAY, LLM_RETRY_MAX_DELAY = 2, 1.0, 20.0
+    LLM_AIMD_MIN_CONCURRENCY, LLM_AIMD_MAX_CONCURRENCY = 1, ENRICHMENT_CONCURRENCY
+    LLM_AIMD_LATENCY_TOLERANCE, LLM_AIMD_BACKOFF = 3.0, 0.7
+    LLM_BREAKER_FAILURE_THRESHOLD, LLM_BREAKER_COOLDOWN_SECONDS = 5, 30.0
+    LLM_RETRY_QUEUE_MAX_ATTEMPTS = 5
+
+# --- Structured Output (schema-constrained decoding, local repair, bounded retries) ---
+# Send each agent's JSON schema as Ollama's `format` (constrained decoding); false only asks for JSON
+STRUCTURED_OUTPUT_SCHEMA_FORMAT = os.getenv("STRUCTURED_OUTPUT_SCHEMA_FORMAT", "true").lower() in ("1", "true", "yes")
+# Fix trailing text, code fences, enum case etc. locally before re-asking the model
+STRUCTURED_OUTPUT_REPAIR = os.getenv("STRUCTURED_OUTPUT_REPAIR", "true").lower() in ("1", "true", "yes")
+try:
+    # Re-asks (with the validation error) after an answer that could not be parsed or repaired
+    STRUCTURED_OUTPUT_MAX_RETRIES = int(os.getenv("STRUCTURED_OUTPUT_MAX_RETRIES", 1))
+except ValueError:
+    STRUCTURED_OUTPUT_MAX_RETRIES = 1
+
+# --- Token-Budgeted Input Shaping ---
+# Long story texts are cut down to the lead plus entity-bearing sentences before the LLM call
+try:
+    # Per-agent input budgets in tokens; 0 sends the full text
+    ENTITY_INPUT_TOKEN_BUDGET = int(os.getenv("ENTITY_INPUT_TOKEN_BUDGET", 768))
+    IMPACT_INPUT_TOKEN_BUDGET = int(os.getenv("IMPACT_INPUT_TOKEN_BUDGET", 768))
+    # Opening sentences always kept (news puts the key facts first)
+    INPUT_LEAD_SENTENCES = int(os.getenv("INPUT_LEAD_SENTENCES", 2))
+except ValueError:
+    ENTITY_INPUT_TOKEN_BUDGET, IMPACT_INPUT_TOKEN_BUDGET, INPUT_LEAD_SENTENCES = 768, 768, 2
+# Hugging Face tokenizer matching OLLAMA_MODEL_NAME (e.g. "NousResearch/Meta-Llama-3-8B");
+# unset estimates tokens as characters / 4
+INPUT_TOKENIZER_NAME = os.getenv("INPUT_TOKENIZER_NAME", "")
+
+# --- Local Sentiment Classifier ---
+# Logistic regression over the story embeddings; only low-confidence stories ask the LLM for sentiment
+SENTIMENT_CLASSIFIER_ENABLED = os.getenv("SENTIMENT_CLASSIFIER_ENABLED", "true").lower() in ("1", "true", "yes")
+SENTIMENT_CLASSIFIER_PATH = os.getenv("SENTIMENT_CLASSIFIER_PATH", "sentiment_classifier.npz")
+try:
+    # Minimum class probability for the local answer to be used without the LLM
+    SENTIMENT_CLASSIFIER_THRESHOLD = float(os.getenv("SENTIMENT_CLASSIFIER_THRESHOLD", 0.7))
+except ValueError:
+    SENTIMENT_CLASSIFIER_THRESHOLD = 0.7
 
 # --- Embedding Model Configuration ---
 EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
 
 # --- NER Model Configuration  ---
 SPACY_MODEL_NAME = os.getenv("SPACY_MODEL_NAME", "en_core_web_md")
+# Batch NER pre-pass over the unique stories of a batch (nlp.pipe)
+NER_PREPASS_ENABLED = os.getenv("NER_PREPASS_ENABLED", "true").lower() in ("1", "true", "yes")
+try:
+    NER_N_PROCESS = int(os.getenv("NER_N_PROCESS", 1))
+except ValueError:
+    NER_N_PROCESS = 1
+try:
+    NER_BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", 64))
+except ValueError:
+    NER_BATCH_SIZE = 64
+# Stories without any of these entity labels are treated as non-market and skip the impact LLM call
+NER_MARKET_LABELS = {
+    label.strip().upper() for label in os.getenv("NER_MARKET_LABELS", "ORG,GPE,MONEY").split(",") if label.strip()
+}
 
 # --- Vector Database (ChromaDB) ---
 # CRITICAL NEW VARIABLES
@@ -31,4 +207,98 @@ try:
     # Convert the string from .env to a float
     DEDUPLICATION_SIMILARITY_THRESHOLD = float(os.getenv("DEDUPLICATION_SIMILARITY_THRESHOLD", 0.95))
 except ValueError:
-    DEDUPLICATION_SIMILARITY_THRESHOLD = 0.95
\ No newline at end of file
+    DEDUPLICATION_SIMILARITY_THRESHOLD = 0.95
+
+# --- Structured DB Aggregates ---
+try:
+    # Width of the time buckets used by the Impact_Aggregates table
+    IMPACT_AGGREGATE_BUCKET_MINUTES = max(1, int(os.getenv("IMPACT_AGGREGATE_BUCKET_MINUTES", 60)))
+except ValueError:
+    IMPACT_AGGREGATE_BUCKET_MINUTES = 60
+
+# --- Story Text Compression ---
+# 'none', 'zlib' or 'zstd' (zstd falls back to zlib when zstandard is not installed)
+STORY_TEXT_COMPRESSION = os.getenv("STORY_TEXT_COMPRESSION", "none").lower()
+try:
+    STORY_TEXT_COMPRESSION_LEVEL = int(os.getenv("STORY_TEXT_COMPRESSION_LEVEL", 3))
+except ValueError:
+    STORY_TEXT_COMPRESSION_LEVEL = 3
+
+# --- Hybrid (BM25 + Vector) Search ---
+HYBRID_SEARCH_ENABLED = os.getenv("HYBRID_SEARCH_ENABLED", "false").lower() in ("1", "true", "yes")
+try:
+    # Reciprocal Rank Fusion constant; larger values flatten the contribution of top ranks
+    HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", 60))
+except ValueError:
+    HYBRID_RRF_K = 60
+
+# --- LLM Response Cache ---
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.db")
+try:
+    LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+except ValueError:
+    LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600
+try:
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 20000))
+except ValueError:
+    LLM_CACHE_MAX_ENTRIES = 20000
+
+# --- Ticker Resolution ---
+# Ticker universe: JSON list of {ticker, name, aliases, sector, exchange}
+STOCK_MAPPING_PATH = os.getenv(
+    "STOCK_MAPPING_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "stock_mapping.json")
+)
+try:
+    # Minimum trigram (Dice) similarity for a fuzzy company name match
+    TICKER_FUZZY_THRESHOLD = float(os.getenv("TICKER_FUZZY_THRESHOLD", 0.9))
+except ValueError:
+    TICKER_FUZZY_THRESHOLD = 0.9
+try:
+    # Size of the LRU cache of normalized company name lookups
+    TICKER_CACHE_SIZE = int(os.getenv("TICKER_CACHE_SIZE", 4096))
+except ValueError:
+    TICKER_CACHE_SIZE = 4096
+
+# --- Sector Constituent Expansion ---
+# Sector index: JSON {"sectors": {name: {aliases, weights}}, "regulators": {name: {aliases, sectors}}}.
+# Constituents are the companies of the sector in the ticker universe; a sector with weights
+# lists its constituents (and their index weights) explicitly.
+SECTOR_INDEX_PATH = os.getenv(
+    "SECTOR_INDEX_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "sector_index.json")
+)
+# The LLM reports one finding per sector/regulator; it is expanded to per-ticker impacts in code
+SECTOR_EXPANSION_ENABLED = os.getenv("SECTOR_EXPANSION_ENABLED", "true").lower() in ("1", "true", "yes")
+try:
+    # Largest constituents (by weight) that one sector finding expands to
+    SECTOR_EXPANSION_MAX_CONSTITUENTS = int(os.getenv("SECTOR_EXPANSION_MAX_CONSTITUENTS", 5))
+except ValueError:
+    SECTOR_EXPANSION_MAX_CONSTITUENTS = 5
+
+# --- Enrichment Priority Scheduling ---
+# Unique stories wait for enrichment in priority order instead of feed order: watchlist
+# ticker hits, publication recency and source weight, plus aging while a story waits
+PRIORITY_SCHEDULING_ENABLED = os.getenv("PRIORITY_SCHEDULING_ENABLED", "true").lower() in ("1", "true", "yes")
+# Tickers of our positions, comma-separated (as in the ticker universe, e.g. "RELIANCE,HDFCBANK")
+WATCHLIST_TICKERS = [t.strip().upper() for t in os.getenv("WATCHLIST_TICKERS", "").split(",") if t.strip()]
+try:
+    # Points per watchlist ticker mentioned (at most 3 count)
+    PRIORITY_WATCHLIST_WEIGHT = float(os.getenv("PRIORITY_WATCHLIST_WEIGHT", 10.0))
+    # Points of a story published just now, halved every PRIORITY_RECENCY_HALF_LIFE_SECONDS
+    PRIORITY_RECENCY_WEIGHT = float(os.getenv("PRIORITY_RECENCY_WEIGHT", 3.0))
+    PRIORITY_RECENCY_HALF_LIFE_SECONDS = float(os.getenv("PRIORITY_RECENCY_HALF_LIFE_SECONDS", 6 * 3600))
+    # Points gained per minute of waiting, so low-priority stories are not starved
+    PRIORITY_AGING_PER_MINUTE = float(os.getenv("PRIORITY_AGING_PER_MINUTE", 0.5))
+except ValueError:
+    PRIORITY_WATCHLIST_WEIGHT, PRIORITY_RECENCY_WEIGHT = 10.0, 3.0
+    PRIORITY_RECENCY_HALF_LIFE_SECONDS, PRIORITY_AGING_PER_MINUTE = 6 * 3600, 0.5
+# Points per source domain, "domain=points,..." (e.g. "livemint.com=2,financialexpress.com=1")
+try:
+    PRIORITY_SOURCE_WEIGHTS = {
+        domain.strip().lower(): float(points)
+        for domain, points in (
+            pair.split("=", 1) for pair in os.getenv("PRIORITY_SOURCE_WEIGHTS", "").split(",") if pair.strip()
+        )
+    }
+except ValueError:
+    PRIORITY_SOURCE_WEIGHTS = {}
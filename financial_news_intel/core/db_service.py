@@ -1,11 +1,31 @@
 from financial_news_intel.core.models import ConsolidatedStory
-from typing import Dict, Any, List
+from financial_news_intel.core.config import (
+    IMPACT_AGGREGATE_BUCKET_MINUTES, STORY_TEXT_COMPRESSION, STORY_TEXT_COMPRESSION_LEVEL
+)
+from financial_news_intel.core.text_codec import StoryTextCodec
+from financial_news_intel.core.ticker_resolver import ticker_resolver
+from financial_news_intel.core.sector_index import sector_index
+from financial_news_intel.core.timestamps import bucket_start, story_published_at, to_utc_iso, utc_now_iso
+from typing import Dict, Any, List, Optional, Tuple
+import re
 import sqlite3 # Using SQLite for simplicity/mocking; replace with psycopg2 for PostgreSQL
 
+# Signed contribution of each impact direction to the confidence-weighted score
+DIRECTION_SCORES = {"POSITIVE": 1.0, "NEGATIVE": -1.0, "NEUTRAL": 0.0, "UNCLEAR": 0.0}
+
+# Columns of Impact_Aggregates that hold the accumulated values (in upsert order)
+AGGREGATE_VALUE_COLUMNS = (
+    "impact_count", "positive_count", "negative_count", "neutral_count",
+    "unclear_count", "confidence_sum", "weighted_score",
+)
+
 class DatabaseService:
-    def __init__(self, db_path="financial_intel.db"):
+    def __init__(self, db_path="financial_intel.db", text_compression: str = STORY_TEXT_COMPRESSION):
         self.conn = sqlite3.connect(db_path, check_same_thread=False)
         self._initialize_db()
+        # story_text is (optionally) stored compressed and only decoded when it is read
+        self.text_codec = StoryTextCodec(self.conn, text_compression, STORY_TEXT_COMPRESSION_LEVEL)
+        self.keyword_index_enabled = self._initialize_keyword_index()
         print("Structured DB Service Initialized (SQLite)")
     
     def _initialize_db(self):
@@ -20,7 +40,9 @@ class DatabaseService:
                 companies_json TEXT,
                 sectors_json TEXT,
                 regulators_json TEXT,
-                vector_id TEXT
+                vector_id TEXT,
+                published_at TEXT,
+                ingested_at TEXT
             );
         """)
         
@@ -34,11 +56,124 @@ class DatabaseService:
                 impact_direction TEXT,
                 confidence REAL,
                 impact_type TEXT,
+                published_at TEXT,
                 FOREIGN KEY (story_id) REFERENCES Stories(story_id)
             );
         """)
+
+        # 3. Bring databases created before the timestamp columns existed up to date
+        self._add_missing_columns(cursor, "Stories", {"published_at": "TEXT", "ingested_at": "TEXT"})
+        self._add_missing_columns(cursor, "Stock_Impacts", {"published_at": "TEXT"})
+
+        # 4. Time-range indexes. published_at is denormalized onto Stock_Impacts so that
+        # "impacts for TICKER between A and B" is a single range scan on this composite index.
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_impacts_ticker_published
+            ON Stock_Impacts (stock_ticker, published_at);
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_impacts_story ON Stock_Impacts (story_id);")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_stories_published ON Stories (published_at);")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_stories_ingested ON Stories (ingested_at);")
+
+        # 5. Materialized, time-bucketed impact aggregates per ticker and per sector.
+        # Maintained incrementally by save_story(); the primary key doubles as the
+        # (scope, key, time) index so a dashboard window is read in O(buckets).
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS Impact_Aggregates (
+                scope TEXT NOT NULL,
+                agg_key TEXT NOT NULL,
+                bucket_start TEXT NOT NULL,
+                impact_count INTEGER NOT NULL DEFAULT 0,
+                positive_count INTEGER NOT NULL DEFAULT 0,
+                negative_count INTEGER NOT NULL DEFAULT 0,
+                neutral_count INTEGER NOT NULL DEFAULT 0,
+                unclear_count INTEGER NOT NULL DEFAULT 0,
+                confidence_sum REAL NOT NULL DEFAULT 0.0,
+                weighted_score REAL NOT NULL DEFAULT 0.0,
+                PRIMARY KEY (scope, agg_key, bucket_start)
+            );
+        """)
         self.conn.commit()
 
+    def _initialize_keyword_index(self) -> bool:
+        """
+        Creates the keyword index used for keyword search: Stories_FTS, a contentless FTS5
+        index of title + text (only the terms are stored, so the text is not kept a second,
+        uncompressed time), and Stories_FTS_Docs, which maps its rowids to story IDs and
+        holds the titles. Snippets are built from the decoded Stories.story_text.
+        Returns False when the SQLite build has no FTS5 support.
+        """
+        cursor = self.conn.cursor()
+        # Indexes created before the index was contentless stored the text: keep their titles
+        # and rebuild them
+        legacy_titles: Dict[str, str] = {}
+        row = cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'Stories_FTS'").fetchone()
+        if row and "content=''" not in row[0].replace('"', "'").replace(" ", ""):
+            legacy_titles = dict(cursor.execute("SELECT story_id, title FROM Stories_FTS").fetchall())
+            cursor.execute("DROP TABLE Stories_FTS")
+            print("Rebuilding the keyword index without a copy of the story text...")
+
+        fts_columns = "title, story_text, content = '', detail = column, tokenize = 'porter unicode61'"
+        try:
+            try:
+                # Deletable rows need SQLite 3.43+; nothing deletes stories yet, so older builds go without
+                cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS Stories_FTS USING fts5({fts_columns}, contentless_delete = 1);")
+            except sqlite3.OperationalError as e:
+                if "contentless_delete" not in str(e):
+                    raise
+                cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS Stories_FTS USING fts5({fts_columns});")
+        except sqlite3.OperationalError as e:
+            print(f"WARNING: SQLite FTS5 is unavailable, keyword search disabled: {e}")
+            return False
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS Stories_FTS_Docs (
+                doc_id INTEGER PRIMARY KEY,
+                story_id TEXT NOT NULL UNIQUE,
+                title TEXT
+            );
+        """)
+
+        # Backfill stories saved before the index existed (or before it was rebuilt).
+        # Every saved story is indexed in the same transaction, so equal row counts mean
+        # there is nothing to backfill and the NOT IN scan is skipped.
+        stories = cursor.execute("SELECT COUNT(*) FROM Stories").fetchone()[0]
+        indexed = cursor.execute("SELECT COUNT(*) FROM Stories_FTS_Docs").fetchone()[0]
+        if indexed < stories:
+            cursor.execute("""
+                SELECT story_id, story_text FROM Stories
+                WHERE story_id NOT IN (SELECT story_id FROM Stories_FTS_Docs)
+            """)
+            missing = cursor.fetchall()
+            for story_id, text in missing:
+                self._index_story(cursor, story_id, legacy_titles.get(story_id) or "", self.text_codec.decode(text))
+            if missing:
+                print(f"Indexed {len(missing)} existing stories for keyword search.")
+        self.conn.commit()
+        return True
+
+    @staticmethod
+    def _index_story(cursor, story_id: str, title: str, text: str):
+        """Adds a story to the keyword index (the caller commits)."""
+        cursor.execute("INSERT INTO Stories_FTS_Docs (story_id, title) VALUES (?, ?)", (story_id, title))
+        cursor.execute(
+            "INSERT INTO Stories_FTS (rowid, title, story_text) VALUES (?, ?, ?)", (cursor.lastrowid, title, text)
+        )
+
+    @staticmethod
+    def _add_missing_columns(cursor, table: str, columns: Dict[str, str]):
+        """Adds any of the given columns that are not yet present on an existing table."""
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        for column, column_type in columns.items():
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+    def story_exists(self, story_id: str) -> bool:
+        """True if the story is already in the Stories table (e.g. saved by a run that crashed before indexing)."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT 1 FROM Stories WHERE story_id = ?", (story_id,))
+        return cursor.fetchone() is not None
+
     def save_story(self, story: ConsolidatedStory) -> str:
         """Saves a ConsolidatedStory and its related impacts to the SQL tables."""
         cursor = self.conn.cursor()
@@ -46,35 +181,226 @@ class DatabaseService:
         # A. Insert into Stories Table
         story_id = story.unique_story_id
         
+        # Publication time: the earliest source article timestamp
+        published_at = story_published_at(story)
+        ingested_at = utc_now_iso()
+        
         cursor.execute("""
-            INSERT INTO Stories (story_id, story_text, sentiment, companies_json, sectors_json, regulators_json)
-            VALUES (?, ?, ?, ?, ?, ?)
+            INSERT INTO Stories (story_id, story_text, sentiment, companies_json, sectors_json, regulators_json, published_at, ingested_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             story_id,
-            story.text,
+            self.text_codec.encode(story.text),
             story.sentiment,
             str(story.entities.companies), # Simple string representation of list for SQLite TEXT
             str(story.entities.sectors),
-            str(story.entities.regulators)
+            str(story.entities.regulators),
+            published_at,
+            ingested_at
         ))
         
         # B. Insert into Stock_Impacts Table
         for impact in story.impacted_stocks:
             cursor.execute("""
-                INSERT INTO Stock_Impacts (story_id, company_name, stock_ticker, impact_direction, confidence, impact_type)
-                VALUES (?, ?, ?, ?, ?, ?)
+                INSERT INTO Stock_Impacts (story_id, company_name, stock_ticker, impact_direction, confidence, impact_type, published_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
             """, (
                 story_id,
                 impact.company_name,
                 impact.stock_ticker,
                 impact.impact_direction.value,
                 impact.confidence,
-                impact.type.value
+                impact.type.value,
+                published_at
             ))
 
+        # C. Fold the new impacts into Impact_Aggregates and index the story for keyword
+        # search, all within the same transaction
+        try:
+            if self.keyword_index_enabled:
+                titles = list(dict.fromkeys(article.title for article in story.source_articles if article.title))
+                self._index_story(cursor, story_id, " | ".join(titles), story.text)
+            self._apply_aggregate_deltas(
+                cursor,
+                self._aggregate_deltas(
+                    published_at or ingested_at,
+                    [(impact.stock_ticker, impact.impact_direction.value, impact.confidence)
+                     for impact in story.impacted_stocks],
+                ),
+            )
+        except Exception:
+            self.conn.rollback()
+            raise
+
         self.conn.commit()
         return story_id # Return the story ID which serves as the primary key
-    
+
+    @staticmethod
+    def _ticker_sectors(ticker: str) -> List[str]:
+        """
+        Sectors an impact on ticker counts towards: its company's sector in the ticker universe,
+        or the sectors a sector/regulator symbol stands for ('TECH_SECTOR', 'RBI_ACTION').
+        """
+        company = ticker_resolver.companies.get((ticker or "").upper())
+        if company is not None:
+            return [company["sector"]] if company.get("sector") else []
+        return sector_index.lookup(ticker) or []
+
+    @staticmethod
+    def _aggregate_deltas(
+        timestamp: Optional[str],
+        impacts: List[Tuple[str, str, Optional[float]]],
+    ) -> Dict[Tuple[str, str, str], List[float]]:
+        """
+        Computes the Impact_Aggregates increments for one story.
+        impacts is a list of (stock_ticker, impact_direction, confidence) tuples; every impact
+        counts towards its ticker and towards its ticker's sector (not every sector the story
+        was tagged with, which would count a single-company impact in unrelated sectors).
+        """
+        bucket = bucket_start(timestamp, IMPACT_AGGREGATE_BUCKET_MINUTES)
+        if bucket is None or not impacts:
+            return {}
+
+        deltas: Dict[Tuple[str, str, str], List[float]] = {}
+
+        for ticker, direction, confidence in impacts:
+            confidence = confidence or 0.0
+            row = [
+                1,
+                1 if direction == "POSITIVE" else 0,
+                1 if direction == "NEGATIVE" else 0,
+                1 if direction == "NEUTRAL" else 0,
+                1 if direction not in ("POSITIVE", "NEGATIVE", "NEUTRAL") else 0,
+                confidence,
+                DIRECTION_SCORES.get(direction, 0.0) * confidence,
+            ]
+            keys = [("ticker", ticker)] + [("sector", sector) for sector in DatabaseService._ticker_sectors(ticker)]
+            for scope, key in keys:
+                accumulated = deltas.setdefault((scope, key, bucket), [0] * len(row))
+                for i, value in enumerate(row):
+                    accumulated[i] += value
+
+        return deltas
+
+    @staticmethod
+    def _apply_aggregate_deltas(cursor, deltas: Dict[Tuple[str, str, str], List[float]]):
+        """Upserts aggregate increments into Impact_Aggregates."""
+        columns = ", ".join(AGGREGATE_VALUE_COLUMNS)
+        placeholders = ", ".join("?" for _ in AGGREGATE_VALUE_COLUMNS)
+        updates = ", ".join(f"{c} = {c} + excluded.{c}" for c in AGGREGATE_VALUE_COLUMNS)
+
+        cursor.executemany(f"""
+            INSERT INTO Impact_Aggregates (scope, agg_key, bucket_start, {columns})
+            VALUES (?, ?, ?, {placeholders})
+            ON CONFLICT (scope, agg_key, bucket_start) DO UPDATE SET {updates}
+        """, [(scope, key, bucket, *values) for (scope, key, bucket), values in deltas.items()])
+
+    def fetch_impact_aggregates(
+        self,
+        scope: str,
+        key: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the time buckets of Impact_Aggregates for one ticker or sector, oldest first.
+        Buckets are selected by their start time within [start_time, end_time).
+        """
+        if scope not in ("ticker", "sector"):
+            raise ValueError(f"Unsupported aggregate scope: {scope}")
+
+        cursor = self.conn.cursor()
+        query = f"""
+            SELECT bucket_start, {", ".join(AGGREGATE_VALUE_COLUMNS)}
+            FROM Impact_Aggregates
+            WHERE scope = ? AND agg_key = ?
+        """
+        params: List[Any] = [scope, key]
+
+        start_time, end_time = bucket_start(start_time, IMPACT_AGGREGATE_BUCKET_MINUTES), to_utc_iso(end_time)
+        if start_time:
+            query += " AND bucket_start >= ?"
+            params.append(start_time)
+        if end_time:
+            query += " AND bucket_start < ?"
+            params.append(end_time)
+        query += " ORDER BY bucket_start"
+
+        cursor.execute(query, params)
+        column_names = [description[0] for description in cursor.description]
+        return [dict(zip(column_names, row)) for row in cursor.fetchall()]
+
+    def backfill_published_at(self) -> Dict[str, int]:
+        """
+        Fills in the publication times of rows saved without one: a story without published_at
+        gets its ingestion time (its source article timestamps were not stored), and every
+        impact gets its story's published_at. Returns the number of rows updated per table.
+        """
+        cursor = self.conn.cursor()
+        stories = cursor.execute(
+            "UPDATE Stories SET published_at = ingested_at WHERE published_at IS NULL AND ingested_at IS NOT NULL"
+        ).rowcount
+        impacts = cursor.execute("""
+            UPDATE Stock_Impacts SET published_at = (
+                SELECT s.published_at FROM Stories s WHERE s.story_id = Stock_Impacts.story_id
+            )
+            WHERE published_at IS NOT (
+                SELECT s.published_at FROM Stories s WHERE s.story_id = Stock_Impacts.story_id
+            )
+        """).rowcount
+        self.conn.commit()
+        print(f"Backfilled published_at of {stories} stories and {impacts} impacts.")
+        return {"stories": stories, "impacts": impacts}
+
+    def rebuild_impact_aggregates(self) -> Dict[str, int]:
+        """
+        Recomputes Impact_Aggregates from scratch out of Stories/Stock_Impacts and compares
+        the result with the incrementally maintained table before replacing it.
+        Returns counts of rebuilt rows and of rows that differed from the incremental state.
+        """
+        cursor = self.conn.cursor()
+
+        cursor.execute(f"SELECT scope, agg_key, bucket_start, {', '.join(AGGREGATE_VALUE_COLUMNS)} FROM Impact_Aggregates")
+        previous = {(row[0], row[1], row[2]): list(row[3:]) for row in cursor.fetchall()}
+
+        # Stream stories one at a time and reuse the same delta logic as save_story()
+        rebuilt: Dict[Tuple[str, str, str], List[float]] = {}
+        story_cursor = self.conn.cursor()
+        story_cursor.execute("SELECT story_id, published_at, ingested_at FROM Stories")
+        for story_id, published_at, ingested_at in story_cursor:
+            cursor.execute(
+                "SELECT stock_ticker, impact_direction, confidence FROM Stock_Impacts WHERE story_id = ?",
+                (story_id,),
+            )
+            deltas = self._aggregate_deltas(published_at or ingested_at, cursor.fetchall())
+            for agg_id, values in deltas.items():
+                accumulated = rebuilt.setdefault(agg_id, [0] * len(values))
+                for i, value in enumerate(values):
+                    accumulated[i] += value
+
+        mismatched = sum(
+            1 for agg_id in set(previous) | set(rebuilt)
+            if not self._aggregate_rows_match(previous.get(agg_id), rebuilt.get(agg_id))
+        )
+
+        try:
+            cursor.execute("DELETE FROM Impact_Aggregates")
+            self._apply_aggregate_deltas(cursor, rebuilt)
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+
+        print(f"Rebuilt {len(rebuilt)} aggregate rows ({mismatched} differed from the incremental table).")
+        return {"rows": len(rebuilt), "mismatched": mismatched}
+
+    @staticmethod
+    def _aggregate_rows_match(a: Optional[List[float]], b: Optional[List[float]]) -> bool:
+        """Compares two aggregate rows with a small tolerance for the REAL columns."""
+        if a is None or b is None:
+            return a is b
+        return all(abs(x - y) < 1e-9 for x, y in zip(a, b))
+
     def fetch_all_stories_with_impacts(self):
         """Fetches all stories and their related stock impacts."""
         cursor = self.conn.cursor()
@@ -101,20 +427,25 @@ class DatabaseService:
             
         return results
     
-    def fetch_full_story_details(self, story_id: str) -> Dict[str, Any]:
-        """Fetches the full story text and associated stock impacts for a given story_id."""
+    def fetch_full_story_details(self, story_id: str, include_text: bool = True) -> Dict[str, Any]:
+        """
+        Fetches the full story text and associated stock impacts for a given story_id.
+        With include_text=False the (possibly compressed) text is neither read nor decoded.
+        """
         cursor = self.conn.cursor()
         
         # 1. Fetch the main story details
         # CRITICAL FIX: Column name is 'story_text', not 'text'
-        story_query = "SELECT story_id, story_text, sentiment, companies_json FROM Stories WHERE story_id = ?"
+        text_column = "story_text" if include_text else "NULL"
+        story_query = f"SELECT story_id, {text_column}, sentiment, companies_json, published_at FROM Stories WHERE story_id = ?"
         cursor.execute(story_query, (story_id,))
         story_row = cursor.fetchone()
         
         if not story_row:
             return None
             
-        story_id, story_text, sentiment, companies_json = story_row
+        story_id, story_text, sentiment, companies_json, published_at = story_row
+        story_text = self.text_codec.decode(story_text)
         
         # 2. Fetch all linked stock impacts
         # impacts_query = "SELECT stock_ticker, impact_direction, confidence FROM Stock_Impacts WHERE story_id = ?"
@@ -143,9 +474,145 @@ class DatabaseService:
             "text": story_text,
             "sentiment": sentiment,
             "companies": companies_json,
+            "published_at": published_at,
             "impacts": impact_details # <-- NOW A List[Dict]
         }
-    
+
+    def fetch_impacts_for_ticker(
+        self,
+        stock_ticker: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetches the stock impacts for one ticker, newest first, optionally restricted to
+        stories published in [start_time, end_time). Served by idx_impacts_ticker_published.
+        """
+        cursor = self.conn.cursor()
+
+        query = """
+            SELECT story_id, company_name, stock_ticker, impact_direction, confidence, impact_type, published_at
+            FROM Stock_Impacts
+            WHERE stock_ticker = ?
+        """
+        params: List[Any] = [stock_ticker]
+
+        start_time, end_time = to_utc_iso(start_time), to_utc_iso(end_time)
+        if start_time:
+            query += " AND published_at >= ?"
+            params.append(start_time)
+        if end_time:
+            query += " AND published_at < ?"
+            params.append(end_time)
+
+        query += " ORDER BY published_at DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        cursor.execute(query, params)
+        return [
+            {
+                "story_id": story_id,
+                "company_name": company_name,
+                "stock_ticker": ticker,
+                "impact_direction": direction,
+                "confidence": confidence,
+                "impact_type": impact_type,
+                "published_at": published_at,
+            }
+            for story_id, company_name, ticker, direction, confidence, impact_type, published_at in cursor.fetchall()
+        ]
+
+    @staticmethod
+    def _query_terms(text: str) -> List[str]:
+        return re.findall(r"\w+", text, flags=re.UNICODE)
+
+    @classmethod
+    def _to_fts_query(cls, text: str, match_all: bool = True) -> Optional[str]:
+        """
+        Turns free text into a safe FTS5 MATCH expression: every word is quoted (so symbols
+        like 'BAJAJ-AUTO' or 'AND' are not parsed as query syntax) and joined with AND/OR.
+        """
+        terms = cls._query_terms(text)
+        if not terms:
+            return None
+        return f" {'AND' if match_all else 'OR'} ".join(f'"{term}"' for term in terms)
+
+    @staticmethod
+    def _snippet(text: str, terms: List[str], tokens: int = 16) -> str:
+        """
+        A window of about `tokens` words around the first query term in the text, matches in
+        [brackets] (like FTS5 snippet(); words starting with a term count, which covers
+        most of what the porter stemmer matches).
+        """
+        words = text.split()
+        needles = [term.lower() for term in terms]
+        hits = {
+            i for i, word in enumerate(words)
+            if any(re.sub(r"\W+", "", word).lower().startswith(needle) for needle in needles)
+        }
+        first = min(hits) if hits else 0
+        start = max(0, min(first - tokens // 4, len(words) - tokens))
+        window = [f"[{word}]" if i in hits else word for i, word in enumerate(words[start:start + tokens], start)]
+        return ("..." if start > 0 else "") + " ".join(window) + ("..." if start + tokens < len(words) else "")
+
+    def search_keyword(
+        self,
+        query: str,
+        limit: int = 10,
+        match_all: bool = True,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        sentiment: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        BM25-ranked keyword search over story titles and text (titles weighted 2x),
+        optionally restricted to a publication window and a sentiment.
+        Returns [{"story_id", "score", "snippet"}], best match first; lower BM25 is better,
+        so the returned score is negated to make higher mean more relevant.
+        """
+        if not self.keyword_index_enabled:
+            return []
+        fts_query = self._to_fts_query(query, match_all)
+        if not fts_query:
+            return []
+
+        # The index is contentless: the story ID comes from Stories_FTS_Docs and the snippet
+        # from the (decoded) story text of the hits
+        sql = """
+            SELECT d.story_id,
+                   bm25(Stories_FTS, 2.0, 1.0) AS rank,
+                   s.story_text
+            FROM Stories_FTS f
+            JOIN Stories_FTS_Docs d ON d.doc_id = f.rowid
+            JOIN Stories s ON s.story_id = d.story_id
+        """
+        params: List[Any] = []
+        start_time, end_time = to_utc_iso(start_time), to_utc_iso(end_time)
+        sql += " WHERE Stories_FTS MATCH ?"
+        params.append(fts_query)
+        if sentiment:
+            sql += " AND s.sentiment = ?"
+            params.append(sentiment)
+        if start_time:
+            sql += " AND s.published_at >= ?"
+            params.append(start_time)
+        if end_time:
+            sql += " AND s.published_at < ?"
+            params.append(end_time)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+
+        cursor = self.conn.cursor()
+        cursor.execute(sql, params)
+        terms = self._query_terms(query)
+        return [
+            {"story_id": story_id, "score": -rank, "snippet": self._snippet(self.text_codec.decode(story_text), terms)}
+            for story_id, rank, story_text in cursor.fetchall()
+        ]
+
     def fetch_all_stories_table(self) -> List[Dict[str, Any]]:
         """Fetches all rows from the Stories table and returns them as a list of dictionaries."""
         cursor = self.conn.cursor()
@@ -159,9 +626,60 @@ class DatabaseService:
         
         # Convert list of tuples to list of dictionaries
         results = [dict(zip(column_names, row)) for row in rows]
+        for row in results:
+            row["story_text"] = self.text_codec.decode(row["story_text"])
         print(f"Fetched {len(results)} rows from Stories table.")
         return results
 
+    def fetch_story_titles(self) -> Dict[str, str]:
+        """Title of each stored story (its first source article's), from the keyword index."""
+        if not self.keyword_index_enabled:
+            return {}
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT story_id, title FROM Stories_FTS_Docs")
+        return {story_id: title.split(" | ")[0] for story_id, title in cursor.fetchall() if title}
+
+    def train_text_dictionary(self, sample_size: int = 2000, dict_size: int = 64 * 1024) -> int:
+        """Trains a shared zstd dictionary from a random sample of stored story texts."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT story_text FROM Stories ORDER BY RANDOM() LIMIT ?", (sample_size,))
+        samples = [self.text_codec.decode(row[0]) for row in cursor.fetchall()]
+        dict_id = self.text_codec.train_dictionary(samples, dict_size=dict_size)
+        print(f"Trained zstd dictionary {dict_id} from {len(samples)} stories.")
+        return dict_id
+
+    def recompress_story_texts(self, batch_size: int = 500) -> int:
+        """
+        Re-encodes every stored story text with the current codec settings (e.g. after
+        enabling compression or training a new dictionary). Returns the number of rows rewritten.
+        """
+        cursor = self.conn.cursor()
+        rewritten = 0
+        last_story_id = ""
+
+        # Keyset pagination over the primary key, so rows are never updated under an open SELECT
+        while True:
+            cursor.execute(
+                "SELECT story_id, story_text FROM Stories WHERE story_id > ? ORDER BY story_id LIMIT ?",
+                (last_story_id, batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_story_id = rows[-1][0]
+
+            updates = []
+            for story_id, stored in rows:
+                encoded = self.text_codec.encode(self.text_codec.decode(stored))
+                if encoded != stored:
+                    updates.append((encoded, story_id))
+            cursor.executemany("UPDATE Stories SET story_text = ? WHERE story_id = ?", updates)
+            rewritten += len(updates)
+
+        self.conn.commit()
+        print(f"Re-encoded {rewritten} story texts (compression='{self.text_codec.algorithm}').")
+        return rewritten
+
     def fetch_all_stock_impacts_table(self) -> List[Dict[str, Any]]:
         """Fetches all rows from the Stock_Impacts table and returns them as a list of dictionaries."""
         cursor = self.conn.cursor()
@@ -169,6 +169,21 @@ def get_embeddings(texts: List[str]) -> List[List[float]]:
         print(error_msg)
         raise
 
+def embedding_input(title: Optional[str], text: str) -> str:
+    """
+    Text embedded for a story: its title and the first 500 characters of its text. The
+    Deduplication Agent's vector is reused by the sentiment classifier, so every caller
+    (deduplication, classifier training and inference) must embed the same input.
+    """
+    return " ".join(part for part in (title, text[:500]) if part)
+
+
+def story_embedding_input(story) -> str:
+    """embedding_input of a ConsolidatedStory (titled by its first source article, as in deduplication)."""
+    title = story.source_articles[0].title if story.source_articles else None
+    return embedding_input(title, story.text)
+
+
 class ChromaEmbeddingFunctionWrapper:
     """Wraps the get_embeddings function to satisfy ChromaDB's interface requirements."""
     
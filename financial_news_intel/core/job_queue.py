@@ -0,0 +1,255 @@
+# financial_news_intel/core/job_queue.py
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from financial_news_intel.core.config import (
+    JOB_QUEUE_PATH, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JOB_RETENTION_SECONDS, LLM_RETRY_QUEUE_MAX_ATTEMPTS,
+)
+from financial_news_intel.core.models import ConsolidatedStory
+from financial_news_intel.core.story_priority import StoryPrioritizer, story_prioritizer
+
+# Job states
+QUEUED = "queued"    # Waiting (visible once visible_at has passed)
+LEASED = "leased"    # Held by a worker until visible_at (its lease expiry)
+DONE = "done"        # Enriched and stored (terminal)
+FAILED = "failed"    # Gave up after max_attempts leases or max_deferrals deferrals (terminal)
+STATES = (QUEUED, LEASED, DONE, FAILED)
+
+
+class JobQueue:
+    """
+    Durable queue of unique stories awaiting enrichment (SQLite), shared by any number of
+    enrichment worker processes (PIPELINE_MODE=queue).
+
+    A worker leases jobs: a single UPDATE ... RETURNING hands each visible job to exactly one
+    worker, with a fresh lease token, and hides it until the lease expires (the visibility
+    timeout). The worker renews its leases with heartbeats while it enriches, then completes
+    or fails each job. Completing, failing and renewing require the lease token, so a worker
+    whose lease expired (and whose job was re-leased) cannot overwrite the new holder's
+    result. Jobs of a crashed worker become visible again when their lease expires; a job
+    leased max_attempts times without completing is marked failed. A job released because
+    the LLM backend was down does not use up an attempt, but is marked failed once it was
+    deferred more than max_deferrals times.
+
+    Visible jobs are leased in priority order: the prioritizer's score at enqueue time plus
+    its aging for the time waited (core/story_priority.py), oldest first among equals.
+
+    Only portable SQL is used (ON CONFLICT, UPDATE ... RETURNING), so the same statements run
+    on Postgres, where the lease subquery would add FOR UPDATE SKIP LOCKED.
+    """
+    def __init__(
+        self,
+        db_path: str = JOB_QUEUE_PATH,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        retention_seconds: int = JOB_RETENTION_SECONDS,
+        prioritizer: StoryPrioritizer = story_prioritizer,
+        max_deferrals: int = LLM_RETRY_QUEUE_MAX_ATTEMPTS,
+    ):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.max_deferrals = max_deferrals
+        self.retention_seconds = retention_seconds
+        self.prioritizer = prioritizer
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """Opens the queue DB lazily, once per process (a forked worker gets its own connection)."""
+        if self._conn is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            # Writers of other processes hold the lock briefly; wait for them instead of failing
+            self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL;")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS Enrichment_Jobs (
+                    story_id TEXT PRIMARY KEY,
+                    story_json TEXT,
+                    status TEXT NOT NULL,
+                    priority REAL NOT NULL DEFAULT 0,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    deferrals INTEGER NOT NULL DEFAULT 0,
+                    lease_token TEXT,
+                    lease_owner TEXT,
+                    visible_at REAL NOT NULL,
+                    enqueued_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    error TEXT
+                );
+            """)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(Enrichment_Jobs)")}
+            if "priority" not in columns:
+                self._conn.execute("ALTER TABLE Enrichment_Jobs ADD COLUMN priority REAL NOT NULL DEFAULT 0")
+            if "deferrals" not in columns:
+                self._conn.execute("ALTER TABLE Enrichment_Jobs ADD COLUMN deferrals INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_visible ON Enrichment_Jobs (status, visible_at);")
+            pruned = self._conn.execute(
+                "DELETE FROM Enrichment_Jobs WHERE status = ? AND updated_at < ?",
+                (DONE, time.time() - self.retention_seconds),
+            ).rowcount
+            self._conn.commit()
+            if pruned:
+                print(f"Job queue: pruned {pruned} completed jobs older than {self.retention_seconds}s")
+        return self._conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        """Runs one write statement in its own transaction."""
+        with self._lock:
+            conn = self._get_conn()
+            cursor = conn.execute(sql, params)
+            conn.commit()
+            return cursor
+
+    # --- Producer ---
+
+    def enqueue(self, stories: List[ConsolidatedStory]) -> int:
+        """Queues stories for enrichment; a story that already has a job is not queued twice."""
+        if not stories:
+            return 0
+        now = time.time()
+        # Scored before taking the lock (watchlist alias matching over the story text)
+        priorities = [self.prioritizer.score(story, now=now) for story in stories]
+        with self._lock:
+            conn = self._get_conn()
+            added = 0
+            for story, priority in zip(stories, priorities):
+                added += conn.execute(
+                    "INSERT INTO Enrichment_Jobs (story_id, story_json, status, priority, visible_at, enqueued_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (story_id) DO NOTHING",
+                    (story.unique_story_id, story.json(), QUEUED, priority, now, now, now),
+                ).rowcount
+            conn.commit()
+        return added
+
+    # --- Workers ---
+
+    def lease(self, worker_id: str, limit: int = 1) -> Tuple[Optional[str], List[ConsolidatedStory]]:
+        """
+        Leases up to limit visible jobs (queued, or leased by a worker whose lease expired),
+        highest aged priority first. Returns (lease token, stories); the token is None when
+        nothing was leased.
+        """
+        now = time.time()
+        token = uuid.uuid4().hex
+        with self._lock:
+            conn = self._get_conn()
+            # Expired leases that used up their attempts are not handed out again
+            conn.execute(
+                "UPDATE Enrichment_Jobs SET status = ?, story_json = NULL, updated_at = ?, "
+                "error = COALESCE(error, 'Lease expired') || ' (gave up after ' || attempts || ' leases)' "
+                "WHERE status = ? AND visible_at <= ? AND attempts >= ?",
+                (FAILED, now, LEASED, now, self.max_attempts),
+            )
+            rows = conn.execute(
+                "UPDATE Enrichment_Jobs SET status = ?, attempts = attempts + 1, lease_token = ?, lease_owner = ?, "
+                "visible_at = ?, updated_at = ? WHERE story_id IN ("
+                "SELECT story_id FROM Enrichment_Jobs WHERE status IN (?, ?) AND visible_at <= ? "
+                "ORDER BY priority + ? * (? - enqueued_at) DESC, enqueued_at LIMIT ?) RETURNING story_json",
+                (LEASED, token, worker_id, now + self.lease_seconds, now, QUEUED, LEASED, now,
+                 self.prioritizer.aging_per_second, now, limit),
+            ).fetchall()
+            conn.commit()
+        if not rows:
+            return None, []
+        return token, [ConsolidatedStory.parse_raw(story_json) for (story_json,) in rows]
+
+    def heartbeat(self, token: str) -> int:
+        """Extends the leases of the token's unfinished jobs; returns how many are still held."""
+        now = time.time()
+        return self._execute(
+            "UPDATE Enrichment_Jobs SET visible_at = ?, updated_at = ? WHERE lease_token = ? AND status = ?",
+            (now + self.lease_seconds, now, token, LEASED),
+        ).rowcount
+
+    def complete(self, story_id: str, token: str) -> bool:
+        """Marks the job done; False if the lease was lost (another worker holds the job now)."""
+        return self._execute(
+            "UPDATE Enrichment_Jobs SET status = ?, story_json = NULL, error = NULL, updated_at = ? "
+            "WHERE story_id = ? AND lease_token = ? AND status = ?",
+            (DONE, time.time(), story_id, token, LEASED),
+        ).rowcount == 1
+
+    def fail(self, story_id: str, token: str, error: str, retry_delay: float = 0.0) -> bool:
+        """
+        Records a failed attempt: the job is queued again after retry_delay seconds, or marked
+        failed once it used up max_attempts. False if the lease was lost.
+        """
+        now = time.time()
+        return self._execute(
+            "UPDATE Enrichment_Jobs SET error = ?, updated_at = ?, visible_at = ?, lease_token = NULL, "
+            "status = CASE WHEN attempts >= ? THEN ? ELSE ? END "
+            "WHERE story_id = ? AND lease_token = ? AND status = ?",
+            (error, now, now + retry_delay, self.max_attempts, FAILED, QUEUED, story_id, token, LEASED),
+        ).rowcount == 1
+
+    def release(self, story_id: str, token: str, delay: float, reason: str) -> Optional[str]:
+        """
+        Hands the job back without counting the attempt, visible again after delay seconds
+        (a story deferred while the LLM backend is down), or marks it failed once it was
+        deferred more than max_deferrals times. Returns the job's new state (QUEUED or
+        FAILED); None if the lease was lost.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._get_conn()
+            row = conn.execute(
+                "UPDATE Enrichment_Jobs SET attempts = attempts - 1, deferrals = deferrals + 1, lease_token = NULL, "
+                "status = CASE WHEN deferrals + 1 > ? THEN ? ELSE ? END, "
+                "error = CASE WHEN deferrals + 1 > ? THEN ? || ' (gave up after ' || deferrals || ' deferrals)' ELSE ? END, "
+                "visible_at = ?, updated_at = ? WHERE story_id = ? AND lease_token = ? AND status = ? RETURNING status",
+                (self.max_deferrals, FAILED, QUEUED, self.max_deferrals, reason, reason,
+                 now + delay, now, story_id, token, LEASED),
+            ).fetchone()
+            conn.commit()
+        return row[0] if row else None
+
+    def states(self, story_ids: List[str]) -> Dict[str, Tuple[str, Optional[str]]]:
+        """(state, last error) of the stories that have a job; stories without one are left out."""
+        if not story_ids:
+            return {}
+        with self._lock:
+            conn = self._get_conn()
+            rows = conn.execute(
+                f"SELECT story_id, status, error FROM Enrichment_Jobs WHERE story_id IN ({', '.join('?' * len(story_ids))})",
+                tuple(story_ids),
+            ).fetchall()
+        return {story_id: (status, error) for story_id, status, error in rows}
+
+    # --- Monitoring ---
+
+    def stats(self) -> Dict[str, int]:
+        """Jobs per state, plus the queued jobs visible now (the backlog)."""
+        with self._lock:
+            conn = self._get_conn()
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM Enrichment_Jobs GROUP BY status").fetchall())
+            visible = conn.execute(
+                "SELECT COUNT(*) FROM Enrichment_Jobs WHERE status IN (?, ?) AND visible_at <= ?",
+                (QUEUED, LEASED, time.time()),
+            ).fetchone()[0]
+        stats = {state: counts.get(state, 0) for state in STATES}
+        stats["visible"] = visible
+        return stats
+
+    def pending(self) -> int:
+        """Jobs not finished yet (queued or leased)."""
+        stats = self.stats()
+        return stats[QUEUED] + stats[LEASED]
+
+    def failed(self, limit: int = 20) -> List[Tuple[str, str]]:
+        """(story_id, last error) of the most recently failed jobs."""
+        with self._lock:
+            return self._get_conn().execute(
+                "SELECT story_id, error FROM Enrichment_Jobs WHERE status = ? ORDER BY updated_at DESC LIMIT ?",
+                (FAILED, limit),
+            ).fetchall()
+
+
+# Global instance used by the ingestion worker (producer) and the enrichment workers
+job_queue = JobQueue()
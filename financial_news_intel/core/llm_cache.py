@@ -0,0 +1,257 @@
+# financial_news_intel/core/llm_cache.py
+
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+from financial_news_intel.core.config import LLM_CACHE_ENABLED, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS
+
+STAT_COLUMNS = ("hits", "misses", "expired", "writes", "evictions")
+
+
+class LLMResponseCache:
+    """
+    Persistent cache of parsed (structured) LLM outputs, shared by the agents.
+
+    Entries are keyed by (namespace, model, temperature, prompt-template version, hash of the
+    rendered inputs), so bumping an agent's template version invalidates its entries
+    automatically. Entries expire after ttl_seconds and the least recently used entries are
+    evicted above max_entries. Hit/miss counters are persisted per namespace so other
+    processes (API, CLI) can read them.
+
+    Several enrichment threads and processes share the cache file (WAL, waiting on locks). A
+    lookup only reads: its counters and the access time of a hit are kept in memory and
+    written with the next put (or flush, at the latest at exit). The cache never fails a
+    story: a database error on lookup is a miss and on put a skipped write, with a warning.
+    """
+    def __init__(
+        self,
+        db_path: str = LLM_CACHE_PATH,
+        ttl_seconds: int = LLM_CACHE_TTL_SECONDS,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        enabled: bool = LLM_CACHE_ENABLED,
+    ):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._entry_count = 0
+        self._purged_namespaces = set()
+        # Not yet persisted: counter increments per namespace and last access time per hit key
+        self._pending_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(STAT_COLUMNS, 0))
+        self._pending_access: Dict[str, float] = {}
+        atexit.register(self.flush)
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """
+        Opens the cache DB lazily, so importing an agent does not create the file (once per
+        process: a forked worker gets its own connection).
+        """
+        if self._conn is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            # Other processes write the cache too; wait for their locks instead of failing
+            self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL;")
+            with self._conn:
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS LLM_Cache (
+                        cache_key TEXT PRIMARY KEY,
+                        namespace TEXT NOT NULL,
+                        template_version TEXT NOT NULL,
+                        model TEXT NOT NULL,
+                        payload TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        last_access REAL NOT NULL
+                    );
+                """)
+                self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON LLM_Cache (last_access);")
+                self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_namespace ON LLM_Cache (namespace, template_version);")
+                self._conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS LLM_Cache_Stats (
+                        namespace TEXT PRIMARY KEY,
+                        {", ".join(f"{c} INTEGER NOT NULL DEFAULT 0" for c in STAT_COLUMNS)}
+                    );
+                """)
+            self._entry_count = self._conn.execute("SELECT COUNT(*) FROM LLM_Cache").fetchone()[0]
+        return self._conn
+
+    @staticmethod
+    def make_key(namespace: str, model: str, temperature: float, template_version: str, inputs: Any) -> str:
+        """Fingerprint of everything that determines the LLM output."""
+        rendered = json.dumps(
+            [namespace, model, float(temperature), template_version, inputs],
+            sort_keys=True, ensure_ascii=False, default=str,
+        )
+        return hashlib.sha256(rendered.encode("utf-8")).hexdigest()
+
+    def _bump(self, namespace: str, stat: str, amount: int = 1):
+        """Counts in memory (under the lock); persisted by _write_pending."""
+        self._pending_stats[namespace][stat] += amount
+
+    def _write_pending(self, conn: sqlite3.Connection):
+        """Writes the pending counters and hit access times in the caller's transaction."""
+        for namespace, counters in self._pending_stats.items():
+            amounts = [counters[c] for c in STAT_COLUMNS]
+            if not any(amounts):
+                continue
+            conn.execute(
+                f"INSERT INTO LLM_Cache_Stats (namespace, {', '.join(STAT_COLUMNS)}) "
+                f"VALUES (?, {', '.join('?' * len(STAT_COLUMNS))}) ON CONFLICT (namespace) DO UPDATE SET "
+                + ", ".join(f"{c} = {c} + excluded.{c}" for c in STAT_COLUMNS),
+                (namespace, *amounts),
+            )
+        conn.executemany(
+            "UPDATE LLM_Cache SET last_access = MAX(last_access, ?) WHERE cache_key = ?",
+            [(accessed, key) for key, accessed in self._pending_access.items()],
+        )
+
+    def _clear_pending(self):
+        self._pending_stats.clear()
+        self._pending_access.clear()
+
+    def _purge_stale_versions(self, conn: sqlite3.Connection, namespace: str, template_version: str):
+        """Drops entries written by older prompt-template versions of a namespace (once per process)."""
+        if namespace in self._purged_namespaces:
+            return
+        removed = conn.execute(
+            "DELETE FROM LLM_Cache WHERE namespace = ? AND template_version != ?", (namespace, template_version)
+        ).rowcount
+        self._entry_count -= removed
+        self._purged_namespaces.add(namespace)
+
+    def get(self, namespace: str, model: str, temperature: float, template_version: str, inputs: Any) -> Optional[Any]:
+        """Returns the cached parsed output, or None on a miss (read-only; see the class docstring)."""
+        if not self.enabled:
+            return None
+
+        key = self.make_key(namespace, model, temperature, template_version, inputs)
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._get_conn().execute(
+                    "SELECT payload, created_at FROM LLM_Cache WHERE cache_key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                print(f"WARNING: LLM cache lookup failed, treating it as a miss: {e}")
+                row = None
+
+            if row is None:
+                self._bump(namespace, "misses")
+                return None
+            payload, created_at = row
+            # An expired entry is left for put to replace or evict
+            if now - created_at > self.ttl_seconds:
+                self._bump(namespace, "expired")
+                self._bump(namespace, "misses")
+                return None
+
+            self._pending_access[key] = now
+            self._bump(namespace, "hits")
+        return json.loads(payload)
+
+    def put(self, namespace: str, model: str, temperature: float, template_version: str, inputs: Any, value: Any):
+        """
+        Stores a parsed output (must be JSON-serializable) and enforces the size limit, in one
+        transaction with the pending counters. A failed write is skipped with a warning.
+        """
+        if not self.enabled:
+            return
+
+        key = self.make_key(namespace, model, temperature, template_version, inputs)
+        now = time.time()
+        payload = json.dumps(value, ensure_ascii=False, default=str)
+        with self._lock:
+            entry_count, purged = self._entry_count, set(self._purged_namespaces)
+            counters = dict(self._pending_stats[namespace])
+            self._bump(namespace, "writes")
+            try:
+                conn = self._get_conn()
+                with conn:
+                    self._purge_stale_versions(conn, namespace, template_version)
+                    exists = conn.execute("SELECT 1 FROM LLM_Cache WHERE cache_key = ?", (key,)).fetchone()
+                    conn.execute(
+                        "INSERT OR REPLACE INTO LLM_Cache (cache_key, namespace, template_version, model, payload, created_at, last_access) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (key, namespace, template_version, model, payload, now, now),
+                    )
+                    if not exists:
+                        self._entry_count += 1
+
+                    if self._entry_count > self.max_entries:
+                        # Evict expired entries first, then the least recently used ones
+                        evicted = conn.execute("DELETE FROM LLM_Cache WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+                        self._entry_count = conn.execute("SELECT COUNT(*) FROM LLM_Cache").fetchone()[0]
+                        overflow = self._entry_count - self.max_entries
+                        if overflow > 0:
+                            evicted += conn.execute(
+                                "DELETE FROM LLM_Cache WHERE cache_key IN "
+                                "(SELECT cache_key FROM LLM_Cache ORDER BY last_access LIMIT ?)",
+                                (overflow,),
+                            ).rowcount
+                            self._entry_count -= overflow
+                        self._bump(namespace, "evictions", evicted)
+                    self._write_pending(conn)
+            except sqlite3.Error as e:
+                # Rolled back: the entry is not cached and the counters stay pending
+                self._entry_count, self._purged_namespaces = entry_count, purged
+                self._pending_stats[namespace] = counters
+                print(f"WARNING: LLM cache write skipped: {e}")
+                return
+            self._clear_pending()
+
+    def flush(self):
+        """Persists the pending counters and access times (done by put, and at exit)."""
+        with self._lock:
+            if not self._pending_access and not any(any(c.values()) for c in self._pending_stats.values()):
+                return
+            try:
+                conn = self._get_conn()
+                with conn:
+                    self._write_pending(conn)
+            except sqlite3.Error as e:
+                print(f"WARNING: LLM cache statistics not saved: {e}")
+                return
+            self._clear_pending()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns persisted per-namespace counters (plus this process's pending ones), totals and
+        the current entry count.
+        """
+        with self._lock:
+            conn = self._get_conn()
+            rows = conn.execute(f"SELECT namespace, {', '.join(STAT_COLUMNS)} FROM LLM_Cache_Stats").fetchall()
+            entries = conn.execute("SELECT COUNT(*) FROM LLM_Cache").fetchone()[0]
+            namespaces = {row[0]: dict(zip(STAT_COLUMNS, row[1:])) for row in rows}
+            for namespace, pending in self._pending_stats.items():
+                counters = namespaces.setdefault(namespace, dict.fromkeys(STAT_COLUMNS, 0))
+                for c in STAT_COLUMNS:
+                    counters[c] += pending[c]
+
+        totals = {c: sum(ns[c] for ns in namespaces.values()) for c in STAT_COLUMNS}
+        for counters in list(namespaces.values()) + [totals]:
+            lookups = counters["hits"] + counters["misses"]
+            counters["hit_rate"] = counters["hits"] / lookups if lookups else 0.0
+        return {"enabled": self.enabled, "entries": entries, "totals": totals, "namespaces": namespaces}
+
+    def clear(self):
+        """Removes all cached entries (statistics are kept)."""
+        with self._lock:
+            conn = self._get_conn()
+            with conn:
+                conn.execute("DELETE FROM LLM_Cache")
+            self._entry_count = 0
+            self._pending_access.clear()
+
+
+# Global instance shared by all agents
+llm_cache = LLMResponseCache()
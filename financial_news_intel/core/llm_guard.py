@@ -0,0 +1,316 @@
+# financial_news_intel/core/llm_guard.py
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import httpx
+
+from financial_news_intel.core.config import (
+    LLM_GUARD_ENABLED, LLM_MAX_RETRIES, LLM_RETRY_BASE_DELAY, LLM_RETRY_MAX_DELAY,
+    LLM_AIMD_MIN_CONCURRENCY, LLM_AIMD_MAX_CONCURRENCY, LLM_AIMD_LATENCY_TOLERANCE, LLM_AIMD_BACKOFF,
+    LLM_BREAKER_FAILURE_THRESHOLD, LLM_BREAKER_COOLDOWN_SECONDS, LLM_RETRY_QUEUE_MAX_ATTEMPTS,
+)
+from financial_news_intel.core.story_ledger import StoryLedger, story_ledger
+
+
+class LLMUnavailableError(Exception):
+    """The LLM backend is unhealthy (circuit open or retries exhausted); the story should be retried later."""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Raised without calling the backend while the circuit breaker is open."""
+
+
+def _model_name(runnable) -> Optional[str]:
+    """The model a runnable (chat model, binding or chain ending in one) calls, if it can be told."""
+    while runnable is not None:
+        model = getattr(runnable, "model", None)
+        if isinstance(model, str):
+            return model
+        runnable = getattr(runnable, "bound", None) or getattr(runnable, "last", None)
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Backend trouble (timeouts, connection errors, HTTP 429/5xx) is retried; anything else
+    (e.g. a malformed model answer) is a content error and is returned to the caller at once.
+    """
+    if isinstance(error, (httpx.TimeoutException, httpx.TransportError, ConnectionError, TimeoutError)):
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+class AIMDLimiter:
+    """
+    Adaptive concurrency limit for LLM calls (additive increase, multiplicative decrease).
+    A call slower than LLM_AIMD_LATENCY_TOLERANCE x the baseline (the median recent call) or
+    a backend error shrinks the limit by LLM_AIMD_BACKOFF; each fast call grows it by 1/limit,
+    i.e. by about one slot per limit's worth of successful calls. The baseline is kept per model
+    (key), since a large model tier is legitimately slower than a small one.
+    """
+    def __init__(
+        self,
+        min_limit: int = LLM_AIMD_MIN_CONCURRENCY,
+        max_limit: int = LLM_AIMD_MAX_CONCURRENCY,
+        tolerance: float = LLM_AIMD_LATENCY_TOLERANCE,
+        backoff: float = LLM_AIMD_BACKOFF,
+        window: int = 100,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self.window = window
+        self._latencies: Dict[Optional[str], Deque[float]] = {}
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= max(self.min_limit, int(self.limit)):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency: Optional[float], overloaded: bool = False, key: Optional[str] = None):
+        with self._condition:
+            self.in_flight -= 1
+            if overloaded:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+            elif latency is not None:
+                latencies = self._latencies.setdefault(key, deque(maxlen=self.window))
+                # The median, not the minimum: normal variance of LLM latency must not shrink the limit
+                baseline = sorted(latencies)[len(latencies) // 2] if latencies else latency
+                latencies.append(latency)
+                if latency > self.tolerance * baseline:
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                else:
+                    self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._condition.notify_all()
+
+
+class CircuitBreaker:
+    """
+    CLOSED -> OPEN after LLM_BREAKER_FAILURE_THRESHOLD consecutive backend failures;
+    OPEN fails calls immediately for LLM_BREAKER_COOLDOWN_SECONDS, then HALF_OPEN lets a single
+    probe call through: success closes the circuit, failure opens it again.
+    """
+    def __init__(
+        self,
+        failure_threshold: int = LLM_BREAKER_FAILURE_THRESHOLD,
+        cooldown_seconds: float = LLM_BREAKER_COOLDOWN_SECONDS,
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = "CLOSED"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "OPEN" and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+                self.state = "HALF_OPEN"
+            if self.state == "CLOSED":
+                return True
+            if self.state == "HALF_OPEN" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return self.state == "OPEN" and time.monotonic() - self.opened_at < self.cooldown_seconds
+
+    def record_success(self):
+        with self._lock:
+            self.state = "CLOSED"
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == "HALF_OPEN" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "OPEN":
+                    self.trips += 1
+                    print(f"WARNING: LLM circuit breaker OPEN after {self.consecutive_failures} failures; "
+                          f"failing fast for {self.cooldown_seconds:.0f}s")
+                self.state = "OPEN"
+                self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+
+class LLMCallGuard:
+    """
+    Wrapper shared by all agents for LLM calls: circuit breaker, AIMD concurrency limit,
+    and retries with exponential backoff and full jitter for backend errors. The per-call
+    timeout is the HTTP timeout of the shared Ollama client (OLLAMA_REQUEST_TIMEOUT).
+    """
+    def __init__(
+        self,
+        enabled: bool = LLM_GUARD_ENABLED,
+        max_retries: int = LLM_MAX_RETRIES,
+        base_delay: float = LLM_RETRY_BASE_DELAY,
+        max_delay: float = LLM_RETRY_MAX_DELAY,
+        limiter: Optional[AIMDLimiter] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.enabled = enabled
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.limiter = limiter or AIMDLimiter()
+        self.breaker = breaker or CircuitBreaker()
+        self._rng = random.Random()
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "succeeded": 0, "retries": 0, "failed": 0, "rejected": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def call(self, fn: Callable[..., Any], *args, model: Optional[str] = None, **kwargs) -> Any:
+        """Runs fn(*args, **kwargs) (one LLM request to model) under the guard."""
+        if not self.enabled:
+            return fn(*args, **kwargs)
+
+        self._count("calls")
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                self._count("rejected")
+                raise CircuitOpenError("LLM circuit breaker is open")
+
+            self.limiter.acquire()
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                retryable = is_retryable(e)
+                self.limiter.release(None, overloaded=retryable)
+                if not retryable:
+                    # The backend answered; the content was the problem
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    self._count("failed")
+                    raise LLMUnavailableError(f"LLM call failed after {attempt + 1} attempts: {e}") from e
+                self._count("retries")
+                # Full jitter: spreads the retries of concurrent workers apart
+                delay = self._rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                print(f"WARNING: LLM call failed ({e}); retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+                time.sleep(delay)
+            else:
+                self.limiter.release(time.perf_counter() - start, key=model)
+                self.breaker.record_success()
+                self._count("succeeded")
+                return result
+
+    def invoke(self, runnable, inputs, **kwargs) -> Any:
+        """runnable.invoke(inputs) under the guard (for LangChain chains and models)."""
+        return self.call(runnable.invoke, inputs, model=_model_name(runnable), **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+        counters.update(
+            concurrency_limit=round(self.limiter.limit, 2),
+            in_flight=self.limiter.in_flight,
+            breaker_state=self.breaker.state,
+            breaker_trips=self.breaker.trips,
+        )
+        return counters
+
+    def summary(self) -> str:
+        s = self.stats()
+        return (
+            f"LLM calls: {s['succeeded']}/{s['calls']} ok, {s['retries']} retries, {s['failed']} failed, "
+            f"{s['rejected']} rejected by breaker ({s['breaker_state']}, {s['breaker_trips']} trips), "
+            f"concurrency limit {s['concurrency_limit']}"
+        )
+
+
+class RetryQueue:
+    """
+    Stories whose enrichment was deferred because the LLM backend was unavailable.
+    They are already indexed for deduplication, so without this queue they would be lost.
+    Drained at the start of the next batch once the circuit breaker lets calls through.
+    With a story ledger, the queue is persisted and reloaded after a restart.
+    """
+    def __init__(self, max_attempts: int = LLM_RETRY_QUEUE_MAX_ATTEMPTS, ledger: Optional[StoryLedger] = None):
+        self.max_attempts = max_attempts
+        self.ledger = ledger
+        self._items: Dict[str, Any] = {}
+        self._attempts: Dict[str, int] = {}
+        self._loaded = ledger is None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Stories deferred before a restart (read once, on first use)."""
+        if not self._loaded:
+            self._loaded = True
+            for story, attempts in self.ledger.deferred():
+                self._items.setdefault(story.unique_story_id, story)
+                self._attempts.setdefault(story.unique_story_id, attempts)
+            if self._items:
+                print(f"LLM retry queue: reloaded {len(self._items)} deferred stories from the story ledger")
+
+    def add(self, story, reason: str) -> bool:
+        """Queues the story; False when it has used up its attempts (it is dropped)."""
+        with self._lock:
+            self._load()
+            attempts = self._attempts.get(story.unique_story_id, 0) + 1
+            if attempts > self.max_attempts:
+                self._attempts.pop(story.unique_story_id, None)
+                if self.ledger is not None:
+                    self.ledger.mark_failed(story.unique_story_id, f"Dropped after {self.max_attempts} deferred attempts: {reason}")
+                print(f"ERROR: Story {story.unique_story_id[:8]} dropped after {self.max_attempts} deferred attempts: {reason}")
+                return False
+            self._attempts[story.unique_story_id] = attempts
+            self._items[story.unique_story_id] = story
+            if self.ledger is not None:
+                self.ledger.defer(story, attempts, reason)
+        print(f"  -> Story {story.unique_story_id[:8]} deferred to the LLM retry queue (attempt {attempts}): {reason}")
+        return True
+
+    def drain(self, breaker: Optional[CircuitBreaker] = None) -> List[Any]:
+        """All queued stories, unless the breaker is still open (then nothing)."""
+        if breaker is not None and breaker.is_open():
+            return []
+        with self._lock:
+            self._load()
+            stories = list(self._items.values())
+            self._items.clear()
+        return stories
+
+    def done(self, story_id: str):
+        with self._lock:
+            self._attempts.pop(story_id, None)
+
+    def discard(self, story_id: str):
+        """Takes a deferred story back out of this process's queue (its retry is handled elsewhere)."""
+        with self._lock:
+            self._items.pop(story_id, None)
+            self._attempts.pop(story_id, None)
+
+    def __contains__(self, story_id: str) -> bool:
+        with self._lock:
+            return story_id in self._items
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load()
+            return len(self._items)
+
+
+# Global instances shared by all agents and worker threads
+llm_guard = LLMCallGuard()
+llm_retry_queue = RetryQueue(ledger=story_ledger)
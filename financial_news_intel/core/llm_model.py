@@ -1,21 +1,182 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
 from langchain_ollama import ChatOllama
 from langchain_core.language_models import BaseChatModel # Correct Type Hinting
-from .config import OLLAMA_MODEL_NAME, OLLAMA_BASE_URL 
+from .config import (
+    OLLAMA_MODEL_NAME, OLLAMA_BASE_URL, OLLAMA_KEEP_ALIVE, OLLAMA_NUM_CTX,
+    OLLAMA_REQUEST_TIMEOUT, OLLAMA_CONNECT_TIMEOUT, ENRICHMENT_CONCURRENCY,
+    MODEL_TIERS, AGENT_MODEL_TIERS, MODEL_ESCALATION_ENABLED,
+)
 
 class LLMService:
     """
     A singleton class to manage the Ollama LLM connection instance.
     Switched to ChatOllama for Pydantic/Tool binding compatibility.
+
+    All clients handed out share one keep-alive HTTP connection pool to Ollama, and request
+    that the model stays loaded (keep_alive) with a fixed context window (num_ctx), so no
+    per-story reload or connection setup happens.
+
+    It is also the registry of named model tiers (MODEL_TIERS, smallest first): each agent
+    starts on its tier from AGENT_MODEL_TIERS, and route() escalates a call to the next
+    larger tier when the answer fails validation or has low confidence.
     """
-    def __init__(self, model_name: str = OLLAMA_MODEL_NAME, base_url: str = OLLAMA_BASE_URL):
+    def __init__(
+        self,
+        model_name: str = OLLAMA_MODEL_NAME,
+        base_url: str = OLLAMA_BASE_URL,
+        keep_alive: str = OLLAMA_KEEP_ALIVE,
+        num_ctx: Optional[int] = OLLAMA_NUM_CTX,
+        tiers: Dict[str, str] = MODEL_TIERS,
+        agent_tiers: Dict[str, str] = AGENT_MODEL_TIERS,
+        escalation: bool = MODEL_ESCALATION_ENABLED,
+    ):
         # Initialize the ChatOllama client
         # We use a low temperature here as most agent/tool use benefits from deterministic output.
-        self._llm = ChatOllama(model=model_name, base_url=base_url, temperature=0.0) 
-        print(f"ChatOllama client initialized: Model='{model_name}', URL='{base_url}'")
+        self.model_name = model_name
+        self.temperature = 0.0
+        # Enough pooled connections for the concurrent enrichment workers (entity + impact calls)
+        pool_limits = httpx.Limits(
+            max_connections=2 * ENRICHMENT_CONCURRENCY + 2,
+            max_keepalive_connections=2 * ENRICHMENT_CONCURRENCY + 2,
+        )
+        self._llm = ChatOllama(
+            model=model_name,
+            base_url=base_url,
+            temperature=self.temperature,
+            keep_alive=keep_alive,
+            num_ctx=num_ctx,
+            sync_client_kwargs={
+                "limits": pool_limits,
+                # Per-call timeout; retries and circuit breaking are done by core/llm_guard.py
+                "timeout": httpx.Timeout(OLLAMA_REQUEST_TIMEOUT, connect=OLLAMA_CONNECT_TIMEOUT),
+            },
+        )
+        self._variants: Dict[Tuple[Optional[str], float], BaseChatModel] = {(None, self.temperature): self._llm}
+
+        self.agent_tiers = dict(agent_tiers)
+        self.escalation = escalation
+        self.tiers: Dict[str, str] = {}
+        for name, tier_model in tiers.items():
+            self.register(name, tier_model)
+
+        self._lock = threading.Lock()
+        self.tier_counters: Dict[str, Dict[str, float]] = {}
+        self.escalations: Dict[str, int] = {}
+        print(f"ChatOllama client initialized: Model='{model_name}', URL='{base_url}', keep_alive='{keep_alive}', num_ctx={num_ctx}")
+        if len(set(self.tiers.values())) > 1:
+            print(f"Model tiers: {self.tiers}; agents: {self.agent_tiers}")
+
+    def register(self, name: str, model_name: str):
+        """Registers (or replaces) a named model tier; tiers escalate in registration order."""
+        self.tiers[name] = model_name
+        for key in [key for key in self._variants if key[0] == name]:
+            del self._variants[key]
+
+    def get_llm(self, temperature: Optional[float] = None, tier: Optional[str] = None) -> BaseChatModel:
+        """
+        Returns the configured ChatOllama LLM instance, or the client of a named tier.
+        A different temperature or tier returns a (cached) copy that reuses the same HTTP client.
+        """
+        if temperature is None:
+            temperature = self.temperature
+        key = (tier, temperature)
+        if key not in self._variants:
+            update = {"temperature": temperature}
+            if tier is not None:
+                update["model"] = self.tiers[tier]
+            # Shallow copy: the underlying ollama/httpx client (connection pool) is shared
+            self._variants[key] = self._llm.model_copy(update=update)
+        return self._variants[key]
+
+    # --- Per-agent routing ---
+
+    def tier_for(self, agent: str) -> str:
+        """The tier an agent starts on (unlisted agents and unknown tiers use the largest tier)."""
+        tier = self.agent_tiers.get(agent)
+        return tier if tier in self.tiers else list(self.tiers)[-1]
+
+    def model_name_for(self, agent: str) -> str:
+        return self.tiers[self.tier_for(agent)]
+
+    def escalation_path(self, agent: str) -> List[str]:
+        """The agent's tier followed by the larger tiers that run a different model."""
+        names = list(self.tiers)
+        path = [self.tier_for(agent)]
+        if self.escalation:
+            for name in names[names.index(path[0]) + 1:]:
+                if self.tiers[name] != self.tiers[path[-1]]:
+                    path.append(name)
+        return path
+
+    def route(
+        self,
+        agent: str,
+        call: Callable[[str, bool], Any],
+        accept: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """
+        Runs call(tier, final) on the agent's tier. When it raises ValueError/TypeError (the
+        answer failed validation) or accept(result) is False (low confidence), the call is
+        repeated on the next tier of the escalation path; on the last tier the result (or the
+        error) is returned as is. final tells the call whether escalation is still possible,
+        so it can skip its own re-asks on a tier that will be escalated from anyway.
+        """
+        path = self.escalation_path(agent)
+        for i, tier in enumerate(path):
+            final = i == len(path) - 1
+            start = time.perf_counter()
+            try:
+                result = call(tier, final)
+            except (ValueError, TypeError) as e:
+                self._record(tier, time.perf_counter() - start)
+                if final:
+                    raise
+                self._escalate(agent, tier, path[i + 1], f"invalid answer ({e})")
+                continue
+            self._record(tier, time.perf_counter() - start)
+            if final or accept is None or accept(result):
+                return result
+            self._escalate(agent, tier, path[i + 1], "low confidence")
+
+    def _record(self, tier: str, seconds: float):
+        with self._lock:
+            counters = self.tier_counters.setdefault(tier, {"calls": 0, "seconds": 0.0})
+            counters["calls"] += 1
+            counters["seconds"] += seconds
+
+    def _escalate(self, agent: str, tier: str, next_tier: str, reason: str):
+        with self._lock:
+            self.escalations[agent] = self.escalations.get(agent, 0) + 1
+        print(f"  -> {agent}: escalating from {tier} ({self.tiers[tier]}) to {next_tier} ({self.tiers[next_tier]}): {reason[:200]}")
+
+    def tier_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            tiers = {
+                name: {
+                    "model": self.tiers.get(name),
+                    "calls": int(counters["calls"]),
+                    "avg_seconds": round(counters["seconds"] / counters["calls"], 3) if counters["calls"] else 0.0,
+                }
+                for name, counters in self.tier_counters.items()
+            }
+            return {"tiers": tiers, "escalations": dict(self.escalations)}
+
+    def reset_stats(self):
+        with self._lock:
+            self.tier_counters = {}
+            self.escalations = {}
 
-    def get_llm(self) -> BaseChatModel:
-        """Returns the configured ChatOllama LLM instance."""
-        return self._llm
+    def summary(self) -> str:
+        stats = self.tier_stats()
+        tiers = ", ".join(
+            f"{name} ({s['model']}): {s['calls']} calls, {s['avg_seconds']:.2f}s avg" for name, s in stats["tiers"].items()
+        )
+        escalations = ", ".join(f"{agent} {count}" for agent, count in stats["escalations"].items()) or "none"
+        return f"Model tiers: {tiers or 'no calls'}; escalations: {escalations}"
 
 # Global instance for easy import across all agents
-llm_service = LLMService()
\ No newline at end of file
+llm_service = LLMService()
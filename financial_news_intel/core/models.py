@@ -1,4 +1,4 @@
-from pydantic.v1 import BaseModel, Field
+from pydantic.v1 import BaseModel, Field, validator
 from typing import List, Dict, Optional, Any
 from enum import Enum # <-- NEW: Import Enum
 import uuid
@@ -49,6 +49,29 @@ class ImpactedStockList(BaseModel):
     impacts: List[ImpactedStock] = Field(description="A list of all resolved stock and sector impacts from the story.")
 
 
+class StoryImpactResult(BaseModel):
+    """The impacts of one story inside a multi-story (batched) impact response."""
+    story_id: str = Field(description="The STORY ID exactly as given in the prompt.")
+    impacts: List[ImpactedStock] = Field(description="A list of all resolved stock and sector impacts from this story.")
+
+
+class StoryImpactBatch(BaseModel):
+    """Structured output of a batched impact request: one result per story, keyed by story ID."""
+    results: List[StoryImpactResult] = Field(description="One entry per story in the request.")
+
+
+class TickerMatch(BaseModel):
+    """A company name resolved to a ticker by the deterministic resolver (core/ticker_resolver.py)."""
+    company_name: str                   # The name as given (or as found in the text)
+    stock_ticker: str
+    official_name: str
+    sector: Optional[str] = None
+    exchange: Optional[str] = None
+    matched_alias: str                  # Normalized alias that matched
+    method: str                         # 'exact', 'fuzzy' or 'text'
+    score: float = 1.0
+
+
 class ExtractedEntity(BaseModel):
     """Structured container for all entities extracted from the news story."""
     companies: List[str] = Field(default_factory=list)
@@ -57,6 +80,25 @@ class ExtractedEntity(BaseModel):
     people: List[str] = Field(default_factory=list)
     events: List[str] = Field(default_factory=list)
 
+class SentimentLabel(str, Enum):
+    """Overall sentiment of a story, as assigned by the Entity Extraction Agent."""
+    POSITIVE = "Positive"
+    NEGATIVE = "Negative"
+    NEUTRAL = "Neutral"
+
+
+class EntitySentimentExtraction(ExtractedEntity):
+    """Combined structured output: entities and overall sentiment from a single LLM call."""
+    sentiment: SentimentLabel = Field(description="The overall financial sentiment of the story: 'Positive', 'Negative' or 'Neutral'.")
+
+    @validator("sentiment", pre=True)
+    def _normalize_sentiment(cls, value):
+        # Accept 'POSITIVE', 'positive', '"Positive"' etc.
+        if isinstance(value, str):
+            return value.strip().strip("'\".").capitalize()
+        return value
+
+
 class ConsolidatedStory(BaseModel):
     """The final, unique, and processed news item."""
     unique_story_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -67,6 +109,12 @@ class ConsolidatedStory(BaseModel):
     # FIELD CHANGE: Updated to use the new ImpactedStock schema
     impacted_stocks: List[ImpactedStock] = Field(default_factory=list) 
     sentiment: Optional[str] = None
+    # Earliest publication time of the source articles (UTC, see core/timestamps.py)
+    published_at: Optional[str] = None
+    # Set by the NER pre-pass: False when the story has no ORG/GPE/MONEY entities (impact analysis is skipped)
+    market_relevant: Optional[bool] = None
+    # Embedding computed by the Deduplication Agent; reused by the local sentiment classifier (not stored)
+    embedding: Optional[List[float]] = Field(None, exclude=True)
 
     db_id: Optional[str] = Field(None, description="The primary key of this story in the Structured DB.")
     vector_id: Optional[str] = Field(None, description="The ID of this document in the Vector DB (Chroma).")
@@ -85,6 +133,10 @@ class FinancialNewsState(BaseModel):
 
     # 3. Processing Pipeline (used to process one unique story group at a time)
     current_story: Optional[ConsolidatedStory] = Field(None, description="The structured data for the story currently being processed.")
+    # Stories enriched by the batch enrichment node, awaiting storage
+    enriched_stories: List[ConsolidatedStory] = Field(default_factory=list, description="Enriched stories awaiting the batch storage node.")
+    # Stories that failed enrichment or storage in this batch (story id -> error)
+    story_errors: Dict[str, str] = Field(default_factory=dict, description="Per-story failures; they do not abort the batch.")
 
     # Error/Status Handling & Metrics
     status: str = Field("INITIALIZED", description="Current stage (e.g., 'INGESTING', 'DEDUPLICATING', 'COMPLETED').")
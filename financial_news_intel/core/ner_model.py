@@ -1,12 +1,13 @@
 # financial_news_intel/core/ner_model.py
 
-import spacy
-from spacy.language import Language
-from typing import List, Dict, Any, Optional
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
+
+if TYPE_CHECKING:
+    from spacy.language import Language
 
 # --- IMPORTANT CHANGE ---
 # Import the model name from the central configuration file
-from .config import SPACY_MODEL_NAME
+from .config import SPACY_MODEL_NAME, NER_BATCH_SIZE, NER_N_PROCESS
 # --- END CHANGE ---
 
 
@@ -14,14 +15,30 @@ class NERModel:
     """
     A singleton class to manage the spaCy language model instance.
     This ensures the large model is loaded only once at startup.
+    spaCy is imported on first use, so the pipeline runs (without the NER pre-pass) where
+    spaCy or its model is not installed; a failed load is not retried.
     """
     def __init__(self, model_name: str = SPACY_MODEL_NAME):
         self.model_name = model_name
-        self._nlp: Optional[Language] = None
+        self._nlp: Optional["Language"] = None
+        self._error: Optional[str] = None
+
+    @property
+    def available(self) -> bool:
+        """False once loading spaCy or its model failed."""
+        return self._error is None
 
-    def get_nlp(self) -> Language:
-        """Loads and returns the spaCy NLP pipeline."""
+    def get_nlp(self) -> "Language":
+        """Loads and returns the spaCy NLP pipeline; raises RuntimeError if it is unavailable."""
+        if self._error is not None:
+            raise RuntimeError(self._error)
         if self._nlp is None:
+            try:
+                import spacy
+            except ImportError as e:
+                self._error = f"spaCy is not installed ({e})"
+                print(f"WARNING: {self._error}; the NER pre-pass is disabled.")
+                raise RuntimeError(self._error) from e
             try:
                 print(f"Loading spaCy NER model: {self.model_name}...")
                 # Disable unnecessary pipeline components for faster loading/processing
@@ -30,26 +47,22 @@ class NERModel:
                     disable=["parser", "tagger", "attribute_ruler", "lemmatizer"]
                 )
                 print("spaCy NER model loaded.")
-            except OSError:
+            except OSError as e:
                 # Reminder for the user if they forgot the download step
                 print(f"Error: spaCy model '{self.model_name}' not found. Did you run:")
                 print("    python -m spacy download en_core_web_md")
-                raise
+                self._error = f"spaCy model '{self.model_name}' not found"
+                raise RuntimeError(self._error) from e
         return self._nlp
 
 # Global instance for easy import across agents
 ner_model = NERModel()
 
-def extract_entities(text: str) -> List[Dict[str, str]]:
-    """
-    Extracts relevant Named Entities from a given text.
-    """
-    nlp = ner_model.get_nlp()
-    doc = nlp(text)
-    
-    # Entity types most relevant to financial news
-    FINANCIAL_ENTITY_LABELS = {"ORG", "GPE", "PERSON", "NORP", "LOC", "PRODUCT", "MONEY"}
-    
+# Entity types most relevant to financial news
+FINANCIAL_ENTITY_LABELS = {"ORG", "GPE", "PERSON", "NORP", "LOC", "PRODUCT", "MONEY"}
+
+
+def _doc_entities(doc) -> List[Dict[str, str]]:
     entities = []
     for ent in doc.ents:
         if ent.label_ in FINANCIAL_ENTITY_LABELS:
@@ -58,4 +71,27 @@ def extract_entities(text: str) -> List[Dict[str, str]]:
                 "label": ent.label_
             })
             
-    return entities
\ No newline at end of file
+    return entities
+
+
+def extract_entities(text: str) -> List[Dict[str, str]]:
+    """
+    Extracts relevant Named Entities from a given text.
+    """
+    nlp = ner_model.get_nlp()
+    return _doc_entities(nlp(text))
+
+
+def extract_entities_batch(
+    texts: List[str],
+    n_process: int = NER_N_PROCESS,
+    batch_size: int = NER_BATCH_SIZE,
+) -> List[List[Dict[str, str]]]:
+    """
+    Extracts Named Entities from many texts with nlp.pipe (batched, optionally multi-process).
+    Returns one entity list per input text, in input order.
+    """
+    if not texts:
+        return []
+    nlp = ner_model.get_nlp()
+    return [_doc_entities(doc) for doc in nlp.pipe(texts, n_process=n_process, batch_size=batch_size)]
@@ -0,0 +1,231 @@
+# financial_news_intel/core/parquet_export.py
+
+import json
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from financial_news_intel.core.db_service import db_service
+from financial_news_intel.core.timestamps import DB_TIMESTAMP_FORMAT, to_utc_iso
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - only needed when exporting
+    pa = pc = pq = None
+
+# Name of the file (inside the export directory) that remembers the last exported ingested_at
+WATERMARK_FILE = "_watermark.json"
+
+# Rows pulled from SQLite per Arrow record batch; bounds the exporter's memory use
+DEFAULT_BATCH_SIZE = 5000
+
+# Columns of each exported table, with the Arrow type used in the Parquet schema
+STORIES_COLUMNS: List[Tuple[str, str]] = [
+    ("story_id", "string"),
+    ("story_text", "string"),
+    ("sentiment", "string"),
+    ("companies_json", "string"),
+    ("sectors_json", "string"),
+    ("regulators_json", "string"),
+    ("vector_id", "string"),
+    ("published_at", "timestamp"),
+    ("ingested_at", "timestamp"),
+]
+
+IMPACTS_COLUMNS: List[Tuple[str, str]] = [
+    ("impact_id", "int64"),
+    ("story_id", "string"),
+    ("company_name", "string"),
+    ("stock_ticker", "string"),
+    ("impact_direction", "string"),
+    ("confidence", "float64"),
+    ("impact_type", "string"),
+    ("published_at", "timestamp"),
+]
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet export requires pyarrow. Install it with: pip install pyarrow")
+
+
+def _arrow_schema(columns: List[Tuple[str, str]]) -> "pa.Schema":
+    types = {
+        "string": pa.string(),
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "timestamp": pa.timestamp("s", tz="UTC"),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+def _to_record_batch(
+    rows: List[tuple],
+    columns: List[Tuple[str, str]],
+    schema: "pa.Schema",
+    decoders: Optional[Dict[str, Callable[[Any], Any]]] = None,
+) -> "pa.RecordBatch":
+    """Converts a block of SQLite rows into an Arrow record batch (column-wise)."""
+    arrays = []
+    for index, (name, kind) in enumerate(columns):
+        values = [row[index] for row in rows]
+        if decoders and name in decoders:
+            values = [decoders[name](value) for value in values]
+        if kind == "timestamp":
+            # Stored as DB_TIMESTAMP_FORMAT strings; parse vectorized on the Arrow side
+            parsed = pc.strptime(pa.array(values, type=pa.string()), format=DB_TIMESTAMP_FORMAT, unit="s")
+            arrays.append(parsed.cast(schema.field(name).type))
+        else:
+            arrays.append(pa.array(values, type=schema.field(name).type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _iter_row_blocks(query: str, params: List[Any], batch_size: int) -> Iterator[List[tuple]]:
+    """Streams query results from SQLite in blocks of at most batch_size rows."""
+    cursor = db_service.conn.cursor()
+    cursor.execute(query, params)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield rows
+
+
+def _partition_value(published_at: Optional[str]) -> str:
+    return published_at[:10] if published_at else "unknown"
+
+
+def _write_partitioned(
+    table_dir: str,
+    query: str,
+    params: List[Any],
+    columns: List[Tuple[str, str]],
+    batch_size: int,
+    run_id: str,
+    decoders: Optional[Dict[str, Callable[[Any], Any]]] = None,
+) -> int:
+    """
+    Writes the query results to <table_dir>/published_date=YYYY-MM-DD/part-<run_id>.parquet.
+    Rows must arrive ordered by published_at so that only one Parquet writer is open at a time.
+    """
+    schema = _arrow_schema(columns)
+    published_index = [name for name, _ in columns].index("published_at")
+
+    writer = None
+    current_partition = None
+    rows_written = 0
+
+    try:
+        for rows in _iter_row_blocks(query, params, batch_size):
+            # Split the block wherever the partition (publication date) changes
+            start = 0
+            while start < len(rows):
+                partition = _partition_value(rows[start][published_index])
+                end = start
+                while end < len(rows) and _partition_value(rows[end][published_index]) == partition:
+                    end += 1
+
+                if partition != current_partition:
+                    if writer is not None:
+                        writer.close()
+                    partition_dir = os.path.join(table_dir, f"published_date={partition}")
+                    os.makedirs(partition_dir, exist_ok=True)
+                    writer = pq.ParquetWriter(
+                        os.path.join(partition_dir, f"part-{run_id}.parquet"), schema, compression="zstd"
+                    )
+                    current_partition = partition
+
+                writer.write_batch(_to_record_batch(rows[start:end], columns, schema, decoders))
+                rows_written += end - start
+                start = end
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return rows_written
+
+
+def read_watermark(output_dir: str) -> Optional[str]:
+    """Returns the ingested_at watermark of the last export into output_dir, if any."""
+    path = os.path.join(output_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("ingested_at")
+
+
+def _write_watermark(output_dir: str, watermark: str, run_id: str):
+    with open(os.path.join(output_dir, WATERMARK_FILE), "w", encoding="utf-8") as f:
+        json.dump({"ingested_at": watermark, "run_id": run_id}, f, indent=2)
+
+
+def export_to_parquet(
+    output_dir: str,
+    since: Optional[str] = None,
+    incremental: bool = True,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """
+    Streams the Stories and Stock_Impacts tables into a Parquet dataset partitioned by
+    publication date, using Arrow record batches of at most batch_size rows.
+
+    Only stories ingested after the watermark are exported: `since` if given, otherwise the
+    watermark stored by the previous incremental export into output_dir (full export if none).
+    `since` is normalized to the stored UTC format first, since the window compares strings.
+    """
+    low = to_utc_iso(since) if since is not None else None
+    if since is not None and low is None:
+        raise ValueError(f"Cannot parse since timestamp '{since}'")
+    _require_pyarrow()
+    os.makedirs(output_dir, exist_ok=True)
+
+    run_id = uuid.uuid4().hex[:12]
+    if low is None:
+        low = read_watermark(output_dir) if incremental else None
+    # Upper bound one second in the past, so rows still being written in the current
+    # second are picked up by the next export instead of being skipped.
+    high = (datetime.now(timezone.utc) - timedelta(seconds=1)).strftime(DB_TIMESTAMP_FORMAT)
+
+    # Legacy rows without ingested_at are only included in full exports
+    if low:
+        window_sql, window_params = "s.ingested_at > ? AND s.ingested_at <= ?", [low, high]
+    else:
+        window_sql, window_params = "(s.ingested_at IS NULL OR s.ingested_at <= ?)", [high]
+
+    stories_query = f"""
+        SELECT {", ".join(f"s.{name}" for name, _ in STORIES_COLUMNS)}
+        FROM Stories s
+        WHERE {window_sql}
+        ORDER BY s.published_at
+    """
+    impacts_query = f"""
+        SELECT {", ".join(f"i.{name}" for name, _ in IMPACTS_COLUMNS)}
+        FROM Stock_Impacts i
+        JOIN Stories s ON s.story_id = i.story_id
+        WHERE {window_sql}
+        ORDER BY i.published_at
+    """
+
+    stories_written = _write_partitioned(
+        os.path.join(output_dir, "stories"), stories_query, window_params, STORIES_COLUMNS, batch_size, run_id,
+        # story_text may be stored compressed; the export always contains plain text
+        decoders={"story_text": db_service.text_codec.decode},
+    )
+    impacts_written = _write_partitioned(
+        os.path.join(output_dir, "stock_impacts"), impacts_query, window_params, IMPACTS_COLUMNS, batch_size, run_id
+    )
+
+    if incremental:
+        _write_watermark(output_dir, high, run_id)
+
+    print(f"Exported {stories_written} stories and {impacts_written} stock impacts to {output_dir} (run {run_id}).")
+    return {
+        "run_id": run_id,
+        "since": low,
+        "watermark": high,
+        "stories": stories_written,
+        "stock_impacts": impacts_written,
+    }
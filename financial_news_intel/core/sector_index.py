@@ -0,0 +1,152 @@
+# financial_news_intel/core/sector_index.py
+
+import json
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+from financial_news_intel.core.config import SECTOR_INDEX_PATH, SECTOR_EXPANSION_MAX_CONSTITUENTS
+from financial_news_intel.core.models import ImpactedStock, ImpactType
+from financial_news_intel.core.ticker_resolver import TickerResolver, ticker_resolver, normalize_name
+
+# Words around a sector or regulator name that do not change which one is meant
+# ('TECH_SECTOR', 'Banking stocks', 'RBI action', 'Indian pharma companies')
+_QUALIFIERS_BEFORE = {"indian", "india", "domestic", "listed", "all", "the"}
+_QUALIFIERS_AFTER = {
+    "sector", "sectors", "stocks", "shares", "industry", "companies", "space", "index",
+    "action", "actions", "policy", "rules", "norms", "regulation", "regulations", "circular", "wide",
+}
+
+
+class SectorIndex:
+    """
+    Sector -> constituents index over the ticker universe, plus regulator -> sectors.
+    The impact LLM reports one finding per affected sector or regulator; expand() turns each
+    finding into per-ticker ImpactedStock rows for the sector's largest constituents, with the
+    confidence of the impact type's range scaled by the constituent's weight in its sector.
+    A sector without configured weights has equally weighted constituents, each scaled by
+    its 1/N share of the sector.
+    """
+    def __init__(
+        self,
+        config: Dict,
+        resolver: TickerResolver,
+        max_constituents: int = SECTOR_EXPANSION_MAX_CONSTITUENTS,
+    ):
+        self.resolver = resolver
+        self.max_constituents = max_constituents
+        self._aliases: Dict[str, List[str]] = {}                  # normalized alias -> sectors
+        self.constituents: Dict[str, List[Tuple[str, float]]] = {}  # sector -> [(ticker, weight)], heaviest first
+        self.weighted: Set[str] = set()                              # sectors with configured weights
+
+        members: Dict[str, List[str]] = {}
+        for ticker, entry in resolver.companies.items():
+            if entry.get("sector"):
+                members.setdefault(entry["sector"], []).append(ticker)
+
+        sectors = config.get("sectors", {})
+        for sector in list(sectors) + [sector for sector in members if sector not in sectors]:
+            settings = sectors.get(sector, {})
+            weights = settings.get("weights")
+            if weights:
+                unknown = [ticker for ticker in weights if not resolver.is_known_ticker(ticker)]
+                if unknown:
+                    print(f"WARNING: Sector index: {sector} weights name tickers outside the universe: {unknown}")
+                ranked = [(ticker, float(w)) for ticker, w in weights.items() if resolver.is_known_ticker(ticker) and w > 0]
+                self.weighted.add(sector)
+            else:
+                # No configured weights: every company of the sector, equally weighted
+                ranked = [(ticker, 1.0) for ticker in members.get(sector, [])]
+            self.constituents[sector] = sorted(ranked, key=lambda item: -item[1])
+            for alias in [sector] + settings.get("aliases", []):
+                self._add_alias(alias, [sector])
+
+        for regulator, settings in config.get("regulators", {}).items():
+            covered = [sector for sector in settings.get("sectors", []) if sector in self.constituents]
+            for alias in [regulator] + settings.get("aliases", []):
+                self._add_alias(alias, covered)
+
+    def _add_alias(self, alias: str, sectors: List[str]):
+        key = normalize_name(alias)
+        if key and key not in self._aliases:
+            self._aliases[key] = sectors
+
+    @classmethod
+    def from_file(cls, path: str = SECTOR_INDEX_PATH, resolver: TickerResolver = ticker_resolver) -> "SectorIndex":
+        config: Dict = {}
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        else:
+            print(f"WARNING: Sector index not found at {path}; sectors are taken from the ticker universe only.")
+        index = cls(config, resolver)
+        print(f"Sector index loaded {len(index.constituents)} sectors, {len(index._aliases)} sector/regulator names")
+        return index
+
+    def lookup(self, name: str) -> Optional[List[str]]:
+        """
+        Sectors a sector or regulator name stands for, or None when the name is neither.
+        A market-wide regulator (no sectors configured) returns an empty list.
+        """
+        tokens = normalize_name(name or "").split()
+        while tokens:
+            sectors = self._aliases.get(" ".join(tokens))
+            if sectors is not None:
+                return sectors
+            if tokens[-1] in _QUALIFIERS_AFTER:
+                tokens.pop()
+            elif tokens[0] in _QUALIFIERS_BEFORE:
+                tokens.pop(0)
+            else:
+                return None
+        return None
+
+    def expand(
+        self,
+        impacts: List[ImpactedStock],
+        bounds: Dict[ImpactType, Tuple[float, float]],
+    ) -> List[ImpactedStock]:
+        """
+        Replaces each sector/regulatory finding (a sector or regulator name, not a known ticker)
+        by one row per constituent of its sectors, for up to max_constituents of the heaviest
+        constituents not already covered. Confidence is low + (high - low) x weight / heaviest
+        weight in the sector (x 1 / N in a sector of N unweighted constituents), with (low, high)
+        the bounds of the finding's type. Companies with an impact of their own are not
+        repeated; findings that name no known sector (or a market-wide regulator) are kept as
+        they are.
+        """
+        kept: List[ImpactedStock] = []
+        findings: List[Tuple[ImpactedStock, List[str]]] = []
+        for impact in impacts:
+            if impact.type != ImpactType.DIRECT and not self.resolver.is_known_ticker(impact.stock_ticker):
+                sectors = self.lookup(impact.company_name) or self.lookup(impact.stock_ticker)
+                if sectors:
+                    findings.append((impact, sectors))
+                    continue
+            kept.append(impact)
+
+        seen = {impact.stock_ticker for impact in kept}
+        for finding, sectors in findings:
+            low, high = bounds.get(finding.type, (0.0, 1.0))
+            for sector in sectors:
+                all_constituents = self.constituents[sector]
+                if not all_constituents:
+                    continue
+                heaviest = all_constituents[0][1]
+                # Equal weights carry no ranking: each company gets its share of the sector
+                share = 1.0 if sector in self.weighted else 1.0 / len(all_constituents)
+                # Covered companies are skipped before the cut, so they do not use up its slots
+                constituents = [(ticker, weight) for ticker, weight in all_constituents if ticker not in seen]
+                for ticker, weight in constituents[:self.max_constituents]:
+                    seen.add(ticker)
+                    kept.append(ImpactedStock(
+                        company_name=self.resolver.companies[ticker]["name"],
+                        stock_ticker=ticker,
+                        impact_direction=finding.impact_direction,
+                        confidence=round(low + (high - low) * share * weight / heaviest, 2),
+                        type=finding.type,
+                    ))
+        return kept
+
+
+# Global instance, built once over the ticker universe
+sector_index = SectorIndex.from_file()
@@ -0,0 +1,232 @@
+# financial_news_intel/core/sentiment_classifier.py
+
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from financial_news_intel.core.config import (
+    SENTIMENT_CLASSIFIER_ENABLED, SENTIMENT_CLASSIFIER_PATH, SENTIMENT_CLASSIFIER_THRESHOLD,
+)
+from financial_news_intel.core.models import SentimentLabel
+
+LABELS: List[str] = [label.value for label in SentimentLabel]
+
+
+class SentimentClassifier:
+    """
+    Multinomial logistic regression over the sentence-transformer story embeddings.
+    Prediction is one matrix-vector product (microseconds); low-confidence predictions are
+    escalated to the LLM by the Entity Extraction Agent.
+    """
+    def __init__(self, weights: Optional[np.ndarray] = None, bias: Optional[np.ndarray] = None):
+        self.weights = weights   # (dimension, len(LABELS))
+        self.bias = bias         # (len(LABELS),)
+
+    # --- Training ---
+
+    def fit(
+        self,
+        embeddings: Sequence[Sequence[float]],
+        labels: Sequence[str],
+        l2: float = 1e-3,
+        learning_rate: float = 0.5,
+        epochs: int = 500,
+    ) -> "SentimentClassifier":
+        """Full-batch gradient descent on L2-regularized softmax cross-entropy."""
+        X = np.asarray(embeddings, dtype=np.float64)
+        y = np.zeros((len(labels), len(LABELS)))
+        y[np.arange(len(labels)), [LABELS.index(label) for label in labels]] = 1.0
+
+        self.weights = np.zeros((X.shape[1], len(LABELS)))
+        self.bias = np.zeros(len(LABELS))
+        for _ in range(epochs):
+            error = (self._softmax(X @ self.weights + self.bias) - y) / len(X)
+            self.weights -= learning_rate * (X.T @ error + l2 * self.weights)
+            self.bias -= learning_rate * error.sum(axis=0)
+        return self
+
+    # --- Inference ---
+
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        return shifted / shifted.sum(axis=-1, keepdims=True)
+
+    def predict_proba(self, embeddings: Sequence[Sequence[float]]) -> np.ndarray:
+        return self._softmax(np.asarray(embeddings, dtype=np.float64) @ self.weights + self.bias)
+
+    def predict(self, embedding: Sequence[float]) -> Tuple[str, float]:
+        """Returns (label, confidence) for one embedding."""
+        probabilities = self.predict_proba([embedding])[0]
+        best = int(probabilities.argmax())
+        return LABELS[best], float(probabilities[best])
+
+    # --- Persistence ---
+
+    def save(self, path: str = SENTIMENT_CLASSIFIER_PATH):
+        np.savez(path, weights=self.weights, bias=self.bias, labels=np.array(LABELS))
+
+    @classmethod
+    def load(cls, path: str = SENTIMENT_CLASSIFIER_PATH) -> "SentimentClassifier":
+        data = np.load(path)
+        if list(data["labels"]) != LABELS:
+            raise ValueError(f"Sentiment classifier at {path} was trained for labels {list(data['labels'])}")
+        return cls(weights=data["weights"], bias=data["bias"])
+
+
+def evaluate_classifier(
+    embeddings: Sequence[Sequence[float]],
+    labels: Sequence[str],
+    threshold: float = SENTIMENT_CLASSIFIER_THRESHOLD,
+) -> Dict[str, float]:
+    """
+    Leave-one-out evaluation (the golden set is small): overall accuracy, share of stories
+    that would escalate to the LLM at this threshold, and accuracy of the ones kept local.
+    """
+    X = np.asarray(embeddings, dtype=np.float64)
+    correct, escalated, local_correct = 0, 0, 0
+    for i in range(len(X)):
+        keep = np.arange(len(X)) != i
+        model = SentimentClassifier().fit(X[keep], [labels[j] for j in range(len(X)) if keep[j]])
+        label, confidence = model.predict(X[i])
+        correct += label == labels[i]
+        if confidence < threshold:
+            escalated += 1
+        else:
+            local_correct += label == labels[i]
+
+    n = len(X)
+    local = n - escalated
+    return {
+        "samples": n,
+        "accuracy": correct / n if n else 0.0,
+        "escalation_rate": escalated / n if n else 0.0,
+        "local_accuracy": local_correct / local if local else 0.0,
+    }
+
+
+def _normalize_label(label) -> Optional[str]:
+    """Maps 'POSITIVE', ImpactDirection.POSITIVE, '"Positive"' etc. onto a SentimentLabel value."""
+    value = str(getattr(label, "value", label) or "").strip().strip("'\".").capitalize()
+    return value if value in LABELS else None
+
+
+def load_training_examples(source: str = "db") -> Tuple[List[str], List[str]]:
+    """
+    (texts, labels) to train on: 'db' uses the LLM-assigned sentiment of the stories in the
+    structured database, 'golden' the hand-labelled stories in tests/golden_data.py (only for
+    the leave-one-out benchmark: a classifier trained on them would be scored on its own
+    training data by the golden evaluation).
+    """
+    from financial_news_intel.core.embedding_model import embedding_input
+
+    if source == "golden":
+        from financial_news_intel.tests.golden_data import GROUND_TRUTH_MAP
+        rows = [(None, story.text, story.sentiment) for story in GROUND_TRUTH_MAP.values()]
+    elif source == "db":
+        from financial_news_intel.core.db_service import db_service
+        titles = db_service.fetch_story_titles()
+        rows = [
+            (titles.get(row["story_id"]), row["story_text"], row["sentiment"])
+            for row in db_service.fetch_all_stories_table()
+        ]
+    else:
+        raise ValueError(f"Unknown training source '{source}' (expected 'golden' or 'db')")
+
+    texts, labels = [], []
+    for title, text, label in rows:
+        normalized = _normalize_label(label)
+        if text and normalized is not None:
+            # Same input as the Deduplication Agent, whose embedding is reused at inference
+            texts.append(embedding_input(title, text))
+            labels.append(normalized)
+    return texts, labels
+
+
+def train_sentiment_classifier(
+    source: str = "db",
+    path: str = SENTIMENT_CLASSIFIER_PATH,
+    threshold: float = SENTIMENT_CLASSIFIER_THRESHOLD,
+) -> Dict[str, float]:
+    """Embeds the training stories, reports leave-one-out metrics, then fits on all of them and saves."""
+    from financial_news_intel.core.embedding_model import get_embeddings
+
+    texts, labels = load_training_examples(source)
+    if len(set(labels)) < 2:
+        raise ValueError(f"Need at least two sentiment classes to train, got {sorted(set(labels))}")
+
+    embeddings = get_embeddings(texts)
+    metrics = evaluate_classifier(embeddings, labels, threshold)
+    SentimentClassifier().fit(embeddings, labels).save(path)
+    print(f"Sentiment classifier trained on {len(labels)} {source} stories and saved to {path}")
+    return metrics
+
+
+class SentimentRouter:
+    """
+    Decides per story whether the local classifier answers or the LLM is asked, and keeps
+    the escalation rate and the local/LLM agreement on escalated stories for logging.
+    """
+    def __init__(
+        self,
+        path: str = SENTIMENT_CLASSIFIER_PATH,
+        threshold: float = SENTIMENT_CLASSIFIER_THRESHOLD,
+        enabled: bool = SENTIMENT_CLASSIFIER_ENABLED,
+    ):
+        self.path = path
+        self.threshold = threshold
+        self.enabled = enabled
+        self._classifier: Optional[SentimentClassifier] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.stats = {"local": 0, "escalated": 0, "escalated_agreed": 0}
+
+    def get_classifier(self) -> Optional[SentimentClassifier]:
+        """Loads the trained classifier once; None if disabled or not trained yet."""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    if self.enabled and os.path.exists(self.path):
+                        self._classifier = SentimentClassifier.load(self.path)
+                        print(f"Sentiment classifier loaded from {self.path} (threshold {self.threshold})")
+                    elif self.enabled:
+                        print(f"Sentiment classifier not found at {self.path}; sentiment uses the LLM. "
+                              "Train it with: python -m financial_news_intel.cli train-sentiment-classifier")
+                    self._loaded = True
+        return self._classifier
+
+    def classify(self, embedding: Optional[Sequence[float]]) -> Optional[Tuple[str, float]]:
+        """(label, confidence) from the local classifier, or None if it is unavailable."""
+        classifier = self.get_classifier()
+        if classifier is None or embedding is None:
+            return None
+        return classifier.predict(embedding)
+
+    def is_confident(self, prediction: Optional[Tuple[str, float]]) -> bool:
+        return prediction is not None and prediction[1] >= self.threshold
+
+    def record(self, prediction: Tuple[str, float], final_label: Optional[str], escalated: bool):
+        with self._lock:
+            if not escalated:
+                self.stats["local"] += 1
+                return
+            self.stats["escalated"] += 1
+            if final_label is not None and final_label.strip().capitalize() == prediction[0]:
+                self.stats["escalated_agreed"] += 1
+
+    def summary(self) -> str:
+        total = self.stats["local"] + self.stats["escalated"]
+        if total == 0:
+            return "Sentiment classifier: no stories classified."
+        escalated = self.stats["escalated"]
+        agreement = self.stats["escalated_agreed"] / escalated if escalated else 0.0
+        return (
+            f"Sentiment classifier: {self.stats['local']} local, {escalated} escalated to LLM "
+            f"(escalation rate {escalated / total:.1%}, local/LLM agreement on escalated {agreement:.1%})"
+        )
+
+
+# Global instance used by the Entity Extraction Agent
+sentiment_router = SentimentRouter()
@@ -0,0 +1,337 @@
+# financial_news_intel/core/story_ledger.py
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from financial_news_intel.core.config import (
+    STORY_LEDGER_ENABLED, STORY_LEDGER_PATH, STORY_LEDGER_MAX_ATTEMPTS, STORY_LEDGER_RETENTION_SECONDS,
+    STORY_LEDGER_CLAIM_SECONDS,
+)
+from financial_news_intel.core.models import ConsolidatedStory
+
+# Stages of a unique story, in pipeline order
+DEDUPED = "deduped"      # Indexed for deduplication, awaiting enrichment
+ENRICHED = "enriched"    # Entities/sentiment/impacts done, awaiting storage
+STORED = "stored"        # In the SQL and RAG stores (terminal)
+FAILED = "failed"        # Gave up after max_attempts runs or deferred attempts (terminal)
+STAGES = (DEDUPED, ENRICHED, STORED, FAILED)
+
+
+class StoryLedger:
+    """
+    Persistent per-story stage ledger (SQLite), the checkpoint of the pipeline.
+
+    A story is recorded as DEDUPED (with its JSON) before its vector is added to the
+    deduplication index, as ENRICHED (with the enriched JSON) once enrichment succeeds, and as
+    STORED once storage succeeds. A worker that crashes mid-batch therefore leaves its
+    unfinished stories in the ledger, and the next run resumes them from their last completed
+    stage (take_unfinished) instead of losing them as duplicates of their own vectors.
+    Stories deferred while the LLM backend was down (the LLM retry queue) are persisted here
+    as well, with their deferred attempt count.
+
+    A story in progress is claimed in the ledger by the process working on it (claim_owner,
+    set when it is checkpointed or handed out by take_unfinished, cleared when it is stored,
+    fails or is deferred). Several processes can share the ledger: take_unfinished claims
+    the rows it returns with a single UPDATE ... RETURNING, so a story is never resumed by
+    two of them. While a batch is being enriched, its claims are renewed every third of
+    claim_seconds (renewing), so a slow batch is not resumed under its process. The claims
+    of a crashed process expire after claim_seconds, or as soon as a process of the same
+    host opens the ledger and finds it gone.
+    """
+    def __init__(
+        self,
+        db_path: str = STORY_LEDGER_PATH,
+        enabled: bool = STORY_LEDGER_ENABLED,
+        max_attempts: int = STORY_LEDGER_MAX_ATTEMPTS,
+        retention_seconds: int = STORY_LEDGER_RETENTION_SECONDS,
+        claim_seconds: float = STORY_LEDGER_CLAIM_SECONDS,
+    ):
+        self.db_path = db_path
+        self.enabled = enabled
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+        self.claim_seconds = claim_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._owner: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def owner(self) -> str:
+        """Claim owner of this process: host:pid:token (the token tells a restarted pid 1 apart)."""
+        if self._owner is None:
+            self._owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        return self._owner
+
+    def _release_dead_claims(self, conn: sqlite3.Connection):
+        """
+        Releases the claims of processes of this host that are gone (a crashed or restarted
+        worker), so their stories are resumed now rather than when the claims expire.
+        """
+        host = socket.gethostname()
+        owners = [row[0] for row in conn.execute(
+            "SELECT DISTINCT claim_owner FROM Story_Ledger WHERE claim_owner LIKE ? AND claimed_until > ?",
+            (f"{host}:%", time.time()),
+        )]
+        for owner in owners:
+            _, pid, _ = owner.rsplit(":", 2)
+            if owner == self.owner:
+                continue
+            if int(pid) != os.getpid():
+                try:
+                    os.kill(int(pid), 0)
+                    continue
+                except ProcessLookupError:
+                    pass
+                except (OSError, ValueError):
+                    continue
+            # The process is gone, or an earlier process with this pid (a restarted container)
+            conn.execute("UPDATE Story_Ledger SET claim_owner = NULL WHERE claim_owner = ?", (owner,))
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """
+        Opens the ledger DB lazily, so importing an agent does not create the file (once per
+        process: a forked worker gets its own connection).
+        """
+        if self._conn is None or self._pid != os.getpid():
+            self._owner = None
+            self._pid = os.getpid()
+            # Other processes sharing the ledger hold the lock briefly; wait for them instead of failing
+            self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS Story_Ledger (
+                    story_id TEXT PRIMARY KEY,
+                    stage TEXT NOT NULL,
+                    story_json TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    deferred_attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    claim_owner TEXT,
+                    claimed_until REAL,
+                    updated_at REAL NOT NULL
+                );
+            """)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(Story_Ledger)")}
+            if "claim_owner" not in columns:
+                self._conn.execute("ALTER TABLE Story_Ledger ADD COLUMN claim_owner TEXT")
+                self._conn.execute("ALTER TABLE Story_Ledger ADD COLUMN claimed_until REAL")
+            self._release_dead_claims(self._conn)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_story_ledger_stage ON Story_Ledger (stage, updated_at);")
+            pruned = self._conn.execute(
+                "DELETE FROM Story_Ledger WHERE stage = ? AND updated_at < ?",
+                (STORED, time.time() - self.retention_seconds),
+            ).rowcount
+            self._conn.commit()
+            if pruned:
+                print(f"Story ledger: pruned {pruned} stored stories older than {self.retention_seconds}s")
+        return self._conn
+
+    # --- Checkpoints ---
+
+    def record(self, story: ConsolidatedStory, stage: str):
+        """
+        Checkpoints a story at DEDUPED or ENRICHED, with its current JSON (clears its deferral).
+        The story is claimed by this process until it is stored or fails.
+        """
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute(
+                "INSERT INTO Story_Ledger (story_id, stage, story_json, claim_owner, claimed_until, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (story_id) DO UPDATE SET stage = excluded.stage, "
+                "story_json = excluded.story_json, deferred_attempts = 0, error = NULL, "
+                "claim_owner = excluded.claim_owner, claimed_until = excluded.claimed_until, "
+                "updated_at = excluded.updated_at",
+                (story.unique_story_id, stage, story.json(), self.owner, now + self.claim_seconds, now),
+            )
+            conn.commit()
+
+    def mark_stored(self, story_id: str):
+        """Terminal stage; the story JSON is no longer needed."""
+        if not self.enabled:
+            return
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute(
+                "UPDATE Story_Ledger SET stage = ?, story_json = NULL, error = NULL, claim_owner = NULL, "
+                "updated_at = ? WHERE story_id = ?",
+                (STORED, time.time(), story_id),
+            )
+            conn.commit()
+
+    def record_error(self, story_id: str, error: str):
+        """
+        Counts a failed enrichment/storage attempt; the story stays at its stage and is resumed
+        by the next run, until max_attempts is reached (then it is FAILED).
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute(
+                "UPDATE Story_Ledger SET attempts = attempts + 1, error = ?, updated_at = ?, claim_owner = NULL, "
+                "stage = CASE WHEN attempts + 1 >= ? THEN ? ELSE stage END WHERE story_id = ?",
+                (error, time.time(), self.max_attempts, FAILED, story_id),
+            )
+            conn.commit()
+
+    def mark_failed(self, story_id: str, error: str):
+        if not self.enabled:
+            return
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute(
+                "UPDATE Story_Ledger SET stage = ?, error = ?, claim_owner = NULL, updated_at = ? WHERE story_id = ?",
+                (FAILED, error, time.time(), story_id),
+            )
+            conn.commit()
+
+    def release(self, story_ids: List[str]):
+        """Gives up this process's claim on stories another component retries (the job queue)."""
+        if not self.enabled or not story_ids:
+            return
+        with self._lock:
+            conn = self._get_conn()
+            conn.executemany(
+                "UPDATE Story_Ledger SET claim_owner = NULL WHERE story_id = ? AND claim_owner = ?",
+                [(story_id, self.owner) for story_id in story_ids],
+            )
+            conn.commit()
+
+    def renew(self, story_ids: List[str]) -> int:
+        """Extends this process's claims on unfinished stories; returns how many it still holds."""
+        if not self.enabled or not story_ids:
+            return 0
+        with self._lock:
+            conn = self._get_conn()
+            held = conn.execute(
+                f"UPDATE Story_Ledger SET claimed_until = ? WHERE story_id IN ({', '.join('?' * len(story_ids))}) "
+                "AND claim_owner = ? AND stage IN (?, ?)",
+                (time.time() + self.claim_seconds, *story_ids, self.owner, DEDUPED, ENRICHED),
+            ).rowcount
+            conn.commit()
+        return held
+
+    def _heartbeat(self, story_ids: List[str], finished: threading.Event):
+        while not finished.wait(self.claim_seconds / 3):
+            try:
+                if self.renew(story_ids) == 0:
+                    return
+            except Exception as e:
+                print(f"WARNING: Story ledger claim heartbeat failed: {e}")
+
+    @contextmanager
+    def renewing(self, story_ids: List[str]):
+        """Keeps this process's claims on the stories alive while the block runs (a batch being enriched)."""
+        if not self.enabled or not story_ids:
+            yield
+            return
+        finished = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(list(story_ids), finished), name="ledger-heartbeat", daemon=True
+        )
+        heartbeat.start()
+        try:
+            yield
+        finally:
+            finished.set()
+            heartbeat.join()
+
+    # --- LLM retry queue persistence ---
+
+    def defer(self, story: ConsolidatedStory, attempts: int, reason: str):
+        """Persists a story deferred to the LLM retry queue (it is not resumed by take_unfinished)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute(
+                "INSERT INTO Story_Ledger (story_id, stage, story_json, deferred_attempts, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (story_id) DO UPDATE SET "
+                "deferred_attempts = excluded.deferred_attempts, error = excluded.error, claim_owner = NULL, "
+                "updated_at = excluded.updated_at",
+                (story.unique_story_id, DEDUPED, story.json(), attempts, reason, time.time()),
+            )
+            conn.commit()
+
+    def deferred(self) -> List[Tuple[ConsolidatedStory, int]]:
+        """(story, deferred attempts) of every unfinished story in the LLM retry queue."""
+        if not self.enabled:
+            return []
+        with self._lock:
+            rows = self._get_conn().execute(
+                "SELECT story_json, deferred_attempts FROM Story_Ledger "
+                "WHERE deferred_attempts > 0 AND stage IN (?, ?) ORDER BY updated_at",
+                (DEDUPED, ENRICHED),
+            ).fetchall()
+        return [(ConsolidatedStory.parse_raw(story_json), attempts) for story_json, attempts in rows]
+
+    # --- Resume ---
+
+    def take_unfinished(self) -> Tuple[List[ConsolidatedStory], List[ConsolidatedStory]]:
+        """
+        Unfinished stories of earlier runs (or crashed workers): (DEDUPED stories to enrich,
+        ENRICHED stories to store), claimed by this process. Deferred stories are left to the LLM
+        retry queue, and stories claimed by any process (including this one) are skipped.
+        """
+        if not self.enabled:
+            return [], []
+        now = time.time()
+        with self._lock:
+            conn = self._get_conn()
+            rows = conn.execute(
+                "UPDATE Story_Ledger SET claim_owner = ?, claimed_until = ? WHERE story_id IN ("
+                "SELECT story_id FROM Story_Ledger WHERE stage IN (?, ?) AND deferred_attempts = 0 "
+                "AND (claim_owner IS NULL OR claimed_until <= ?)) RETURNING stage, story_json, updated_at",
+                (self.owner, now + self.claim_seconds, DEDUPED, ENRICHED, now),
+            ).fetchall()
+            conn.commit()
+
+        # RETURNING does not keep an order: oldest checkpoint first
+        rows.sort(key=lambda row: row[2])
+        to_enrich = [ConsolidatedStory.parse_raw(story_json) for stage, story_json, _ in rows if stage == DEDUPED]
+        to_store = [ConsolidatedStory.parse_raw(story_json) for stage, story_json, _ in rows if stage == ENRICHED]
+        if rows:
+            print(f"Story ledger: resuming {len(to_enrich)} stories awaiting enrichment and {len(to_store)} awaiting storage")
+        return to_enrich, to_store
+
+    def has_unfinished(self) -> bool:
+        if not self.enabled:
+            return False
+        with self._lock:
+            return self._get_conn().execute(
+                "SELECT 1 FROM Story_Ledger WHERE stage IN (?, ?) AND deferred_attempts = 0 "
+                "AND (claim_owner IS NULL OR claimed_until <= ?) LIMIT 1",
+                (DEDUPED, ENRICHED, time.time()),
+            ).fetchone() is not None
+
+    def stats(self) -> Dict[str, int]:
+        """Stories per stage, plus the deferred (LLM retry queue) count."""
+        with self._lock:
+            conn = self._get_conn()
+            counts = dict(conn.execute("SELECT stage, COUNT(*) FROM Story_Ledger GROUP BY stage").fetchall())
+            deferred = conn.execute(
+                "SELECT COUNT(*) FROM Story_Ledger WHERE deferred_attempts > 0 AND stage IN (?, ?)", (DEDUPED, ENRICHED)
+            ).fetchone()[0]
+        stats = {stage: counts.get(stage, 0) for stage in STAGES}
+        stats["deferred"] = deferred
+        return stats
+
+    def failed(self, limit: int = 20) -> List[Tuple[str, str]]:
+        """(story_id, last error) of the most recently failed stories."""
+        with self._lock:
+            return self._get_conn().execute(
+                "SELECT story_id, error FROM Story_Ledger WHERE stage = ? ORDER BY updated_at DESC LIMIT ?", (FAILED, limit)
+            ).fetchall()
+
+
+# Global instance shared by the pipeline agents, the streaming pipeline and the LLM retry queue
+story_ledger = StoryLedger()
@@ -0,0 +1,131 @@
+# financial_news_intel/core/story_priority.py
+
+import heapq
+import itertools
+import queue
+import time
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from financial_news_intel.core.config import (
+    PRIORITY_SCHEDULING_ENABLED, WATCHLIST_TICKERS, PRIORITY_WATCHLIST_WEIGHT, PRIORITY_RECENCY_WEIGHT,
+    PRIORITY_RECENCY_HALF_LIFE_SECONDS, PRIORITY_AGING_PER_MINUTE, PRIORITY_SOURCE_WEIGHTS,
+)
+from financial_news_intel.core.models import ConsolidatedStory
+from financial_news_intel.core.ticker_resolver import TickerResolver, ticker_resolver
+from financial_news_intel.core.timestamps import story_published_at, to_epoch_seconds
+
+# Watchlist hits beyond this many do not raise the priority further
+MAX_WATCHLIST_HITS = 3
+
+
+class StoryPrioritizer:
+    """
+    Enrichment priority of a unique story, computed locally before any LLM call:
+
+        watchlist_weight * watchlist tickers mentioned (up to MAX_WATCHLIST_HITS)
+        + recency_weight * 0.5 ** (age since publication / recency_half_life)
+        + weight of the best source domain
+
+    Watchlist tickers are found by the ticker resolver: companies seeded by the NER pre-pass
+    that match an alias exactly, and aliases spelled as in the ticker universe in the title
+    and text (fuzzy matches are left out), so scoring costs no model call. While a story
+    waits it gains aging_per_minute points per minute, so a steady stream of watchlist news
+    cannot starve the rest. Since every waiting story ages at the same rate, the order by
+    score + aging * waited equals the order by score - aging * enqueued_at, a key that does
+    not change over time (sort_key): it fits a heap, or an ORDER BY.
+    Disabled, every score is 0 and stories are enriched in arrival (feed) order.
+    """
+    def __init__(
+        self,
+        resolver: TickerResolver = ticker_resolver,
+        watchlist: Iterable[str] = WATCHLIST_TICKERS,
+        watchlist_weight: float = PRIORITY_WATCHLIST_WEIGHT,
+        recency_weight: float = PRIORITY_RECENCY_WEIGHT,
+        recency_half_life: float = PRIORITY_RECENCY_HALF_LIFE_SECONDS,
+        source_weights: Optional[Dict[str, float]] = None,
+        aging_per_minute: float = PRIORITY_AGING_PER_MINUTE,
+        enabled: bool = PRIORITY_SCHEDULING_ENABLED,
+    ):
+        self.resolver = resolver
+        self.watchlist = {ticker.upper() for ticker in watchlist}
+        self.watchlist_weight = watchlist_weight
+        self.recency_weight = recency_weight
+        self.recency_half_life = max(1.0, recency_half_life)
+        self.source_weights = PRIORITY_SOURCE_WEIGHTS if source_weights is None else source_weights
+        self.aging_per_second = aging_per_minute / 60.0
+        self.enabled = enabled
+
+    def watchlist_hits(self, story: ConsolidatedStory) -> List[str]:
+        """Watchlist tickers the story mentions."""
+        if not self.watchlist:
+            return []
+        titles = " ".join(article.title for article in story.source_articles if article.title)
+        matches = [match for match in self.resolver.resolve_many(story.entities.companies).values()
+                   if match is not None and match.method == "exact"]
+        matches += self.resolver.find_in_text(f"{titles}\n{story.text}")
+        return list(dict.fromkeys(match.stock_ticker for match in matches if match.stock_ticker in self.watchlist))
+
+    def _source_weight(self, story: ConsolidatedStory) -> float:
+        weights = [0.0]
+        for article in story.source_articles:
+            domain = urlparse(article.source_url or "").netloc.lower()
+            domain = domain[4:] if domain.startswith("www.") else domain
+            # A configured domain also covers its subdomains (b2b.economictimes.indiatimes.com)
+            weights.extend(
+                points for name, points in self.source_weights.items()
+                if domain == name or domain.endswith("." + name)
+            )
+        return max(weights)
+
+    def score(self, story: ConsolidatedStory, now: Optional[float] = None) -> float:
+        """Priority at enqueue time (higher is enriched first); 0 when disabled."""
+        if not self.enabled:
+            return 0.0
+        now = time.time() if now is None else now
+        hits = min(len(self.watchlist_hits(story)), MAX_WATCHLIST_HITS)
+
+        published = to_epoch_seconds(story_published_at(story))
+        # A story without a publication time counts as just published (it was just fetched)
+        age = max(0.0, now - published) if published is not None else 0.0
+        recency = 0.5 ** (age / self.recency_half_life)
+        return self.watchlist_weight * hits + self.recency_weight * recency + self._source_weight(story)
+
+    def sort_key(self, story: ConsolidatedStory, enqueued_at: Optional[float] = None) -> float:
+        """Ascending key (lowest first) equivalent to the aged priority; see the class docstring."""
+        enqueued_at = time.time() if enqueued_at is None else enqueued_at
+        return self.aging_per_second * enqueued_at - self.score(story, now=enqueued_at)
+
+    def order(self, stories: List[ConsolidatedStory]) -> List[ConsolidatedStory]:
+        """Stories waiting since the same moment, highest priority first (feed order among equals)."""
+        if not self.enabled:
+            return list(stories)
+        now = time.time()
+        scores = {story.unique_story_id: self.score(story, now=now) for story in stories}
+        return sorted(stories, key=lambda story: -scores[story.unique_story_id])
+
+
+class PriorityStoryQueue(queue.Queue):
+    """
+    Bounded queue.Queue of (key, item) entries handing out the item with the lowest key
+    first (FIFO among equal keys). get returns the item alone; blocking and maxsize behave
+    as in queue.Queue. The key is computed by the producer before put, outside the queue's
+    mutex, so scoring a story never blocks the consumers.
+    """
+    def _init(self, maxsize: int):
+        self.queue = []
+        self._counter = itertools.count()
+
+    def _qsize(self) -> int:
+        return len(self.queue)
+
+    def _put(self, entry):
+        key, item = entry
+        heapq.heappush(self.queue, (key, next(self._counter), item))
+
+    def _get(self):
+        return heapq.heappop(self.queue)[2]
+
+
+# Global instance used by the enrichment stage of every pipeline mode
+story_prioritizer = StoryPrioritizer()
@@ -0,0 +1,248 @@
+# financial_news_intel/core/structured_output.py
+
+import copy
+import json
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage
+
+from financial_news_intel.core.config import (
+    STRUCTURED_OUTPUT_SCHEMA_FORMAT, STRUCTURED_OUTPUT_REPAIR, STRUCTURED_OUTPUT_MAX_RETRIES,
+)
+from financial_news_intel.core.llm_guard import llm_guard
+from financial_news_intel.core.llm_model import llm_service
+
+_CODE_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.S | re.I)
+
+RETRY_INSTRUCTIONS = (
+    "Your previous reply could not be used: {error}. "
+    "Reply again with only the corrected JSON object that conforms to the required schema."
+)
+
+
+class StructuredOutputError(ValueError):
+    """The model's answer could not be parsed, even after local repair and the bounded retries."""
+
+
+def json_schema(model) -> Dict[str, Any]:
+    """
+    JSON schema of a pydantic (v1) model for Ollama's `format` parameter, with the
+    '#/definitions/...' references inlined so the grammar is built from one flat schema.
+    """
+    # .schema() is cached by pydantic: work on a copy
+    schema = copy.deepcopy(model.schema())
+    definitions = schema.pop("definitions", {})
+
+    def inline(node):
+        if isinstance(node, list):
+            return [inline(item) for item in node]
+        if not isinstance(node, dict):
+            return node
+        if "$ref" in node:
+            resolved = dict(definitions[node["$ref"].split("/")[-1]])
+            resolved.update({key: value for key, value in node.items() if key != "$ref"})
+            node = resolved
+        if len(node.get("allOf", [])) == 1:
+            # pydantic wraps a described reference as {"description": ..., "allOf": [{"$ref": ...}]}
+            merged = dict(node["allOf"][0])
+            merged.update({key: value for key, value in node.items() if key != "allOf"})
+            node = merged
+            return inline(node)
+        return {key: inline(value) for key, value in node.items()}
+
+    return inline(schema)
+
+
+def schema_llm(model, temperature: Optional[float] = None, tier: Optional[str] = None):
+    """The shared chat model (of a model tier) bound to the JSON schema of model (or plain JSON mode)."""
+    llm = llm_service.get_llm(temperature=temperature, tier=tier)
+    return llm.bind(format=json_schema(model) if STRUCTURED_OUTPUT_SCHEMA_FORMAT else "json")
+
+
+def extract_json(text: str) -> Any:
+    """
+    The first JSON object (or array) in text, ignoring code fences and any text before or after it.
+    Raises ValueError when there is none.
+    """
+    fenced = _CODE_FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        raise ValueError("no JSON object in the reply")
+    value, _ = json.JSONDecoder().raw_decode(text, min(starts))
+    return value
+
+
+def normalize_enum(value: Any, enum_cls) -> Any:
+    """Maps a string to the enum's value regardless of case, quotes and surrounding whitespace."""
+    if not isinstance(value, str):
+        return value
+    key = value.strip().strip("'\".").lower()
+    for member in enum_cls:
+        if key in (member.value.lower(), member.name.lower()):
+            return member.value
+    return value
+
+
+def normalize_string_list(value: Any) -> List[str]:
+    """null -> [], a single string -> [string]; non-string items are dropped."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    if isinstance(value, list):
+        return [item for item in value if isinstance(item, str) and item.strip()]
+    return value
+
+
+class StructuredOutput:
+    """
+    Structured LLM calls shared by the agents: the answer (decoded under the JSON schema by
+    Ollama) is parsed and validated; if that fails, cheap local repair is tried (code fences,
+    trailing text, enum case, ... via the caller's repair function), and only then is the
+    model re-asked with the error, at most max_retries times. Calls are routed to the agent's
+    model tier (core/llm_model.py); an agent on a small tier escalates to the larger tier
+    instead of re-asking the small model.
+    Per-agent counters: answers valid as returned, repaired locally, unusable (parse_failures,
+    each followed by a retry, an escalation or a failure), so the parse-failure rate and
+    retries per story.
+    """
+    def __init__(self, repair: bool = STRUCTURED_OUTPUT_REPAIR, max_retries: int = STRUCTURED_OUTPUT_MAX_RETRIES):
+        self.repair = repair
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[str, int]] = {}
+        self._llms: Dict[Tuple[Any, Optional[float], str, str], Any] = {}
+
+    def _count(self, agent: str, **deltas):
+        with self._lock:
+            counters = self.counters.setdefault(
+                agent, {"calls": 0, "answers": 0, "valid": 0, "repaired": 0, "parse_failures": 0, "retries": 0, "failed": 0}
+            )
+            for name, delta in deltas.items():
+                counters[name] += delta
+
+    def _parse(self, content: str, parse: Callable[[Any], Any], repair: Optional[Callable[[Any], Any]]):
+        """Returns (result, repaired); raises ValueError/TypeError when the answer is unusable."""
+        try:
+            return parse(json.loads(content)), False
+        except (ValueError, TypeError) as e:
+            if not self.repair:
+                raise
+            error = e
+        try:
+            data = extract_json(content)
+            return parse(repair(copy.deepcopy(data)) if repair else data), True
+        except (ValueError, TypeError):
+            raise error
+
+    def try_parse(
+        self,
+        agent: str,
+        content: str,
+        parse: Callable[[Any], Any],
+        repair: Optional[Callable[[Any], Any]] = None,
+    ) -> Optional[Any]:
+        """
+        Parses an answer the model gave outside invoke (e.g. the final turn of a tool-calling
+        loop); None when it is unusable, for the caller to fall back to invoke. Only usable
+        answers are counted (as one call).
+        """
+        try:
+            result, repaired = self._parse(content or "", parse, repair)
+        except (ValueError, TypeError):
+            return None
+        self._count(agent, calls=1, answers=1, **{"repaired" if repaired else "valid": 1})
+        return result
+
+    def _llm(self, schema, temperature: Optional[float], tier: str):
+        # Keyed by the tier's model too, so re-registering a tier takes effect
+        key = (schema, temperature, tier, llm_service.tiers[tier])
+        if key not in self._llms:
+            self._llms[key] = schema_llm(schema, temperature, tier)
+        return self._llms[key]
+
+    def invoke(
+        self,
+        agent: str,
+        schema,
+        messages: List[BaseMessage],
+        parse: Callable[[Any], Any],
+        repair: Optional[Callable[[Any], Any]] = None,
+        temperature: Optional[float] = None,
+        accept: Optional[Callable[[Any], bool]] = None,
+    ) -> Tuple[Any, BaseMessage]:
+        """
+        Calls the agent's model, decoding under the JSON schema of the pydantic model schema,
+        with messages under the LLM call guard and returns (parse(answer), the model's message).
+        parse gets the decoded JSON and raises ValueError/TypeError (pydantic's ValidationError
+        is one) for an unusable answer; repair gets a copy of the decoded JSON and returns a
+        fixed version; accept(result) False marks a low-confidence answer (escalated when a
+        larger tier exists). Raises StructuredOutputError once the retries are used up.
+        """
+        self._count(agent, calls=1)
+
+        def attempt(tier: str, final: bool):
+            llm = self._llm(schema, temperature, tier)
+            return self._invoke_tier(agent, llm, messages, parse, repair, self.max_retries if final else 0, final)
+
+        return llm_service.route(agent, attempt, (lambda output: accept(output[0])) if accept else None)
+
+    def _invoke_tier(self, agent, llm, messages, parse, repair, max_retries: int, final: bool):
+        messages = list(messages)
+        for attempt in range(max_retries + 1):
+            response = llm_guard.invoke(llm, messages)
+            self._count(agent, answers=1)
+            try:
+                result, repaired = self._parse(response.content, parse, repair)
+            except (ValueError, TypeError) as e:
+                self._count(agent, parse_failures=1)
+                error = str(e).replace("\n", " ")[:300]
+                if attempt == max_retries:
+                    if final:
+                        self._count(agent, failed=1)
+                    raise StructuredOutputError(f"{agent} answer unusable after {attempt + 1} attempts: {error}") from e
+                self._count(agent, retries=1)
+                print(f"WARNING: {agent} answer could not be parsed ({error}); re-asking ({attempt + 1}/{max_retries})")
+                messages += [response, HumanMessage(content=RETRY_INSTRUCTIONS.format(error=error))]
+                continue
+            if repaired:
+                self._count(agent, repaired=1)
+            else:
+                self._count(agent, valid=1)
+            return result, response
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            stats = {agent: dict(counters) for agent, counters in self.counters.items()}
+        for counters in stats.values():
+            # Share of model answers that were not usable as returned (repaired locally, re-asked or escalated)
+            answers = counters["answers"]
+            invalid = counters["repaired"] + counters["parse_failures"]
+            counters["parse_failure_rate"] = round(invalid / answers, 4) if answers else 0.0
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+
+    def total(self, name: str) -> int:
+        """A counter summed over all agents (e.g. total('retries'))."""
+        with self._lock:
+            return sum(counters[name] for counters in self.counters.values())
+
+    def summary(self) -> str:
+        lines = []
+        for agent, s in sorted(self.stats().items()):
+            lines.append(
+                f"Structured output [{agent}]: {s['calls']} calls, {s['valid']} valid, {s['repaired']} repaired locally, "
+                f"{s['parse_failure_rate']:.1%} parse failures, {s['retries']} retries, {s['failed']} failed"
+            )
+        return "\n".join(lines) or "Structured output: no calls"
+
+
+# Global instance shared by all agents and worker threads
+structured_output = StructuredOutput()
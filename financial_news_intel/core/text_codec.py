@@ -0,0 +1,139 @@
+# financial_news_intel/core/text_codec.py
+
+import sqlite3
+import struct
+import zlib
+from typing import Dict, List, Optional, Union
+
+from financial_news_intel.core.timestamps import utc_now_iso
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; zlib is always available
+    zstandard = None
+
+# Compressed values are stored as BLOBs in Stories.story_text, prefixed with a one-byte tag.
+# Plain TEXT values (older rows, or compression disabled) are returned unchanged.
+ZLIB_TAG = b"\x01"
+ZSTD_TAG = b"\x02"  # followed by a 4-byte big-endian dictionary id (0 = no dictionary)
+
+SUPPORTED_ALGORITHMS = ("none", "zlib", "zstd")
+
+
+class StoryTextCodec:
+    """
+    Transparent compression of story text for the structured DB.
+    zstd uses the most recently trained shared dictionary (stored in the
+    Compression_Dictionaries table); zlib is the fallback when zstandard is not installed.
+    """
+    def __init__(self, conn: sqlite3.Connection, algorithm: str = "none", level: int = 3):
+        if algorithm not in SUPPORTED_ALGORITHMS:
+            raise ValueError(f"Unsupported story text compression: {algorithm}")
+        if algorithm == "zstd" and zstandard is None:
+            print("WARNING: zstandard is not installed, falling back to zlib story text compression.")
+            algorithm = "zlib"
+
+        self.conn = conn
+        self.algorithm = algorithm
+        self.level = level
+        self._compressor = None
+        self._active_dict_id: Optional[int] = None
+        self._decompressors: Dict[int, "zstandard.ZstdDecompressor"] = {}
+        self._initialize_table()
+
+    def _initialize_table(self):
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS Compression_Dictionaries (
+                dict_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                algorithm TEXT NOT NULL,
+                dict_data BLOB NOT NULL,
+                created_at TEXT
+            );
+        """)
+        self.conn.commit()
+
+    # --- Encoding ---
+
+    def encode(self, text: str) -> Union[str, bytes]:
+        """Returns the value to store for text (compressed BLOB, or the text itself)."""
+        if self.algorithm == "none" or not text:
+            return text
+
+        raw = text.encode("utf-8")
+        if self.algorithm == "zlib":
+            encoded = ZLIB_TAG + zlib.compress(raw, self.level)
+        else:
+            compressor = self._get_compressor()
+            encoded = ZSTD_TAG + struct.pack(">I", self._active_dict_id or 0) + compressor.compress(raw)
+
+        # Short RSS summaries may not shrink; keep those as plain text
+        return encoded if len(encoded) < len(raw) else text
+
+    def _get_compressor(self) -> "zstandard.ZstdCompressor":
+        if self._compressor is None:
+            row = self.conn.execute(
+                "SELECT dict_id, dict_data FROM Compression_Dictionaries WHERE algorithm = 'zstd' "
+                "ORDER BY dict_id DESC LIMIT 1"
+            ).fetchone()
+            if row:
+                self._active_dict_id = row[0]
+                dictionary = zstandard.ZstdCompressionDict(row[1])
+                self._compressor = zstandard.ZstdCompressor(level=self.level, dict_data=dictionary)
+            else:
+                self._active_dict_id = 0
+                self._compressor = zstandard.ZstdCompressor(level=self.level)
+        return self._compressor
+
+    # --- Decoding ---
+
+    def decode(self, value: Union[str, bytes, None]) -> Optional[str]:
+        """Returns the original text for a stored story_text value."""
+        if value is None or isinstance(value, str):
+            return value
+
+        value = bytes(value)
+        tag, payload = value[:1], value[1:]
+        if tag == ZLIB_TAG:
+            return zlib.decompress(payload).decode("utf-8")
+        if tag == ZSTD_TAG:
+            if zstandard is None:
+                raise RuntimeError("Story text is zstd-compressed but zstandard is not installed.")
+            (dict_id,) = struct.unpack(">I", payload[:4])
+            return self._get_decompressor(dict_id).decompress(payload[4:]).decode("utf-8")
+        raise ValueError(f"Unknown story text encoding tag: {tag!r}")
+
+    def _get_decompressor(self, dict_id: int) -> "zstandard.ZstdDecompressor":
+        if dict_id not in self._decompressors:
+            if dict_id == 0:
+                self._decompressors[dict_id] = zstandard.ZstdDecompressor()
+            else:
+                row = self.conn.execute(
+                    "SELECT dict_data FROM Compression_Dictionaries WHERE dict_id = ?", (dict_id,)
+                ).fetchone()
+                if not row:
+                    raise ValueError(f"Missing zstd compression dictionary {dict_id}")
+                self._decompressors[dict_id] = zstandard.ZstdDecompressor(
+                    dict_data=zstandard.ZstdCompressionDict(row[0])
+                )
+        return self._decompressors[dict_id]
+
+    # --- Dictionary training ---
+
+    def train_dictionary(self, samples: List[str], dict_size: int = 64 * 1024) -> int:
+        """
+        Trains a shared zstd dictionary from sample story texts and makes it the active
+        dictionary for new writes. Rows compressed with older dictionaries stay readable.
+        """
+        if zstandard is None:
+            raise ImportError("Training a compression dictionary requires zstandard: pip install zstandard")
+
+        dictionary = zstandard.train_dictionary(dict_size, [s.encode("utf-8") for s in samples if s])
+        cursor = self.conn.execute(
+            "INSERT INTO Compression_Dictionaries (algorithm, dict_data, created_at) VALUES ('zstd', ?, ?)",
+            (dictionary.as_bytes(), utc_now_iso()),
+        )
+        self.conn.commit()
+
+        # Pick up the new dictionary on the next encode()
+        self._compressor = None
+        return cursor.lastrowid
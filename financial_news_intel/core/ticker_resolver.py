@@ -0,0 +1,306 @@
+# financial_news_intel/core/ticker_resolver.py
+
+import json
+import os
+import re
+from collections import defaultdict, deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from financial_news_intel.core.config import STOCK_MAPPING_PATH, TICKER_CACHE_SIZE, TICKER_FUZZY_THRESHOLD
+from financial_news_intel.core.models import TickerMatch
+
+# Corporate suffixes ignored when comparing names ("Infosys Ltd." == "Infosys")
+NAME_SUFFIXES = {"ltd", "limited", "inc", "incorporated", "corp", "plc", "co", "llc", "pvt", "private"}
+
+_APOSTROPHES = re.compile(r"['’]")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_NON_ALNUM_CASED = re.compile(r"[^A-Za-z0-9]+")
+
+
+def normalize_name(name: str) -> str:
+    """Lower-cased, punctuation-free form of a company name without corporate suffixes."""
+    text = _APOSTROPHES.sub("", name.lower()).replace("&", " and ")
+    tokens = _NON_ALNUM.sub(" ", text).split()
+    while tokens and tokens[-1] in NAME_SUFFIXES:
+        tokens.pop()
+    if tokens and tokens[0] == "the":
+        tokens = tokens[1:]
+    return " ".join(tokens)
+
+
+def _tokenize(text: str) -> List[str]:
+    """Token stream used by the text scanner (same rules as normalize_name, suffixes kept)."""
+    text = _APOSTROPHES.sub("", text.lower()).replace("&", " and ")
+    return _NON_ALNUM.sub(" ", text).split()
+
+
+def _tokenize_cased(text: str) -> List[str]:
+    """_tokenize with the original case kept (token for token the same stream)."""
+    text = _APOSTROPHES.sub("", text).replace("&", " and ")
+    return _NON_ALNUM_CASED.sub(" ", text).split()
+
+
+def _surface_form(name: str) -> Tuple[str, ...]:
+    """Case-kept tokens of a company name, trimmed like normalize_name (e.g. "Reliance Industries")."""
+    tokens = _tokenize_cased(name)
+    while tokens and tokens[-1].lower() in NAME_SUFFIXES:
+        tokens.pop()
+    if tokens and tokens[0].lower() == "the":
+        tokens = tokens[1:]
+    return tuple(tokens)
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _AliasAutomaton:
+    """
+    Aho-Corasick automaton over alias token sequences. Matching whole tokens (not characters)
+    gives word-boundary semantics for free: 'Titan' does not match inside 'Titanium'.
+    """
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, str]]] = [[]]  # (alias length in tokens, alias)
+
+    def add(self, alias: str):
+        state = 0
+        tokens = alias.split()
+        for token in tokens:
+            nxt = self._goto[state].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = nxt
+        self._output[state].append((len(tokens), alias))
+
+    def build(self):
+        """Computes failure links breadth-first (call after all aliases are added)."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(token, 0) if state else 0
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    def scan(self, tokens: List[str]) -> List[Tuple[int, int, str]]:
+        """Returns all (start, end, alias) occurrences in the token list, end exclusive."""
+        matches = []
+        state = 0
+        for index, token in enumerate(tokens):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for length, alias in self._output[state]:
+                matches.append((index + 1 - length, index + 1, alias))
+        return matches
+
+
+class TickerResolver:
+    """
+    Deterministic company name -> ticker resolution over the ticker universe in
+    data/stock_mapping.json: exact alias lookup, a trigram index for fuzzy names, and an
+    Aho-Corasick scan that finds every known company mentioned in a story text.
+
+    The text scan only accepts an alias written as in the ticker universe (case kept:
+    "Reliance Industries", not "reliance"), and never matches an entry's word_aliases,
+    aliases that are also ordinary words ("Apple", "Titan"). Those still resolve as
+    extracted company names.
+    """
+    def __init__(
+        self,
+        entries: List[Dict],
+        fuzzy_threshold: float = TICKER_FUZZY_THRESHOLD,
+        cache_size: int = TICKER_CACHE_SIZE,
+    ):
+        self.fuzzy_threshold = fuzzy_threshold
+        # Memoized lookup of normalized names (news repeats the same few names constantly)
+        self._lookup = lru_cache(maxsize=cache_size)(self._lookup_normalized)
+        self.companies: Dict[str, Dict] = {}          # ticker -> entry
+        self._alias_to_ticker: Dict[str, str] = {}    # normalized alias -> ticker
+        self._ambiguous: Set[str] = set()
+        self._surface_forms: Dict[str, Set[Tuple[str, ...]]] = defaultdict(set)  # normalized alias -> spellings
+        self._word_aliases: Set[str] = set()
+        self._trigram_index: Dict[str, Set[str]] = defaultdict(set)
+        self._alias_trigrams: Dict[str, Set[str]] = {}
+        self._automaton = _AliasAutomaton()
+
+        for entry in entries:
+            self._add_entry(entry)
+        for alias in self._alias_to_ticker:
+            if alias not in self._word_aliases:
+                self._automaton.add(alias)
+            grams = _trigrams(alias)
+            self._alias_trigrams[alias] = grams
+            for gram in grams:
+                self._trigram_index[gram].add(alias)
+        self._automaton.build()
+
+    @classmethod
+    def from_file(cls, path: str = STOCK_MAPPING_PATH) -> "TickerResolver":
+        """Loads the ticker universe (a JSON list of {ticker, name, aliases, sector, exchange})."""
+        entries: List[Dict] = []
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        else:
+            print(f"WARNING: Ticker universe not found at {path}; no company will resolve.")
+        print(f"Ticker resolver loaded {len(entries)} companies from {path}")
+        return cls(entries)
+
+    def _add_entry(self, entry: Dict):
+        ticker = entry["ticker"]
+        if ticker in self.companies:
+            self.companies[ticker]["aliases"] = self.companies[ticker].get("aliases", []) + [entry["name"]] + entry.get("aliases", [])
+        else:
+            self.companies[ticker] = dict(entry)
+
+        for alias in [entry["name"]] + entry.get("aliases", []):
+            key = normalize_name(alias)
+            if not key or key in self._ambiguous:
+                continue
+            self._surface_forms[key].add(_surface_form(alias))
+            owner = self._alias_to_ticker.get(key)
+            if owner is not None and owner != ticker:
+                # The same alias names two companies: never guess between them
+                del self._alias_to_ticker[key]
+                self._ambiguous.add(key)
+            else:
+                self._alias_to_ticker[key] = ticker
+        self._word_aliases.update(normalize_name(alias) for alias in entry.get("word_aliases", []))
+
+    # --- Lookups ---
+
+    def is_known_ticker(self, ticker: str) -> bool:
+        return ticker in self.companies
+
+    def _match(self, name: str, ticker: str, alias: str, method: str, score: float) -> TickerMatch:
+        entry = self.companies[ticker]
+        return TickerMatch(
+            company_name=name,
+            stock_ticker=ticker,
+            official_name=entry["name"],
+            sector=entry.get("sector"),
+            exchange=entry.get("exchange"),
+            matched_alias=alias,
+            method=method,
+            score=score,
+        )
+
+    def _lookup_normalized(self, key: str) -> Optional[Tuple[str, str, str, float]]:
+        """(ticker, alias, method, score) for a normalized name, or None. Wrapped in an LRU cache."""
+        ticker = self._alias_to_ticker.get(key)
+        if ticker is not None:
+            return ticker, key, "exact", 1.0
+        if len(key) < 4:
+            # Too short for a meaningful fuzzy match (e.g. unknown acronyms)
+            return None
+
+        # Candidate aliases sharing at least one trigram, ranked by Dice coefficient
+        query = _trigrams(key)
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in query:
+            for alias in self._trigram_index.get(gram, ()):
+                shared[alias] += 1
+
+        best_alias, best_score = None, 0.0
+        for alias, common in shared.items():
+            score = 2.0 * common / (len(query) + len(self._alias_trigrams[alias]))
+            if score > best_score:
+                best_alias, best_score = alias, score
+
+        if best_alias is not None and best_score >= self.fuzzy_threshold:
+            return self._alias_to_ticker[best_alias], best_alias, "fuzzy", round(best_score, 3)
+        return None
+
+    def resolve(self, company_name: str) -> Optional[TickerMatch]:
+        """Resolves one company name: exact (normalized) alias first, then trigram similarity."""
+        key = normalize_name(company_name)
+        found = self._lookup(key) if key else None
+        if found is None:
+            return None
+        ticker, alias, method, score = found
+        return self._match(company_name, ticker, alias, method, score)
+
+    def resolve_many(self, company_names: Iterable[str]) -> Dict[str, Optional[TickerMatch]]:
+        """Resolves several names at once (one entry per distinct input name)."""
+        return {name: self.resolve(name) for name in dict.fromkeys(company_names)}
+
+    def cache_info(self):
+        """Hit/miss statistics of the normalized-name LRU cache."""
+        return self._lookup.cache_info()
+
+    def find_in_text(self, text: str) -> List[TickerMatch]:
+        """
+        Every known company mentioned in text (leftmost-longest, non-overlapping alias matches,
+        spelled with the case of the ticker universe).
+        """
+        cased = _tokenize_cased(text)
+        tokens = [token.lower() for token in cased]
+        occurrences = sorted(
+            (
+                (start, end, alias) for start, end, alias in self._automaton.scan(tokens)
+                if tuple(cased[start:end]) in self._surface_forms[alias]
+            ),
+            key=lambda m: (m[0], -(m[1] - m[0])),
+        )
+
+        matches: List[TickerMatch] = []
+        seen: Set[str] = set()
+        position = 0
+        for start, end, alias in occurrences:
+            if start < position:
+                continue
+            position = end
+            ticker = self._alias_to_ticker[alias]
+            if ticker not in seen:
+                seen.add(ticker)
+                matches.append(self._match(" ".join(cased[start:end]), ticker, alias, "text", 1.0))
+        return matches
+
+    def resolve_story(self, companies: Iterable[str], text: str = "") -> Tuple[List[TickerMatch], List[str]]:
+        """
+        Resolves the extracted company names, and adds companies found in the story text.
+        Returns (matches, unresolved company names); one match per ticker.
+        """
+        matches: List[TickerMatch] = []
+        unresolved: List[str] = []
+        seen: Set[str] = set()
+
+        for name in companies:
+            match = self.resolve(name)
+            if match is None:
+                unresolved.append(name)
+            elif match.stock_ticker not in seen:
+                seen.add(match.stock_ticker)
+                matches.append(match)
+
+        for match in self.find_in_text(text) if text else []:
+            if match.stock_ticker not in seen:
+                seen.add(match.stock_ticker)
+                matches.append(match)
+        return matches, unresolved
+
+
+def format_resolved_tickers(matches: List[TickerMatch]) -> str:
+    """Prompt block listing pre-resolved tickers, one per line."""
+    if not matches:
+        return "None"
+    return "\n".join(
+        f"- {m.company_name} -> {m.stock_ticker} ({m.official_name}{', ' + m.sector if m.sector else ''})"
+        for m in matches
+    )
+
+
+# Global instance, built once from the ticker universe
+ticker_resolver = TickerResolver.from_file()
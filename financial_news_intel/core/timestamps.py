@@ -0,0 +1,81 @@
+# financial_news_intel/core/timestamps.py
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterable, Optional, Union
+
+# All timestamps persisted to SQLite use this fixed-width UTC format so that
+# plain string comparison is chronological (which lets the B-tree indexes on
+# published_at/ingested_at answer time-range queries as range scans).
+DB_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def to_utc_iso(value: Union[str, datetime, None]) -> Optional[str]:
+    """
+    Normalizes an article timestamp into the DB_TIMESTAMP_FORMAT string.
+    Accepts ISO-8601 strings (golden data), RFC-822 strings (RSS 'published')
+    and datetime objects. Returns None if the value cannot be parsed.
+    """
+    if value is None:
+        return None
+
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        text = str(value).strip()
+        if not text:
+            return None
+        try:
+            # fromisoformat() on Python < 3.11 does not understand a trailing 'Z'
+            parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            try:
+                parsed = parsedate_to_datetime(text)
+            except (TypeError, ValueError):
+                return None
+
+    # Naive datetimes are assumed to already be in UTC
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+
+    return parsed.astimezone(timezone.utc).strftime(DB_TIMESTAMP_FORMAT)
+
+
+def utc_now_iso() -> str:
+    """Returns the current time in DB_TIMESTAMP_FORMAT."""
+    return datetime.now(timezone.utc).strftime(DB_TIMESTAMP_FORMAT)
+
+
+def earliest_timestamp(values: Iterable[Union[str, datetime, None]]) -> Optional[str]:
+    """Returns the earliest parseable timestamp of the given values (or None)."""
+    normalized = [ts for ts in (to_utc_iso(v) for v in values) if ts]
+    return min(normalized) if normalized else None
+
+
+def story_published_at(story) -> Optional[str]:
+    """
+    Publication time of a ConsolidatedStory: the earliest timestamp of its source articles
+    (its own published_at, set from the first article, only counts as one of them).
+    """
+    return earliest_timestamp([article.timestamp for article in story.source_articles] + [story.published_at])
+
+
+def to_epoch_seconds(value: Union[str, datetime, None]) -> Optional[float]:
+    """Converts a timestamp into epoch seconds (used for numeric ChromaDB metadata filters)."""
+    normalized = to_utc_iso(value)
+    if normalized is None:
+        return None
+    return datetime.strptime(normalized, DB_TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc).timestamp()
+
+
+def bucket_start(value: Union[str, datetime, None], bucket_minutes: int) -> Optional[str]:
+    """
+    Floors a timestamp to the start of its fixed-width bucket (aligned to the epoch)
+    and returns it in DB_TIMESTAMP_FORMAT.
+    """
+    epoch = to_epoch_seconds(value)
+    if epoch is None:
+        return None
+    width = bucket_minutes * 60
+    floored = datetime.fromtimestamp(epoch - (epoch % width), tz=timezone.utc)
+    return floored.strftime(DB_TIMESTAMP_FORMAT)
@@ -0,0 +1,126 @@
+# financial_news_intel/core/token_budget.py
+
+import math
+import re
+import threading
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+from financial_news_intel.core.config import (
+    INPUT_TOKENIZER_NAME, INPUT_LEAD_SENTENCES, ENTITY_INPUT_TOKEN_BUDGET, IMPACT_INPUT_TOKEN_BUDGET,
+)
+from financial_news_intel.core.ticker_resolver import ticker_resolver, _tokenize
+
+# Sentence boundary: ., ! or ? followed by whitespace and an upper-case letter, digit or quote
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'“])")
+# Amounts and percentages mark financially relevant sentences even without a named company
+_FIGURE = re.compile(r"(?:[$₹€£]|\b(?:rs|inr|usd)\.?\s?)\s?\d|\d+(?:\.\d+)?\s?(?:%|per ?cent|crore|lakh|billion|million|bps)\b", re.I)
+
+AGENT_BUDGETS = {
+    "entity": ENTITY_INPUT_TOKEN_BUDGET,
+    "impact": IMPACT_INPUT_TOKEN_BUDGET,
+}
+
+
+class TokenCounter:
+    """
+    Counts tokens with the LLM's Hugging Face tokenizer (INPUT_TOKENIZER_NAME, loaded through
+    transformers, which sentence-transformers already installs). Without a configured or
+    loadable tokenizer, a characters/4 estimate is used (close to BPE counts for English news).
+    """
+    def __init__(self, tokenizer_name: str = INPUT_TOKENIZER_NAME):
+        self.tokenizer_name = tokenizer_name
+        self._tokenizer = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def get_tokenizer(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    if self.tokenizer_name:
+                        try:
+                            from transformers import AutoTokenizer
+                            self._tokenizer = AutoTokenizer.from_pretrained(self.tokenizer_name)
+                            print(f"Token budget: counting tokens with tokenizer '{self.tokenizer_name}'")
+                        except Exception as e:
+                            print(f"WARNING: Tokenizer '{self.tokenizer_name}' could not be loaded ({e}); estimating tokens from characters.")
+                    self._loaded = True
+        return self._tokenizer
+
+    def count(self, text: str) -> int:
+        tokenizer = self.get_tokenizer()
+        if tokenizer is not None:
+            return len(tokenizer.encode(text, add_special_tokens=False))
+        return math.ceil(len(text) / 4)
+
+
+token_counter = TokenCounter()
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in _SENTENCE_END.split(text.strip()) if sentence.strip()]
+
+
+def _sentence_score(sentence: str, entity_tokens: List[Tuple[str, ...]]) -> int:
+    """Number of distinct entities (known companies, extracted names) plus figures in a sentence."""
+    score = len(ticker_resolver.find_in_text(sentence))
+    tokens = _tokenize(sentence)
+    joined = " " + " ".join(tokens) + " "
+    score += sum(1 for name in entity_tokens if name and f" {' '.join(name)} " in joined)
+    return score + (1 if _FIGURE.search(sentence) else 0)
+
+
+@lru_cache(maxsize=4096)
+def _shape(text: str, budget: int, entities: Tuple[str, ...], lead_sentences: int) -> str:
+    if budget <= 0 or token_counter.count(text) <= budget:
+        return text
+
+    sentences = split_sentences(text)
+    counts = [token_counter.count(sentence) for sentence in sentences]
+    entity_tokens = [tuple(_tokenize(name)) for name in entities]
+
+    # Lead sentences first (news puts the key facts up front), then entity-bearing sentences
+    # by score, earlier sentences winning ties; any budget left goes to the remaining sentences
+    # in reading order. The selection is emitted in original order.
+    order = list(range(min(lead_sentences, len(sentences))))
+    rest = [(-_sentence_score(sentences[i], entity_tokens), i) for i in range(len(order), len(sentences))]
+    order += [i for _, i in sorted(rest)]
+
+    chosen, used = set(), 0
+    for i in order:
+        if used + counts[i] <= budget:
+            chosen.add(i)
+            used += counts[i]
+
+    if not chosen:
+        # Not even the first sentence fits: hard-truncate it by characters
+        return sentences[0][: budget * 4] if sentences else text[: budget * 4]
+    return " ".join(sentences[i] for i in sorted(chosen))
+
+
+def shape_text(
+    text: str,
+    budget: int,
+    entities: Iterable[str] = (),
+    lead_sentences: int = INPUT_LEAD_SENTENCES,
+) -> str:
+    """
+    Returns text unchanged if it fits within budget tokens (budget <= 0 disables shaping);
+    otherwise the lead sentences plus the sentences that mention the most entities (companies
+    from the ticker universe, the given entity names, amounts and percentages), topped up with
+    the remaining sentences in reading order while they fit.
+    Results are memoized per (text, budget, entities), so each story is shaped once per agent.
+    """
+    return _shape(text, budget, tuple(sorted(set(entities))), lead_sentences)
+
+
+def shape_story_text(story, agent: str) -> str:
+    """The story text shaped to the token budget of the given agent ('entity' or 'impact')."""
+    entities = story.entities.companies + story.entities.regulators + story.entities.people
+    return shape_text(story.text, AGENT_BUDGETS[agent], entities)
+
+
+def shaping_cache_info():
+    """Hit/miss statistics of the shaped-text cache."""
+    return _shape.cache_info()
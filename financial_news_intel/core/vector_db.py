@@ -81,7 +81,8 @@ class VectorDBClient:
         try:
             # Note: We omit the 'embeddings' argument. Chroma will calculate it 
             # using the embedding_function defined in __init__.
-            self.rag_collection.add(
+            # Upsert: a story resumed from the story ledger may already be indexed.
+            self.rag_collection.upsert(
                 documents=[text],
                 metadatas=[metadata], 
                 ids=[id]
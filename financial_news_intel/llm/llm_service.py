@@ -3,8 +3,8 @@
 from financial_news_intel.core.llm_model import llm_service
 from langchain_core.pydantic_v1 import BaseModel 
 
-# Get the base Ollama LLM instance
-base_ollama_llm = llm_service.get_llm()
+# Get the base Ollama LLM instance (the model tier configured for the query agent)
+base_ollama_llm = llm_service.get_llm(tier=llm_service.tier_for("query"))
 
 # 1. Simple LLM instance for final answer synthesis (direct use of the base LLM)
 llm_simple_completion = base_ollama_llm
@@ -3,13 +3,15 @@
 from langgraph.graph import StateGraph, END
 from financial_news_intel.core.models import FinancialNewsState
 
-# Import all required agents and the iterator
+# Import all required agents
 from financial_news_intel.agents.ingestion_agent import news_ingestion_agent # <-- NEW IMPORT
 from financial_news_intel.agents.deduplication_agent import deduplication_agent
-from financial_news_intel.agents.entity_agent import entity_extraction_agent
-from financial_news_intel.agents.impact_agent import impact_stock_agent
-from financial_news_intel.agents.iterator_agent import story_iterator_agent 
-from financial_news_intel.agents.storage_agent import storage_index_agent
+from financial_news_intel.agents.ner_agent import ner_prepass_agent
+from financial_news_intel.core.config import NER_PREPASS_ENABLED
+from financial_news_intel.core.llm_guard import llm_retry_queue
+from financial_news_intel.core.story_ledger import story_ledger
+# The Entity Extraction, Impacted Stock and Storage agents run per story inside the batch nodes
+from financial_news_intel.agents.enrichment_agent import concurrent_enrichment_agent, batch_storage_agent
 
 # --- Define the Workflow ---
 
@@ -19,10 +21,11 @@ workflow = StateGraph(FinancialNewsState)
 # 2. Add all nodes
 workflow.add_node("ingestion", news_ingestion_agent)     
 workflow.add_node("deduplicate", deduplication_agent)
-workflow.add_node("iterator", story_iterator_agent)      
-workflow.add_node("entity_extract", entity_extraction_agent)
-workflow.add_node("impact_stock", impact_stock_agent)
-workflow.add_node("storage_index", storage_index_agent)
+workflow.add_node("ner_prepass", ner_prepass_agent)              # spaCy over the whole batch, before any LLM call
+# Batch nodes iterate over the stories internally, so the number of graph steps (and the
+# recursion_limit needed) does not grow with the batch size.
+workflow.add_node("enrich_batch", concurrent_enrichment_agent)   # entity + impact, up to K stories concurrently
+workflow.add_node("store_batch", batch_storage_agent)            # SQL + vector storage
 
 # 3. Define the Edges
 
@@ -32,70 +35,32 @@ workflow.set_entry_point("ingestion") # <-- ENTRY POINT
 # A. Ingestion -> Deduplication
 workflow.add_edge("ingestion", "deduplicate") 
 
-# B. Deduplication -> (Start Loop) OR (END)
-# Start the loop if unique stories were found, by going to the iterator first.
-workflow.add_conditional_edges(
-    "deduplicate",
-    # If the list is NOT empty, go to the Iterator
-    lambda state: "iterator" if len(state.deduplication_groups)>0 else END,
-    {
-        "iterator": "iterator", 
-        END: END,
-    },
-)
-
-# C. Iterator -> Entity Extract 
-# workflow.add_edge("iterator", "entity_extract")
-
-workflow.add_conditional_edges(
-    "iterator",
-    # If there are no stories to process, go to END
-    lambda state: "entity_extract" if state.current_story is not None else END,
-    {
-        "entity_extract": "entity_extract",
-        END: END,
-    },
-)
+# B. Deduplication -> (NER Pre-pass ->) Enrichment OR (END)
+def route_after_deduplication(state: FinancialNewsState) -> str:
+    # If the list is NOT empty, enrich the unique stories
+    if state.deduplication_groups:
+        return "ner_prepass" if NER_PREPASS_ENABLED else "enrich_batch"
+    # Without new stories, still resume unfinished (story ledger) and deferred (retry queue) ones
+    if story_ledger.has_unfinished() or len(llm_retry_queue):
+        return "enrich_batch"
+    return END
 
-# C. Entity Extraction -> (Impact) OR (Loop back on Error)
-# If the entity agent failed, skip impact and go back to iterator for next story.
 workflow.add_conditional_edges(
-    "entity_extract",
-    # Note: Use state.status to conditionally route
-    lambda state: "impact_stock" if state.current_story is not None else END,
+    "deduplicate",
+    route_after_deduplication,
     {
-        "impact_stock": "impact_stock", 
-        # "iterator": "iterator", # Skips the failed story
+        "ner_prepass": "ner_prepass",
+        "enrich_batch": "enrich_batch",
         END: END,
     },
 )
+workflow.add_edge("ner_prepass", "enrich_batch")
 
-# D. Entity Extraction -> Stock Impact 
-# workflow.add_edge("entity_extract", "impact_stock")
-
-# E. Stock Impact -> (Loop Back) OR (END)
-workflow.add_conditional_edges(
-    "impact_stock",
-    # If there are MORE stories left in the deduplication_groups list (the queue), 
-    # loop back to the ITERATOR to fetch the NEXT story.
-    lambda state: "storage_index" if state.status != "ERROR" else "iterator",
-    {
-        "storage_index": "storage_index", 
-        "iterator": "iterator",
-    },
-)
-
-workflow.add_conditional_edges(
-    "storage_index",
-    # If there are MORE stories left in the deduplication_groups list (the queue), 
-    # loop back to the ITERATOR to fetch the NEXT story.
-    lambda state: "iterator" if len(state.deduplication_groups)>0 else END,
-    {
-        "iterator": "iterator", 
-        END: END,    
-    }, 
-)   
+# C. Enrichment (joined) -> Storage -> END
+# Stories that failed enrichment are recorded in state.story_errors and skipped.
+workflow.add_edge("enrich_batch", "store_batch")
+workflow.add_edge("store_batch", END)
 
 # 4. Compile the graph
 financial_news_pipeline = workflow.compile()
-print("LangGraph Pipeline compiled successfully with live ingestion enabled.")
\ No newline at end of file
+print("LangGraph Pipeline compiled successfully with live ingestion enabled.")
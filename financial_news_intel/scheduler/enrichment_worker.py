@@ -0,0 +1,154 @@
+# financial_news_intel/scheduler/enrichment_worker.py
+import os
+import socket
+import sys
+import threading
+import time
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Ensure the project root is in the path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from financial_news_intel.core.models import ConsolidatedStory
+from financial_news_intel.core.config import (
+    ENRICHMENT_CONCURRENCY, IMPACT_BATCH_SIZE, JOB_HEARTBEAT_SECONDS, JOB_LEASE_BATCH, JOB_POLL_SECONDS,
+    LLM_BREAKER_COOLDOWN_SECONDS,
+)
+from financial_news_intel.core.job_queue import JobQueue, job_queue, FAILED
+from financial_news_intel.core.llm_guard import llm_guard, llm_retry_queue
+from financial_news_intel.core.story_ledger import story_ledger
+from financial_news_intel.agents.enrichment_agent import enrich_stories, store_story, record_enriched, record_failure
+
+
+class EnrichmentWorker:
+    """
+    One enrichment worker process of PIPELINE_MODE=queue: leases unique stories from the job
+    queue, enriches them (up to ENRICHMENT_CONCURRENCY in flight), stores them and completes
+    their jobs. Run as many workers as the LLM backend can serve, on one or more nodes; the
+    job queue hands each story to one worker at a time.
+
+    While a batch is being enriched, a heartbeat thread renews its leases, so only the jobs
+    of a worker that died (or hung past its lease) are handed out again. A story deferred
+    because the LLM backend is unavailable is released back to the queue, visible again after
+    the circuit breaker cooldown (the queue counts its deferrals across workers). Only jobs
+    settled under the worker's lease are counted as stored, failed or released. The enrich
+    and store stages are injectable (used by the benchmark).
+    """
+    def __init__(
+        self,
+        queue: JobQueue = job_queue,
+        worker_id: Optional[str] = None,
+        enrich: Optional[Callable[[List[ConsolidatedStory]], List[Tuple[ConsolidatedStory, Optional[str]]]]] = None,
+        store: Optional[Callable[[ConsolidatedStory], Optional[str]]] = None,
+        lease_batch: int = JOB_LEASE_BATCH,
+        heartbeat_seconds: float = JOB_HEARTBEAT_SECONDS,
+        poll_seconds: float = JOB_POLL_SECONDS,
+    ):
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.enrich = enrich or partial(
+            enrich_stories, max_concurrency=ENRICHMENT_CONCURRENCY, impact_batch_size=IMPACT_BATCH_SIZE
+        )
+        self.store = store or store_story
+        self.lease_batch = max(1, lease_batch)
+        self.heartbeat_seconds = heartbeat_seconds
+        self.poll_seconds = poll_seconds
+        self.counters = {"leased": 0, "stored": 0, "failed": 0, "released": 0, "lost": 0}
+
+    def _heartbeat(self, token: str, finished: threading.Event):
+        while not finished.wait(self.heartbeat_seconds):
+            try:
+                held = self.queue.heartbeat(token)
+            except Exception as e:
+                print(f"WARNING: [{self.worker_id}] Lease heartbeat failed: {e}")
+                continue
+            if held == 0:
+                return
+
+    def _finish(self, story: ConsolidatedStory, error: Optional[str], token: str):
+        """Stores an enriched story and settles its job."""
+        story_id = story.unique_story_id
+        if error is None:
+            record_enriched(story)
+            try:
+                error = self.store(story)
+            except Exception as e:
+                error = f"Storage failed: {e}"
+            if error is None:
+                settled = self.queue.complete(story_id, token)
+                outcome = "stored"
+            else:
+                settled = self.queue.fail(story_id, token, error)
+                outcome = "failed"
+        elif story_id in llm_retry_queue:
+            # The job queue retries it (on any worker) once the backend had time to recover;
+            # it counts the deferrals, since this process's retry queue only sees its own
+            llm_retry_queue.discard(story_id)
+            state = self.queue.release(story_id, token, LLM_BREAKER_COOLDOWN_SECONDS, error)
+            settled = state is not None
+            outcome = "released"
+            if state == FAILED:
+                print(f"ERROR: [{self.worker_id}] Story {story_id[:8]} failed after "
+                      f"{self.queue.max_deferrals} deferrals: {error}")
+                story_ledger.mark_failed(story_id, f"Dropped after {self.queue.max_deferrals} deferred attempts: {error}")
+                outcome = "failed"
+        else:
+            print(f"WARNING: [{self.worker_id}] Enrichment of story {story_id[:8]} failed: {error}")
+            record_failure(story_id, error)
+            settled = self.queue.fail(story_id, token, error)
+            outcome = "failed"
+        if settled:
+            self.counters[outcome] += 1
+        else:
+            # The lease expired and the job was handed to another worker; storage is idempotent
+            print(f"WARNING: [{self.worker_id}] Lost the lease of story {story_id[:8]} before settling it")
+            self.counters["lost"] += 1
+
+    def run_once(self) -> int:
+        """Leases, enriches and settles one batch of jobs; returns the number of jobs leased."""
+        token, stories = self.queue.lease(self.worker_id, self.lease_batch)
+        if not stories:
+            return 0
+        self.counters["leased"] += len(stories)
+
+        finished = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(token, finished), name="job-heartbeat", daemon=True)
+        heartbeat.start()
+        try:
+            try:
+                results = self.enrich(stories)
+            except Exception as e:
+                results = [(story, f"Enrichment failed: {e}") for story in stories]
+            for story, error in results:
+                self._finish(story, error, token)
+        finally:
+            finished.set()
+            heartbeat.join()
+        return len(stories)
+
+    def run(self, exit_when_empty: bool = False) -> Dict[str, Any]:
+        """
+        Works through the queue, polling every poll_seconds while it is empty. With
+        exit_when_empty, returns the worker's counters once no job is left to lease.
+        """
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Enrichment worker {self.worker_id} started "
+              f"(leases of {self.lease_batch} jobs, {ENRICHMENT_CONCURRENCY} in flight).")
+        while True:
+            try:
+                leased = self.run_once()
+            except Exception as e:
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Worker loop encountered an error: {e}. Continuing.")
+                leased = 0
+            if leased:
+                continue
+            if exit_when_empty and self.queue.pending() == 0:
+                break
+            time.sleep(self.poll_seconds)
+        print(f"[{self.worker_id}] {self.counters}; {llm_guard.summary()}")
+        return dict(self.counters)
+
+
+if __name__ == "__main__":
+    EnrichmentWorker().run()
@@ -10,8 +10,14 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.
 
 # Import the necessary components
 from financial_news_intel.pipeline import financial_news_pipeline # Your compiled graph
+from financial_news_intel.streaming_pipeline import streaming_pipeline, dedup_and_tag # PIPELINE_MODE=streaming
+from financial_news_intel.agents.ingestion_agent import iter_raw_articles
+from financial_news_intel.agents.enrichment_agent import store_story
+from financial_news_intel.core.job_queue import job_queue, DONE as JOB_DONE, FAILED as JOB_FAILED # PIPELINE_MODE=queue
+from financial_news_intel.core.story_ledger import story_ledger
 from financial_news_intel.core.models import FinancialNewsState
 from financial_news_intel.core.vector_db import vector_db_client # To clear the DB for testing/fresh runs
+from financial_news_intel.core.config import PIPELINE_MODE
 
 def run_ingestion_graph():
     """
@@ -37,41 +43,127 @@ def run_ingestion_graph():
     start_time = time.time()
     
     # 2. Invoke the compiled LangGraph pipeline
-    # Use a high recursion limit to allow the loop (iterator) to process many stories
+    # The stories are processed inside batch nodes, so the default recursion limit
+    # is enough for any batch size.
     try:
-        final_state_dict = financial_news_pipeline.invoke(
-            initial_state,
-            config={"recursion_limit": 150} 
-        )
+        final_state_dict = financial_news_pipeline.invoke(initial_state)
         final_state = FinancialNewsState(**final_state_dict)
         
         end_time = time.time()
         
         # Log success and statistics
-        unique_stories_count = len(final_state.deduplication_groups)
+        stored_count = len(final_state.enriched_stories) - sum(
+            1 for story in final_state.enriched_stories if story.unique_story_id in final_state.story_errors
+        )
         print(f"[{now}] LangGraph Pipeline finished successfully in {end_time - start_time:.2f} seconds.")
-        print(f"[{now}] -> Total unique stories found and processed: {unique_stories_count}")
+        print(f"[{now}] -> Unique stories stored: {stored_count}, failed: {len(final_state.story_errors)}")
+        for story_id, error in final_state.story_errors.items():
+            print(f"[{now}]    - {story_id[:8]}: {error}")
         print(f"[{now}] --- INGESTION COMPLETE ---")
         
     except Exception as e:
         print(f"[{now}] ❌ CRITICAL: LangGraph Pipeline failed to run: {e}")
         print(f"[{now}] --- INGESTION FAILED ---")
 
+def run_streaming_ingestion():
+    """
+    Executes one ingestion run in streaming mode: fetch, dedup, enrichment and storage run
+    concurrently, and each story is stored as soon as it is enriched.
+    """
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    print(f"\n[{now}] --- STARTING STREAMING NEWS INGESTION ---")
+    try:
+        stats = streaming_pipeline.run()
+        print(f"[{now}] -> Unique stories stored: {stats['stored']}, failed: {stats['failed']}")
+        for story_id, error in stats["story_errors"].items():
+            print(f"[{now}]    - {story_id[:8]}: {error}")
+        print(f"[{now}] --- INGESTION COMPLETE ---")
+    except Exception as e:
+        print(f"[{now}] ❌ CRITICAL: Streaming pipeline failed to run: {e}")
+        print(f"[{now}] --- INGESTION FAILED ---")
+
+def _resume_unfinished(now: str) -> int:
+    """
+    Queue mode: resumes the stories earlier runs left unfinished in the story ledger and
+    returns how many were queued. The job queue owns the retries of every story it has a
+    job for, so only stories without a job are queued (or, once enriched, stored here);
+    the ledger rows of jobs that settled are brought up to date instead.
+    """
+    resumed, resumed_enriched = story_ledger.take_unfinished()
+    jobs = job_queue.states([story.unique_story_id for story in resumed + resumed_enriched])
+    to_queue = [story for story in resumed if story.unique_story_id not in jobs]
+    to_store = [story for story in resumed_enriched if story.unique_story_id not in jobs]
+    handed_back = []
+    for story_id, (state, error) in jobs.items():
+        if state == JOB_FAILED:
+            story_ledger.mark_failed(story_id, error or "Enrichment job failed")
+        elif state == JOB_DONE:
+            story_ledger.mark_stored(story_id)
+        else:
+            # Queued or leased: a worker will enrich and store it
+            handed_back.append(story_id)
+    story_ledger.release(handed_back)
+    if jobs:
+        print(f"[{now}] -> {len(handed_back)} unfinished stories left to their enrichment jobs, "
+              f"{len(jobs) - len(handed_back)} settled from their finished jobs")
+
+    queued = job_queue.enqueue(to_queue)
+    # Already enriched: only storing is left, which needs no LLM call
+    for story in to_store:
+        store_story(story)
+    return queued
+
+def run_queue_ingestion():
+    """
+    Executes one ingestion run in queue mode: fetches and deduplicates the feeds and queues
+    each unique story for the enrichment workers (scheduler/enrichment_worker.py) at once.
+    """
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    print(f"\n[{now}] --- STARTING NEWS INGESTION (ENRICHMENT JOB QUEUE) ---")
+    try:
+        queued = _resume_unfinished(now)
+        articles = 0
+        for article in iter_raw_articles():
+            articles += 1
+            try:
+                story = dedup_and_tag(article)
+            except Exception as e:
+                print(f"[{now}] ERROR: Deduplication failed for article {article.id}: {e}")
+                continue
+            if story is not None:
+                queued += job_queue.enqueue([story])
+        stats = job_queue.stats()
+        print(f"[{now}] -> {articles} articles, {queued} stories queued for enrichment; "
+              f"queue: {stats['queued']} queued, {stats['leased']} leased, {stats['failed']} failed")
+        print(f"[{now}] --- INGESTION COMPLETE ---")
+    except Exception as e:
+        print(f"[{now}] ❌ CRITICAL: Queue ingestion failed to run: {e}")
+        print(f"[{now}] --- INGESTION FAILED ---")
+
+def run_ingestion():
+    """One ingestion run in the configured PIPELINE_MODE ('batch' LangGraph run, 'streaming' or 'queue')."""
+    if PIPELINE_MODE == "streaming":
+        run_streaming_ingestion()
+    elif PIPELINE_MODE == "queue":
+        run_queue_ingestion()
+    else:
+        run_ingestion_graph()
+
 # --- Worker Loop ---
 def start_worker(interval_seconds: int = 1000): # Default to 1000 seconds
     """
     Runs the ingestion pipeline repeatedly at the specified interval.
     """
-    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Ingestion Worker started. Pipeline will run every {interval_seconds} seconds.")
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Ingestion Worker started ({PIPELINE_MODE} mode). Pipeline will run every {interval_seconds} seconds.")
     
     # Run immediately on startup
-    run_ingestion_graph() 
+    run_ingestion() 
     
     while True:
         print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Waiting for {interval_seconds} seconds until next run...")
         time.sleep(interval_seconds)
         try:
-            run_ingestion_graph()
+            run_ingestion()
         except Exception as e:
             # This catch is mainly for unexpected outer loop failures
             print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Worker loop encountered an error: {e}. Continuing.")
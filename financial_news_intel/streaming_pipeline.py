@@ -0,0 +1,341 @@
+# financial_news_intel/streaming_pipeline.py
+
+import queue
+import threading
+import time
+from collections import deque
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from financial_news_intel.core.models import ConsolidatedStory, RawArticle
+from financial_news_intel.core.config import (
+    ENRICHMENT_CONCURRENCY, IMPACT_BATCH_SIZE, NER_PREPASS_ENABLED, STREAM_QUEUE_SIZE,
+)
+from financial_news_intel.core.llm_guard import llm_guard, llm_retry_queue
+from financial_news_intel.core.story_ledger import story_ledger
+from financial_news_intel.core.story_priority import PriorityStoryQueue, StoryPrioritizer, story_prioritizer
+from financial_news_intel.core.ner_model import extract_entities_batch, ner_model
+from financial_news_intel.agents.ingestion_agent import iter_raw_articles
+from financial_news_intel.agents.deduplication_agent import deduplicate_article
+from financial_news_intel.agents.ner_agent import seed_story_entities
+from financial_news_intel.agents.enrichment_agent import enrich_stories, store_story, record_enriched, record_failure
+
+# End-of-stream marker passed down the queues
+_DONE = object()
+# How often a stage blocked on a full or empty queue checks whether the run was aborted
+_POLL_SECONDS = 0.2
+
+
+def dedup_and_tag(article: RawArticle) -> Optional[ConsolidatedStory]:
+    """Default dedup stage: Vector DB duplicate check, then the NER pre-pass on a unique story."""
+    story = deduplicate_article(article)
+    # Once spaCy failed to load, stories skip the pre-pass without a warning each
+    if story is not None and NER_PREPASS_ENABLED and ner_model.available:
+        try:
+            seed_story_entities(story, extract_entities_batch([story.text])[0])
+        except Exception as e:
+            # Without NER the story goes through the full LLM enrichment, as in batch mode
+            print(f"WARNING: NER pre-pass failed for story {story.unique_story_id[:8]}: {e}")
+    return story
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _drain(items: queue.Queue):
+    """Empties a queue so a producer blocked on it can finish."""
+    while True:
+        try:
+            items.get_nowait()
+        except queue.Empty:
+            return
+
+
+class StreamingPipeline:
+    """
+    Streaming execution mode of the ingestion pipeline (PIPELINE_MODE=streaming).
+
+    Fetch, dedup (+ NER pre-pass), enrichment and storage run as concurrent stages connected
+    by bounded queues of STREAM_QUEUE_SIZE items. A story moves on as soon as it is found to
+    be unique, so the LLM works while the feeds are still being fetched and embedded, and the
+    first stories are indexed long before the batch ends. A full queue blocks the stage before
+    it (backpressure), so the stories held in memory are bounded by the queue sizes and the
+    stories in flight, whatever the batch size.
+
+    Unique stories wait for enrichment in priority order (core/story_priority.py), so a
+    watchlist story overtakes the stories already waiting in the unique-story queue.
+
+    Dedup is a single thread (the check-then-index of deduplicate_article must not race) and
+    storage is a single thread (shared SQLite connection and ChromaDB client). Enrichment runs
+    on enrich_workers threads; a worker that finds more unique stories waiting takes up to
+    impact_batch_size of them, so impact batching still applies under load.
+    A stage that dies (as opposed to a story that fails) aborts the run: it sets a shared stop
+    event that every blocked put/get checks, and drains its input queue, so run() always
+    returns. Stories cut off by an abort stay unfinished in the story ledger for the next run.
+    The stages are injectable callables (used by the benchmark).
+    """
+    def __init__(
+        self,
+        fetch: Optional[Callable[[Optional[List[Dict[str, Any]]]], Iterable[RawArticle]]] = None,
+        dedup: Optional[Callable[[RawArticle], Optional[ConsolidatedStory]]] = None,
+        enrich: Optional[Callable[[List[ConsolidatedStory]], List[Tuple[ConsolidatedStory, Optional[str]]]]] = None,
+        store: Optional[Callable[[ConsolidatedStory], Optional[str]]] = None,
+        enrich_workers: int = ENRICHMENT_CONCURRENCY,
+        queue_size: int = STREAM_QUEUE_SIZE,
+        impact_batch_size: int = IMPACT_BATCH_SIZE,
+        prioritizer: StoryPrioritizer = story_prioritizer,
+    ):
+        self.fetch = fetch or iter_raw_articles
+        self.dedup = dedup or dedup_and_tag
+        self.enrich = enrich or partial(enrich_stories, max_concurrency=1, impact_batch_size=impact_batch_size)
+        self.store = store or store_story
+        self.enrich_workers = max(1, enrich_workers)
+        self.queue_size = max(1, queue_size)
+        self.impact_batch_size = max(1, impact_batch_size)
+        self.prioritizer = prioritizer
+        self._lock = threading.Lock()
+
+    # --- Bookkeeping (shared by the stage threads) ---
+
+    def _reset(self):
+        self.counters = {
+            "articles": 0, "unique": 0, "duplicates": 0, "dedup_errors": 0, "enriched": 0, "stored": 0, "failed": 0,
+        }
+        self.story_errors: Dict[str, str] = {}
+        # Feed-to-index seconds of the most recent stored stories
+        self.latencies: Deque[float] = deque(maxlen=10000)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.first_indexed: Optional[float] = None
+        self.stage_error: Optional[str] = None
+        self._stop = threading.Event()
+
+    def _count(self, name: str, in_flight: int = 0):
+        with self._lock:
+            self.counters[name] += 1
+            self.in_flight += in_flight
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _fail(self, story: ConsolidatedStory, error: str):
+        with self._lock:
+            self.counters["failed"] += 1
+            self.in_flight -= 1
+            self.story_errors[story.unique_story_id] = error
+
+    def _dedup_failed(self, article: RawArticle, error: str):
+        """An article that could not be deduplicated: an error, not a duplicate (it is not indexed)."""
+        with self._lock:
+            self.counters["dedup_errors"] += 1
+            self.in_flight -= 1
+            self.story_errors[f"article {article.id}"] = error
+
+    def _abort(self, stage: str, error: Exception, upstream: Optional[queue.Queue] = None):
+        """A stage died: stops every stage and frees the stage feeding it."""
+        print(f"ERROR: {stage} stage stopped, aborting the streaming run: {error}")
+        with self._lock:
+            if self.stage_error is None:
+                self.stage_error = f"{stage} stage failed: {error}"
+        self._stop.set()
+        if upstream is not None:
+            _drain(upstream)
+
+    def _put(self, items: queue.Queue, item) -> bool:
+        """Blocking put that gives up (False) once the run is aborted."""
+        while not self._stop.is_set():
+            try:
+                items.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, items: queue.Queue):
+        """Blocking get that returns the end marker once the run is aborted."""
+        while not self._stop.is_set():
+            try:
+                return items.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _put_unique(self, unique: queue.Queue, item) -> bool:
+        """Queues an item for enrichment: highest (aged) priority first, end markers last."""
+        key = float("inf") if item is _DONE else self.prioritizer.sort_key(item[0])
+        return self._put(unique, (key, item))
+
+    # --- Stages ---
+
+    def _fetch_stage(self, raw_news_data, articles: queue.Queue):
+        try:
+            for article in self.fetch(raw_news_data):
+                self._count("articles", in_flight=1)
+                if not self._put(articles, (article, time.perf_counter())):
+                    break
+        except Exception as e:
+            # The articles fetched so far still go through; the batch just ends early
+            print(f"ERROR: Fetch stage stopped: {e}")
+        finally:
+            self._put(articles, _DONE)
+
+    def _dedup_stage(self, articles: queue.Queue, unique: queue.Queue, enriched: queue.Queue):
+        try:
+            # Stories deferred by earlier runs while the LLM backend was down go first, then the
+            # stories earlier runs (or a crashed worker) left unfinished, at their last stage
+            retried = llm_retry_queue.drain(llm_guard.breaker)
+            if retried:
+                print(f"  -> Retrying {len(retried)} stories deferred while the LLM backend was unavailable")
+            resumed, resumed_enriched = story_ledger.take_unfinished()
+            for story in retried + resumed:
+                self._count("unique", in_flight=1)
+                self._put_unique(unique, (story, time.perf_counter()))
+            for story in resumed_enriched:
+                self._count("enriched", in_flight=1)
+                self._put(enriched, (story, time.perf_counter()))
+
+            while True:
+                item = self._get(articles)
+                if item is _DONE:
+                    break
+                article, started = item
+                try:
+                    story = self.dedup(article)
+                except Exception as e:
+                    print(f"ERROR: Deduplication failed for article {article.id}: {e}")
+                    self._dedup_failed(article, f"Deduplication failed: {e}")
+                    continue
+                if story is None:
+                    self._count("duplicates", in_flight=-1)
+                    continue
+                self._count("unique")
+                self._put_unique(unique, (story, started))
+        except Exception as e:
+            self._abort("Deduplication", e, upstream=articles)
+        finally:
+            for _ in range(self.enrich_workers):
+                self._put_unique(unique, _DONE)
+
+    def _enrich_stage(self, unique: queue.Queue, enriched: queue.Queue):
+        try:
+            done = False
+            while not done:
+                item = self._get(unique)
+                if item is _DONE:
+                    break
+                chunk = [item]
+                # Take whatever else is already waiting, up to one impact batch
+                while len(chunk) < self.impact_batch_size:
+                    try:
+                        item = unique.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _DONE:
+                        done = True
+                        break
+                    chunk.append(item)
+
+                stories = [story for story, _ in chunk]
+                try:
+                    with story_ledger.renewing([story.unique_story_id for story in stories]):
+                        results = self.enrich(stories)
+                except Exception as e:
+                    results = [(story, f"Enrichment failed: {e}") for story in stories]
+                for (story, error), (_, started) in zip(results, chunk):
+                    if error is None:
+                        record_enriched(story)
+                        self._count("enriched")
+                        self._put(enriched, (story, started))
+                    else:
+                        print(f"WARNING: Skipping storage of story {story.unique_story_id[:8]}: {error}")
+                        record_failure(story.unique_story_id, error)
+                        self._fail(story, error)
+        except Exception as e:
+            self._abort("Enrichment", e, upstream=unique)
+        finally:
+            self._put(enriched, _DONE)
+
+    def _store_stage(self, enriched: queue.Queue, start: float):
+        finished_workers = 0
+        while finished_workers < self.enrich_workers:
+            item = self._get(enriched)
+            if item is _DONE:
+                if self._stop.is_set():
+                    return
+                finished_workers += 1
+                continue
+            story, started = item
+            try:
+                error = self.store(story)
+            except Exception as e:
+                error = f"Storage failed: {e}"
+            if error is not None:
+                self._fail(story, error)
+                continue
+            now = time.perf_counter()
+            self._count("stored", in_flight=-1)
+            with self._lock:
+                self.latencies.append(now - started)
+                if self.first_indexed is None:
+                    self.first_indexed = now - start
+
+    def run(self, raw_news_data: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Streams one batch of articles (the injected test articles, or the live feeds) through
+        all stages and returns its statistics once the last story is stored.
+        """
+        self._reset()
+        articles: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        unique: queue.Queue = PriorityStoryQueue(maxsize=self.queue_size)
+        enriched: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        print(
+            f"\n--- Streaming pipeline: {self.enrich_workers} enrichment workers, queues of {self.queue_size}, "
+            f"impact batches up to {self.impact_batch_size} ---"
+        )
+
+        start = time.perf_counter()
+        threads = [
+            threading.Thread(target=self._fetch_stage, args=(raw_news_data, articles), name="stream-fetch", daemon=True),
+            threading.Thread(target=self._dedup_stage, args=(articles, unique, enriched), name="stream-dedup", daemon=True),
+        ] + [
+            threading.Thread(target=self._enrich_stage, args=(unique, enriched), name=f"stream-enrich-{i}", daemon=True)
+            for i in range(self.enrich_workers)
+        ]
+        for thread in threads:
+            thread.start()
+        # Storage runs on the calling thread; it returns once every enrichment worker has finished
+        try:
+            self._store_stage(enriched, start)
+        except Exception as e:
+            self._abort("Storage", e, upstream=enriched)
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - start
+
+        latencies = list(self.latencies)
+        stats = dict(self.counters)
+        stats.update(
+            story_errors=dict(self.story_errors),
+            stage_error=self.stage_error,
+            wall_seconds=round(wall, 3),
+            first_indexed_seconds=round(self.first_indexed, 3) if self.first_indexed is not None else None,
+            latency_p50=round(_percentile(latencies, 0.5), 3),
+            latency_p95=round(_percentile(latencies, 0.95), 3),
+            latency_max=round(max(latencies), 3) if latencies else 0.0,
+            peak_in_flight=self.peak_in_flight,
+        )
+        print(
+            f"--- Streaming pipeline finished in {wall:.2f}s: {stats['articles']} articles, {stats['unique']} unique, "
+            f"{stats['stored']} stored, {stats['failed']} failed, {stats['dedup_errors']} dedup errors; feed-to-index p50 {stats['latency_p50']:.2f}s, "
+            f"p95 {stats['latency_p95']:.2f}s; at most {stats['peak_in_flight']} stories in flight ---"
+        )
+        if self.stage_error:
+            print(f"--- Streaming run aborted: {self.stage_error} ---")
+        print(f"{llm_guard.summary()}; {len(llm_retry_queue)} stories in the retry queue")
+        return stats
+
+
+# Global instance used by the ingestion worker in streaming mode
+streaming_pipeline = StreamingPipeline()
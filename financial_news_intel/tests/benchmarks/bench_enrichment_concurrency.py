@@ -0,0 +1,44 @@
+# bench_enrichment_concurrency.py
+#
+# Measures batch wall time of the entity + impact enrichment of the golden stories
+# for several concurrency limits K. Requires a running Ollama server (OLLAMA_BASE_URL)
+# started with OLLAMA_NUM_PARALLEL >= the largest K.
+#
+#   python financial_news_intel/tests/benchmarks/bench_enrichment_concurrency.py [K ...]
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from financial_news_intel.agents.enrichment_agent import enrich_stories
+from financial_news_intel.core.llm_cache import llm_cache
+from financial_news_intel.core.story_ledger import story_ledger
+from financial_news_intel.core.models import ConsolidatedStory
+from financial_news_intel.tests.golden_data import GROUND_TRUTH_MAP
+
+
+def run_enrichment_benchmark(limits=(1, 2, 4, 8)):
+    # Every run must reach the LLM
+    llm_cache.enabled = False
+    # Benchmark stories must not be checkpointed to (or resumed from) the story ledger
+    story_ledger.enabled = False
+    texts = [expected.text for expected in GROUND_TRUTH_MAP.values()]
+
+    print(f"\n--- Concurrent Enrichment Benchmark ({len(texts)} golden stories) ---")
+    print(f"{'K':>4}{'Wall time (s)':>16}{'Speedup':>10}{'Failed':>8}")
+    baseline = None
+    for k in limits:
+        stories = [ConsolidatedStory(text=text) for text in texts]
+        start = time.perf_counter()
+        results = enrich_stories(stories, max_concurrency=k)
+        elapsed = time.perf_counter() - start
+
+        baseline = baseline or elapsed
+        failed = sum(1 for _, error in results if error is not None)
+        print(f"{k:>4}{elapsed:>16.2f}{baseline / elapsed:>9.2f}x{failed:>8}")
+
+
+if __name__ == "__main__":
+    limits = tuple(int(arg) for arg in sys.argv[1:]) or (1, 2, 4, 8)
+    run_enrichment_benchmark(limits)
@@ -0,0 +1,128 @@
+# bench_enrichment_workers.py
+#
+# Enrichment throughput of PIPELINE_MODE=queue for several numbers of enrichment
+# worker processes, against the fake Ollama server (tests/fake_ollama.py, started
+# in-process with FAKE_OLLAMA_PARALLEL model slots). Unique stories (the golden
+# stories, cycled) are queued in a fresh job queue; each worker is a forked process
+# with one story in flight (one Ollama consumer, like the single-process worker), and
+# storage is simulated with a fixed delay. Reports, per worker count: wall time,
+# stories per second, speedup, and stories stored more than once (must be 0).
+# A last run kills one worker after it leased a batch, to show its jobs being
+# handed out again once their lease expires.
+#
+#   python financial_news_intel/tests/benchmarks/bench_enrichment_workers.py [WORKERS ...]
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from functools import partial
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+WORKER_COUNTS = [int(arg) for arg in sys.argv[1:]] or [1, 2, 4, 8]
+STORIES = int(os.getenv("BENCH_STORIES", 64))
+FAKE_PARALLEL = int(os.getenv("FAKE_OLLAMA_PARALLEL", 8))
+STORE_SECONDS = 0.005
+LEASE_SECONDS = 2.0
+
+# Config is read at import: set it before loading the package
+os.environ["ENRICHMENT_CONCURRENCY"] = "1"
+
+from financial_news_intel.tests.fake_ollama import start_fake_backend
+server = start_fake_backend("lognormal:0.1,0.3", seed=9, num_parallel=FAKE_PARALLEL)
+
+from financial_news_intel.agents.enrichment_agent import enrich_stories
+from financial_news_intel.core.job_queue import JobQueue, DONE, FAILED
+from financial_news_intel.core.llm_cache import llm_cache
+from financial_news_intel.core.models import ConsolidatedStory
+from financial_news_intel.scheduler.enrichment_worker import EnrichmentWorker
+from financial_news_intel.tests.golden_data import GROUND_TRUTH_MAP
+
+GOLDEN_TEXTS = [story.text for story in GROUND_TRUTH_MAP.values()]
+# Workers are forked, so they inherit the disabled cache/ledger and the benchmark's stubs
+CONTEXT = multiprocessing.get_context("fork")
+
+
+def _simulated_store(stored: list, story: ConsolidatedStory):
+    time.sleep(STORE_SECONDS)
+    stored.append(story.unique_story_id)
+    return None
+
+
+def _worker(db_path: str, worker_id: str, results):
+    stored = []
+    worker = EnrichmentWorker(
+        queue=JobQueue(db_path, lease_seconds=LEASE_SECONDS), worker_id=worker_id,
+        enrich=partial(enrich_stories, max_concurrency=1), store=partial(_simulated_store, stored),
+        lease_batch=1, heartbeat_seconds=LEASE_SECONDS / 4, poll_seconds=0.05,
+    )
+    worker.run(exit_when_empty=True)
+    results.put(stored)
+
+
+def _crashing_worker(db_path: str, lease_batch: int):
+    """Leases a batch and dies without settling it (like a killed container)."""
+    JobQueue(db_path, lease_seconds=LEASE_SECONDS).lease("crashed", lease_batch)
+    os._exit(1)
+
+
+def _run(workers: int, crash: bool = False):
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bench_jobs_"), "job_queue.db")
+    queue = JobQueue(db_path, lease_seconds=LEASE_SECONDS)
+    queue.enqueue([
+        ConsolidatedStory(text=f"{GOLDEN_TEXTS[i % len(GOLDEN_TEXTS)]} (Feed item {i}.)") for i in range(STORIES)
+    ])
+    if crash:
+        crashed = CONTEXT.Process(target=_crashing_worker, args=(db_path, 4))
+        crashed.start()
+        crashed.join()
+
+    results = CONTEXT.Queue()
+    start = time.perf_counter()
+    processes = [CONTEXT.Process(target=_worker, args=(db_path, f"w{i}", results)) for i in range(workers)]
+    for process in processes:
+        process.start()
+    stored = Counter()
+    per_worker = []
+    for _ in processes:
+        ids = results.get()
+        per_worker.append(len(ids))
+        stored.update(ids)
+    for process in processes:
+        process.join()
+    wall = time.perf_counter() - start
+
+    stats = queue.stats()
+    duplicates = sum(count - 1 for count in stored.values())
+    return wall, stats[DONE], stats[FAILED], duplicates, per_worker
+
+
+def run_enrichment_workers_benchmark(worker_counts):
+    # Every story must reach the (fake) model
+    llm_cache.enabled = False
+
+    rows = []
+    for workers in worker_counts:
+        server.reset_stats()
+        rows.append((str(workers), *_run(workers), server.stats["max_in_flight"]))
+    server.reset_stats()
+    crash_workers = max(2, min(worker_counts))
+    rows.append((f"{crash_workers}+crash", *_run(crash_workers, crash=True), server.stats["max_in_flight"]))
+    server.stop()
+
+    print(f"\n--- Enrichment job queue: {STORIES} stories, fake Ollama with {FAKE_PARALLEL} slots, latency {server.latency.spec} ---")
+    print(f"{'Workers':<10}{'Wall (s)':>10}{'Stories/s':>11}{'Speedup':>9}{'Done':>6}{'Failed':>8}{'Stored twice':>14}"
+          f"{'Peak LLM calls':>16}  Stories per worker")
+    baseline = None
+    for label, wall, done, failed, duplicates, per_worker, peak in rows:
+        baseline = baseline or wall
+        print(f"{label:<10}{wall:>10.2f}{done / wall:>11.1f}{baseline / wall:>8.2f}x{done:>6}{failed:>8}{duplicates:>14}"
+              f"{peak:>16}  {per_worker}")
+    print(f"Each worker: 1 story in flight, simulated store {STORE_SECONDS}s; lease {LEASE_SECONDS}s. "
+          f"The crash run starts after a killed worker leased 4 jobs; they are re-leased once their lease expires.")
+
+
+if __name__ == "__main__":
+    run_enrichment_workers_benchmark(WORKER_COUNTS)
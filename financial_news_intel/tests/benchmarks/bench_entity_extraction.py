@@ -0,0 +1,47 @@
+# bench_entity_extraction.py
+#
+# Compares the single-call (combined) entity + sentiment extraction with the
+# two-call path on the golden stories: latency per story, sentiment accuracy
+# and entity F1. Requires a running Ollama server (OLLAMA_BASE_URL).
+#
+#   python financial_news_intel/tests/benchmarks/bench_entity_extraction.py
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from financial_news_intel.agents.entity_agent import extract_entities_and_sentiment
+from financial_news_intel.core.llm_cache import llm_cache
+from financial_news_intel.tests.golden_data import GROUND_TRUTH_MAP
+from financial_news_intel.tests.benchmarks.golden_metrics import entity_f1, sentiment_matches
+
+
+def _evaluate(combined: bool):
+    latencies, sentiment_hits, f1_scores = [], 0, []
+
+    for story_key, expected in GROUND_TRUTH_MAP.items():
+        start = time.perf_counter()
+        entities, sentiment = extract_entities_and_sentiment(expected.text, combined=combined)
+        latencies.append(time.perf_counter() - start)
+
+        sentiment_hits += sentiment_matches(sentiment, expected.sentiment)
+        actual_names = (entities.companies + entities.regulators) if entities else []
+        f1_scores.append(entity_f1(actual_names, expected.entities.companies + expected.entities.regulators))
+
+    n = len(GROUND_TRUTH_MAP)
+    return sum(latencies) / n, sentiment_hits / n, sum(f1_scores) / n
+
+
+def run_entity_extraction_benchmark():
+    # Measure real LLM calls, not cache hits
+    llm_cache.enabled = False
+    print("\n--- Entity + Sentiment Extraction Benchmark (golden stories) ---")
+    print(f"{'Mode':<12}{'Latency/story (s)':>20}{'Sentiment acc':>16}{'Entity F1':>12}")
+    for label, combined in (("two-call", False), ("combined", True)):
+        latency, sentiment_acc, f1 = _evaluate(combined)
+        print(f"{label:<12}{latency:>20.2f}{sentiment_acc:>16.2%}{f1:>12.3f}")
+
+
+if __name__ == "__main__":
+    run_entity_extraction_benchmark()
@@ -0,0 +1,70 @@
+# bench_fake_ollama_pipeline.py
+#
+# Reproducible pipeline benchmark without a real model: starts the fake Ollama
+# server (tests/fake_ollama.py) in-process and runs entity + impact enrichment
+# of the golden stories against it. Reports, per concurrency limit K:
+#   wall time, simulated model time, orchestration overhead per story (client
+#   side time not spent waiting on the model), speedup over K=1, and failed stories
+# The last row repeats the largest K with failure injection (errors + malformed JSON).
+#
+#   python financial_news_intel/tests/benchmarks/bench_fake_ollama_pipeline.py 1 2 4 8
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+DEFAULT_CONCURRENCY = [1, 2, 4, 8]
+LEVELS = [int(arg) for arg in sys.argv[1:]] or DEFAULT_CONCURRENCY
+NUM_PARALLEL = max(LEVELS)
+
+# Config is read at import: size the connection pool for the largest K before loading the package
+os.environ["ENRICHMENT_CONCURRENCY"] = str(NUM_PARALLEL)
+
+from financial_news_intel.tests.fake_ollama import start_fake_backend
+server = start_fake_backend("lognormal:0.2,0.3", seed=42, num_parallel=NUM_PARALLEL)
+
+from financial_news_intel.agents.enrichment_agent import enrich_stories
+from financial_news_intel.core.llm_cache import llm_cache
+from financial_news_intel.core.models import ConsolidatedStory
+from financial_news_intel.tests.golden_data import GROUND_TRUTH_MAP
+
+
+def _stories():
+    return [ConsolidatedStory(text=story.text) for story in GROUND_TRUTH_MAP.values()]
+
+
+def _run(concurrency: int):
+    server.reset_stats()
+    stories = _stories()
+    start = time.perf_counter()
+    results = enrich_stories(stories, max_concurrency=concurrency)
+    wall = time.perf_counter() - start
+    failed = sum(1 for _, error in results if error is not None)
+    return wall, dict(server.stats), failed
+
+
+def run_fake_pipeline_benchmark(concurrency_levels):
+    # Every story must reach the (fake) model
+    llm_cache.enabled = False
+    n = len(GROUND_TRUTH_MAP)
+
+    print(f"\n--- Pipeline on fake Ollama ({server.url}, latency {server.latency.spec}, num_parallel {NUM_PARALLEL}) ---")
+    print(f"{'K':<6}{'Wall (s)':>10}{'Model (s)':>11}{'Requests':>10}{'Overhead/story (ms)':>21}{'Speedup':>9}{'Failed':>8}")
+    baseline = None
+    rows = [(k, {}) for k in concurrency_levels]
+    rows.append((max(concurrency_levels), {"error_rate": 0.1, "malformed_rate": 0.1}))
+    for k, faults in rows:
+        server.configure(error_rate=faults.get("error_rate", 0.0), malformed_rate=faults.get("malformed_rate", 0.0))
+        wall, stats, failed = _run(k)
+        # Client time beyond the model time, spread over the K workers
+        overhead_ms = max(0.0, wall - stats["model_seconds"] / k) * 1000 / n
+        baseline = baseline or wall
+        label = f"{k}{'*' if faults else ''}"
+        print(f"{label:<6}{wall:>10.2f}{stats['model_seconds']:>11.2f}{stats['requests']:>10}{overhead_ms:>21.1f}{baseline / wall:>9.2f}x{failed:>7}")
+    print("* with 10% injected HTTP 500s and 10% malformed JSON replies")
+    server.stop()
+
+
+if __name__ == "__main__":
+    run_fake_pipeline_benchmark(LEVELS)
@@ -0,0 +1,107 @@
+# bench_impact_batching.py
+#
+# Compares single-story impact requests with multi-story (batched) requests on
+# the golden stories (golden entities and sentiment as input): prompt and
+# completion tokens per story, latency per story, stories that needed the
+# single-story fallback, and ticker recall. Requires a running Ollama server.
+#
+#   python financial_news_intel/tests/benchmarks/bench_impact_batching.py 1 2 4 8
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from financial_news_intel.agents.impact_agent import (
+    IMPACT_PROMPT, IMPACT_TEMPERATURE, _story_prompt_inputs, _apply_resolved_tickers, analyze_story_impacts_batch,
+)
+from financial_news_intel.core.llm_cache import llm_cache
+from financial_news_intel.core.llm_model import llm_service
+from financial_news_intel.core.models import ConsolidatedStory, ImpactedStockList
+from financial_news_intel.tests.golden_data import GROUND_TRUTH_MAP
+
+DEFAULT_BATCH_SIZES = [1, 2, 4, 8]
+
+# Single-story chain that keeps the raw message, for its token usage
+SINGLE_CHAIN = IMPACT_PROMPT | llm_service.get_llm(temperature=IMPACT_TEMPERATURE).with_structured_output(
+    ImpactedStockList, include_raw=True
+)
+
+
+def _golden_stories():
+    return [
+        ConsolidatedStory(unique_story_id=expected.unique_story_id, text=expected.text,
+                          entities=expected.entities, sentiment=expected.sentiment)
+        for expected in GROUND_TRUTH_MAP.values()
+    ]
+
+
+def _run_single(story):
+    inputs = dict(_story_prompt_inputs(story), tool_instructions="")
+    start = time.perf_counter()
+    response = SINGLE_CHAIN.invoke(inputs)
+    seconds = time.perf_counter() - start
+    usage = getattr(response["raw"], "usage_metadata", None) or {}
+    return response["parsed"], usage.get("input_tokens", 0), usage.get("output_tokens", 0), seconds
+
+
+def _evaluate(batch_size):
+    stories = _golden_stories()
+    totals = {"input_tokens": 0, "output_tokens": 0, "seconds": 0.0, "fallbacks": 0}
+    predicted = {}
+
+    for i in range(0, len(stories), batch_size):
+        chunk = stories[i:i + batch_size]
+        results = {}
+        if batch_size > 1:
+            try:
+                results, usage = analyze_story_impacts_batch(chunk)
+                for key in ("input_tokens", "output_tokens", "seconds"):
+                    totals[key] += usage[key]
+            except Exception as e:
+                print(f"ERROR in batched request: {e}")
+        for story in chunk:
+            if story.unique_story_id not in results:
+                totals["fallbacks"] += batch_size > 1
+                try:
+                    parsed, input_tokens, output_tokens, seconds = _run_single(story)
+                except Exception as e:
+                    print(f"ERROR on {story.unique_story_id}: {e}")
+                    continue
+                totals["input_tokens"] += input_tokens
+                totals["output_tokens"] += output_tokens
+                totals["seconds"] += seconds
+                if parsed is None:
+                    continue
+                results[story.unique_story_id] = parsed
+            predicted[story.unique_story_id] = {
+                impact.stock_ticker for impact in _apply_resolved_tickers(results[story.unique_story_id].impacts)
+            }
+
+    hits, wanted_total = 0, 0
+    for story_id, expected in GROUND_TRUTH_MAP.items():
+        wanted = {impact.stock_ticker for impact in expected.impacted_stocks}
+        hits += len(wanted & predicted.get(expected.unique_story_id, set()))
+        wanted_total += len(wanted)
+
+    n = len(stories)
+    return (
+        totals["input_tokens"] / n, totals["output_tokens"] / n, totals["seconds"] / n,
+        totals["fallbacks"], hits / max(wanted_total, 1),
+    )
+
+
+def run_impact_batching_benchmark(batch_sizes):
+    # Every story must reach the LLM
+    llm_cache.enabled = False
+
+    print("\n--- Impacted Stock Agent: single vs multi-story requests (golden stories) ---")
+    print(f"{'Batch size':<12}{'Prompt tok/story':>18}{'Output tok/story':>18}{'Latency/story (s)':>20}{'Fallbacks':>11}{'Ticker recall':>15}")
+    for batch_size in batch_sizes:
+        prompt_tokens, output_tokens, latency, fallbacks, recall = _evaluate(batch_size)
+        print(f"{batch_size:<12}{prompt_tokens:>18.0f}{output_tokens:>18.0f}{latency:>20.2f}{fallbacks:>11}{recall:>15.2%}")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_BATCH_SIZES
+    run_impact_batching_benchmark(sizes)
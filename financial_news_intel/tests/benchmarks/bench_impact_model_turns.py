@@ -0,0 +1,65 @@
+# bench_impact_model_turns.py
+#
+# Counts model turns per story of the Impacted Stock Agent on the golden stories
+# (golden entities and sentiment as input), for three ticker lookup strategies:
+#   per-name tool   - model calls resolve_company_ticker once per company (previous behaviour)
+#   batch tool      - model calls resolve_company_tickers once with all names
+#   pre-resolved    - tickers resolved deterministically and injected, no tools bound
+# Requires a running Ollama server (OLLAMA_BASE_URL).
+#
+#   python financial_news_intel/tests/benchmarks/bench_impact_model_turns.py
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from financial_news_intel.agents.impact_agent import analyze_story_impacts, _apply_resolved_tickers
+from financial_news_intel.agents.tools import resolve_company_ticker, resolve_company_tickers
+from financial_news_intel.core.llm_cache import llm_cache
+from financial_news_intel.core.models import ConsolidatedStory
+from financial_news_intel.tests.golden_data import GROUND_TRUTH_MAP
+
+MODES = [
+    ("per-name tool", [resolve_company_ticker], False),
+    ("batch tool", [resolve_company_tickers], False),
+    ("pre-resolved", None, True),
+]
+
+
+def _evaluate(tools, pre_resolve):
+    turns, latencies, ticker_hits, expected_total = [], [], 0, 0
+
+    for expected in GROUND_TRUTH_MAP.values():
+        story = ConsolidatedStory(text=expected.text, entities=expected.entities, sentiment=expected.sentiment)
+        start = time.perf_counter()
+        try:
+            result, story_turns = analyze_story_impacts(story, tools=tools, pre_resolve=pre_resolve)
+            actual = {impact.stock_ticker for impact in _apply_resolved_tickers(result.impacts)}
+        except Exception as e:
+            print(f"ERROR on {expected.unique_story_id}: {e}")
+            story_turns, actual = 0, set()
+        latencies.append(time.perf_counter() - start)
+        turns.append(story_turns)
+
+        wanted = {impact.stock_ticker for impact in expected.impacted_stocks}
+        ticker_hits += len(wanted & actual)
+        expected_total += len(wanted)
+
+    n = len(GROUND_TRUTH_MAP)
+    return sum(turns) / n, max(turns), sum(latencies) / n, ticker_hits / max(expected_total, 1)
+
+
+def run_model_turns_benchmark():
+    # Every story must reach the LLM
+    llm_cache.enabled = False
+
+    print("\n--- Impacted Stock Agent: model turns per story (golden stories) ---")
+    print(f"{'Mode':<16}{'Turns/story':>13}{'Max turns':>11}{'Latency/story (s)':>20}{'Ticker recall':>15}")
+    for label, tools, pre_resolve in MODES:
+        avg_turns, max_turns, latency, recall = _evaluate(tools, pre_resolve)
+        print(f"{label:<16}{avg_turns:>13.2f}{max_turns:>11}{latency:>20.2f}{recall:>15.2%}")
+
+
+if __name__ == "__main__":
+    run_model_turns_benchmark()
@@ -0,0 +1,95 @@
+# bench_input_shaping.py
+#
+# Latency and accuracy of the entity and impact agents at several input token
+# budgets (0 = full text). The golden stories are short, so each one is padded
+# with article boilerplate (market disclaimers, newsletter footers) to the length
+# of a full web article; shaping has to keep the facts and drop the padding.
+# Requires a running Ollama server (OLLAMA_BASE_URL).
+#
+#   python financial_news_intel/tests/benchmarks/bench_input_shaping.py 0 512 256 128 64
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from financial_news_intel.agents.entity_agent import extract_entities_and_sentiment
+from financial_news_intel.agents.impact_agent import analyze_story_impacts, _apply_resolved_tickers
+from financial_news_intel.core import token_budget
+from financial_news_intel.core.llm_cache import llm_cache
+from financial_news_intel.core.models import ConsolidatedStory
+from financial_news_intel.tests.golden_data import GROUND_TRUTH_MAP
+from financial_news_intel.tests.benchmarks.golden_metrics import entity_f1, sentiment_matches
+
+DEFAULT_BUDGETS = [0, 512, 256, 128, 64]
+BOILERPLATE = (
+    "Disclaimer: The views and investment tips expressed by experts are their own and not those of the website or its management. "
+    "Readers are advised to check with certified experts before taking any investment decisions. "
+    "Subscribe to our newsletter to get the day's top stories delivered to your inbox every morning. "
+    "Follow us on social media for the latest updates, videos and analysis from our newsroom. "
+)
+PADDING_REPEATS = 12
+
+
+def _padded(text: str) -> str:
+    return text + " " + BOILERPLATE * PADDING_REPEATS
+
+
+def _evaluate(budget: int):
+    token_budget.AGENT_BUDGETS.update(entity=budget, impact=budget)
+    tokens, entity_latency, impact_latency = [], [], []
+    sentiment_hits, f1_scores, ticker_hits, wanted_total = 0, [], 0, 0
+
+    for expected in GROUND_TRUTH_MAP.values():
+        story = ConsolidatedStory(text=_padded(expected.text))
+        shaped = token_budget.shape_story_text(story, "entity")
+        tokens.append(token_budget.token_counter.count(shaped))
+
+        start = time.perf_counter()
+        entities, sentiment = extract_entities_and_sentiment(shaped)
+        entity_latency.append(time.perf_counter() - start)
+        sentiment_hits += sentiment_matches(sentiment, expected.sentiment)
+        actual_names = (entities.companies + entities.regulators) if entities else []
+        f1_scores.append(entity_f1(actual_names, expected.entities.companies + expected.entities.regulators))
+
+        # Impact analysis on golden entities, so the two stages are scored independently
+        story.entities, story.sentiment = expected.entities, expected.sentiment
+        start = time.perf_counter()
+        try:
+            result, _ = analyze_story_impacts(story)
+            actual = {impact.stock_ticker for impact in _apply_resolved_tickers(result.impacts)}
+        except Exception as e:
+            print(f"ERROR on {expected.unique_story_id}: {e}")
+            actual = set()
+        impact_latency.append(time.perf_counter() - start)
+        wanted = {impact.stock_ticker for impact in expected.impacted_stocks}
+        ticker_hits += len(wanted & actual)
+        wanted_total += len(wanted)
+
+    n = len(GROUND_TRUTH_MAP)
+    return (
+        sum(tokens) / n, sum(entity_latency) / n, sentiment_hits / n, sum(f1_scores) / n,
+        sum(impact_latency) / n, ticker_hits / max(wanted_total, 1),
+    )
+
+
+def run_input_shaping_benchmark(budgets):
+    # Every call must reach the LLM
+    llm_cache.enabled = False
+
+    print("\n--- Token-budgeted input shaping (golden stories padded to article length) ---")
+    print(
+        f"{'Budget':<8}{'Tokens/story':>14}{'Entity s/story':>16}{'Sentiment acc':>15}"
+        f"{'Entity F1':>11}{'Impact s/story':>16}{'Ticker recall':>15}"
+    )
+    for budget in budgets:
+        shaped_tokens, entity_s, sentiment_acc, f1, impact_s, recall = _evaluate(budget)
+        label = "full" if budget <= 0 else str(budget)
+        print(
+            f"{label:<8}{shaped_tokens:>14.0f}{entity_s:>16.2f}{sentiment_acc:>15.2%}"
+            f"{f1:>11.3f}{impact_s:>16.2f}{recall:>15.2%}"
+        )
+
+
+if __name__ == "__main__":
+    run_input_shaping_benchmark([int(arg) for arg in sys.argv[1:]] or DEFAULT_BUDGETS)
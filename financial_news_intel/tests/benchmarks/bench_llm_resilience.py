@@ -0,0 +1,84 @@
+# bench_llm_resilience.py
+#
+# Throughput of the golden-story enrichment against a healthy, slow, flaky and
+# down fake Ollama backend (tests/fake_ollama.py, started in-process), with the
+# LLM call guard (retries with jitter, AIMD concurrency, circuit breaker, retry
+# queue) on and off. Reports wall time, enriched stories per second, stories
+# enriched / deferred to the retry queue / failed, retries, breaker trips and
+# the final adaptive concurrency limit.
+#
+#   python financial_news_intel/tests/benchmarks/bench_llm_resilience.py [K]
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+CONCURRENCY = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+
+# Config is read at import: set it before loading the package
+os.environ["ENRICHMENT_CONCURRENCY"] = str(CONCURRENCY)
+os.environ.setdefault("OLLAMA_REQUEST_TIMEOUT", "5")
+
+from financial_news_intel.tests.fake_ollama import start_fake_backend
+server = start_fake_backend(seed=7, num_parallel=CONCURRENCY)
+
+from financial_news_intel.agents.enrichment_agent import enrich_stories
+from financial_news_intel.core.llm_cache import llm_cache
+from financial_news_intel.core.llm_guard import llm_guard, llm_retry_queue, AIMDLimiter, CircuitBreaker
+from financial_news_intel.core.models import ConsolidatedStory
+from financial_news_intel.tests.golden_data import GROUND_TRUTH_MAP
+
+# (label, fake backend settings); the server processes CONCURRENCY requests at a time
+SCENARIOS = [
+    ("healthy", {"latency": "lognormal:0.1,0.2", "error_rate": 0.0, "hang_rate": 0.0}),
+    ("slow", {"latency": "lognormal:0.6,0.5", "error_rate": 0.0, "hang_rate": 0.0}),
+    ("flaky", {"latency": "lognormal:0.1,0.2", "error_rate": 0.3, "hang_rate": 0.0}),
+    ("stalling", {"latency": "lognormal:0.1,0.2", "error_rate": 0.0, "hang_rate": 0.1, "hang_seconds": 8}),
+    ("down", {"latency": "fixed:0.05", "error_rate": 1.0, "hang_rate": 0.0}),
+]
+
+
+def _reset_guard(enabled: bool):
+    llm_guard.enabled = enabled
+    llm_guard.base_delay, llm_guard.max_delay = 0.1, 1.0
+    llm_guard.limiter = AIMDLimiter(max_limit=CONCURRENCY)
+    llm_guard.breaker = CircuitBreaker(cooldown_seconds=5)
+    llm_guard.counters = {name: 0 for name in llm_guard.counters}
+    llm_retry_queue.drain()
+
+
+def _run(settings, guarded: bool):
+    server.configure(**settings)
+    server.reset_stats()
+    _reset_guard(guarded)
+    stories = [ConsolidatedStory(text=story.text) for story in GROUND_TRUTH_MAP.values()]
+
+    start = time.perf_counter()
+    results = enrich_stories(stories, max_concurrency=CONCURRENCY)
+    wall = time.perf_counter() - start
+
+    enriched = sum(1 for _, error in results if error is None)
+    deferred = sum(1 for _, error in results if error and error.startswith("Deferred"))
+    return wall, enriched, deferred, len(results) - enriched - deferred, llm_guard.stats()
+
+
+def run_resilience_benchmark():
+    # Every story must reach the (fake) model
+    llm_cache.enabled = False
+
+    print(f"\n--- LLM call guard under a degraded backend (K={CONCURRENCY}, {len(GROUND_TRUTH_MAP)} golden stories) ---")
+    print(f"{'Scenario':<10}{'Guard':<7}{'Wall (s)':>10}{'Stories/s':>11}{'Enriched':>10}{'Deferred':>10}{'Failed':>8}{'Retries':>9}{'Trips':>7}{'Limit':>7}")
+    for label, settings in SCENARIOS:
+        for guarded in (False, True):
+            wall, enriched, deferred, failed, stats = _run(settings, guarded)
+            limit = f"{stats['concurrency_limit']:.1f}" if guarded else "-"
+            print(
+                f"{label:<10}{'on' if guarded else 'off':<7}{wall:>10.2f}{enriched / wall:>11.2f}{enriched:>10}"
+                f"{deferred:>10}{failed:>8}{stats['retries']:>9}{stats['breaker_trips']:>7}{limit:>7}"
+            )
+    server.stop()
+
+
+if __name__ == "__main__":
+    run_resilience_benchmark()
@@ -0,0 +1,87 @@
+# bench_model_routing.py
+#
+# Per-agent model routing against the fake Ollama server (tests/fake_ollama.py,
+# started in-process) serving two models: a fast but error-prone small model and
+# a slower, reliable large model. The golden stories are enriched with
+#   large only      - every agent on the large tier (one model for everything)
+#   small only      - every agent on the small tier, no escalation
+#   routed          - AGENT_MODEL_TIERS defaults (entity/sentiment small, impact large) + escalation
+#   small+escalate  - every agent on the small tier, escalating to the large tier
+# Reports wall time, failed and incomplete stories (no sentiment), escalations,
+# and calls / average latency per tier.
+#
+#   python financial_news_intel/tests/benchmarks/bench_model_routing.py [K]
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+CONCURRENCY = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+SMALL_MODEL, LARGE_MODEL = "fake-small", "fake-large"
+PROFILES = {
+    SMALL_MODEL: {"latency": "lognormal:0.08,0.2", "malformed_rate": 0.15, "sloppy_rate": 0.2},
+    LARGE_MODEL: {"latency": "lognormal:0.5,0.2"},
+}
+
+# Config is read at import: set it before loading the package
+os.environ["ENRICHMENT_CONCURRENCY"] = str(CONCURRENCY)
+
+from financial_news_intel.tests.fake_ollama import start_fake_backend
+server = start_fake_backend(seed=11, num_parallel=2 * CONCURRENCY, model_profiles=PROFILES)
+
+from financial_news_intel.agents.enrichment_agent import enrich_stories
+from financial_news_intel.core.config import AGENT_MODEL_TIERS
+from financial_news_intel.core.llm_cache import llm_cache
+from financial_news_intel.core.llm_model import llm_service
+from financial_news_intel.core.models import ConsolidatedStory
+from financial_news_intel.core.structured_output import structured_output
+from financial_news_intel.tests.golden_data import GROUND_TRUTH_MAP
+
+AGENTS = ["sentiment", "entity", "impact", "impact_batch", "query"]
+SETUPS = [
+    ("large only", {agent: "large" for agent in AGENTS}, False),
+    ("small only", {agent: "small" for agent in AGENTS}, False),
+    ("routed", dict(AGENT_MODEL_TIERS), True),
+    ("small+escalate", {agent: "small" for agent in AGENTS}, True),
+]
+
+
+def _run(agent_tiers, escalation: bool):
+    server.reset_stats()
+    llm_service.agent_tiers, llm_service.escalation = agent_tiers, escalation
+    llm_service.reset_stats()
+    structured_output.reset()
+    stories = [ConsolidatedStory(text=story.text) for story in GROUND_TRUTH_MAP.values()]
+
+    start = time.perf_counter()
+    results = enrich_stories(stories, max_concurrency=CONCURRENCY)
+    wall = time.perf_counter() - start
+
+    failed = sum(1 for _, error in results if error is not None)
+    incomplete = sum(1 for story, error in results if error is None and story.sentiment is None)
+    return wall, failed, incomplete, llm_service.tier_stats()
+
+
+def run_model_routing_benchmark():
+    # Every story must reach the (fake) models
+    llm_cache.enabled = False
+    llm_service.register("small", SMALL_MODEL)
+    llm_service.register("large", LARGE_MODEL)
+
+    print(f"\n--- Model routing: {SMALL_MODEL} {PROFILES[SMALL_MODEL]} vs {LARGE_MODEL} {PROFILES[LARGE_MODEL]} (K={CONCURRENCY}) ---")
+    print(f"{'Setup':<16}{'Wall (s)':>10}{'Failed':>8}{'Incomplete':>12}{'Escalations':>13}{'Small calls':>13}{'Small avg':>11}{'Large calls':>13}{'Large avg':>11}")
+    for label, agent_tiers, escalation in SETUPS:
+        wall, failed, incomplete, stats = _run(agent_tiers, escalation)
+        small = stats["tiers"].get("small", {"calls": 0, "avg_seconds": 0.0})
+        large = stats["tiers"].get("large", {"calls": 0, "avg_seconds": 0.0})
+        print(
+            f"{label:<16}{wall:>10.2f}{failed:>8}{incomplete:>12}{sum(stats['escalations'].values()):>13}"
+            f"{small['calls']:>13}{small['avg_seconds']:>11.2f}{large['calls']:>13}{large['avg_seconds']:>11.2f}"
+        )
+    print("Tier calls include re-asks on the same tier; avg is the time per routed call on that tier")
+    server.stop()
+
+
+if __name__ == "__main__":
+    run_model_routing_benchmark()
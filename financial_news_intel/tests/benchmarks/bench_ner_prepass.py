@@ -0,0 +1,60 @@
+# bench_ner_prepass.py
+#
+# Evaluates the spaCy NER pre-pass on the golden stories: throughput of nlp.pipe versus
+# one nlp() call per story, how many stories would skip the impact LLM call, how many of
+# those skips are wrong (the golden story has impacted stocks), and recall of the golden
+# companies among the seeded ORG entities. Requires the spaCy model (SPACY_MODEL_NAME).
+#
+#   python financial_news_intel/tests/benchmarks/bench_ner_prepass.py [n_process] [batch_size]
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from financial_news_intel.agents.ner_agent import seed_story_entities
+from financial_news_intel.core.models import ConsolidatedStory
+from financial_news_intel.core.ner_model import extract_entities, extract_entities_batch, ner_model
+from financial_news_intel.tests.golden_data import GROUND_TRUTH_MAP
+
+
+def run_ner_prepass_benchmark(n_process=1, batch_size=64, repeat=10):
+    golden = list(GROUND_TRUTH_MAP.values())
+    texts = [expected.text for expected in golden]
+    ner_model.get_nlp()  # load outside the timings
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            extract_entities(text)
+    single_ms = (time.perf_counter() - start) * 1000 / (repeat * len(texts))
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        batch_entities = extract_entities_batch(texts, n_process=n_process, batch_size=batch_size)
+    pipe_ms = (time.perf_counter() - start) * 1000 / (repeat * len(texts))
+
+    skipped, false_skips, found, expected_total = 0, 0, 0, 0
+    for expected, entities in zip(golden, batch_entities):
+        story = seed_story_entities(ConsolidatedStory(text=expected.text), entities)
+        if story.market_relevant is False:
+            skipped += 1
+            if expected.impacted_stocks:
+                false_skips += 1
+                print(f"  false skip: {expected.unique_story_id}")
+
+        seeded = " | ".join(story.entities.companies).lower()
+        for company in expected.entities.companies:
+            expected_total += 1
+            found += company.lower() in seeded
+
+    print(f"\n--- NER Pre-pass Benchmark ({len(texts)} golden stories, n_process={n_process}, batch_size={batch_size}) ---")
+    print(f"nlp() per story:       {single_ms:.2f} ms/story")
+    print(f"nlp.pipe over batch:   {pipe_ms:.2f} ms/story")
+    print(f"Impact calls skipped:  {skipped}/{len(texts)} (false skips: {false_skips})")
+    print(f"Golden company recall: {found / max(expected_total, 1):.2%}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    run_ner_prepass_benchmark(*args)
@@ -0,0 +1,157 @@
+# bench_priority_scheduling.py
+#
+# Time-to-insight (enqueued -> enriched and stored) of watchlist stories with the
+# enrichment job queue leased in feed (FIFO) order vs priority order
+# (core/story_priority.py), against the fake Ollama server (tests/fake_ollama.py,
+# started in-process). K in-process enrichment workers each enrich one story at a
+# time; storage is simulated. Stories are the golden stories, the watchlist being
+# RELIANCE, HDFCBANK and INFY.
+#   burst   - a backlog of BURST_STORIES lands at once (1 in 10 is a watchlist story)
+#   steady  - stories keep arriving 1.5x faster than the workers finish them, 3 in 4 of
+#             them watchlist stories: without aging the other stories wait for the end
+#             of the stream; aging (STEADY_AGING_PER_MINUTE, accelerated for a short
+#             run) bounds their wait
+# Reports time-to-insight p50 / p95 / max of watchlist and other stories.
+#
+#   python financial_news_intel/tests/benchmarks/bench_priority_scheduling.py [K]
+import os
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+WORKERS = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+BURST_STORIES, STEADY_STORIES = 80, 160
+STEADY_OVERLOAD = 1.5
+STEADY_AGING_PER_MINUTE = 120.0
+STORE_SECONDS = 0.005
+WATCHLIST = ["RELIANCE", "HDFCBANK", "INFY"]
+
+# Config is read at import: set it before loading the package
+os.environ["ENRICHMENT_CONCURRENCY"] = str(WORKERS)
+
+from financial_news_intel.tests.fake_ollama import start_fake_backend
+server = start_fake_backend("lognormal:0.1,0.3", seed=11, num_parallel=WORKERS)
+
+from financial_news_intel.agents.enrichment_agent import enrich_stories
+from financial_news_intel.core.job_queue import JobQueue
+from financial_news_intel.core.llm_cache import llm_cache
+from financial_news_intel.core.story_priority import StoryPrioritizer
+from financial_news_intel.core.models import ConsolidatedStory
+from financial_news_intel.scheduler.enrichment_worker import EnrichmentWorker
+from financial_news_intel.streaming_pipeline import _percentile
+from financial_news_intel.tests.golden_data import GROUND_TRUTH_MAP
+
+
+def _stories(n: int, watchlist_every: int, of: int):
+    """n stories (unique texts), watchlist_every out of every `of` mentioning a watchlist ticker."""
+    prioritizer = StoryPrioritizer(watchlist=WATCHLIST)
+    watch_texts, other_texts = [], []
+    for expected in GROUND_TRUTH_MAP.values():
+        story = ConsolidatedStory(text=expected.text)
+        (watch_texts if prioritizer.watchlist_hits(story) else other_texts).append(expected.text)
+
+    stories, watched = [], set()
+    for i in range(n):
+        # Watchlist stories come last in each group of `of`, i.e. late in feed order
+        is_watch = i % of >= of - watchlist_every
+        pool = watch_texts if is_watch else other_texts
+        story = ConsolidatedStory(text=f"{pool[i % len(pool)]} (Feed item {i}.)")
+        stories.append(story)
+        if is_watch:
+            watched.add(story.unique_story_id)
+    return stories, watched
+
+
+def _run(prioritizer: StoryPrioritizer, stories, arrival_interval: float):
+    queue = JobQueue(os.path.join(tempfile.mkdtemp(prefix="bench_priority_"), "job_queue.db"), prioritizer=prioritizer)
+    enqueued, stored = {}, {}
+    produced = threading.Event()
+
+    def produce():
+        if arrival_interval == 0:
+            now = time.time()
+            enqueued.update((story.unique_story_id, now) for story in stories)
+            queue.enqueue(stories)
+        else:
+            for story in stories:
+                enqueued[story.unique_story_id] = time.time()
+                queue.enqueue([story])
+                time.sleep(arrival_interval)
+        produced.set()
+
+    def store(story: ConsolidatedStory):
+        time.sleep(STORE_SECONDS)
+        stored[story.unique_story_id] = time.time()
+        return None
+
+    def work(worker: EnrichmentWorker):
+        while True:
+            if worker.run_once() == 0:
+                if produced.is_set() and queue.pending() == 0:
+                    return
+                time.sleep(0.01)
+
+    threads = [threading.Thread(target=produce)] + [
+        threading.Thread(target=work, args=(EnrichmentWorker(
+            queue=queue, worker_id=f"w{i}", enrich=partial(enrich_stories, max_concurrency=1), store=store,
+            lease_batch=1, heartbeat_seconds=10, poll_seconds=0.01,
+        ),)) for i in range(WORKERS)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    return wall, {story_id: stored[story_id] - enqueued[story_id] for story_id in stored}
+
+
+def _row(label: str, wall: float, waits, watched):
+    watch = [wait for story_id, wait in waits.items() if story_id in watched]
+    other = [wait for story_id, wait in waits.items() if story_id not in watched]
+    print(
+        f"{label:<24}{wall:>9.2f}{len(watch):>7}{_percentile(watch, 0.5):>8.2f}{_percentile(watch, 0.95):>8.2f}"
+        f"{max(watch or [0]):>8.2f}{len(other):>7}{_percentile(other, 0.5):>8.2f}{_percentile(other, 0.95):>8.2f}"
+        f"{max(other or [0]):>8.2f}"
+    )
+
+
+def _scenario(label: str, prioritizer: StoryPrioritizer, n: int, watchlist_every: int, of: int, arrival_interval: float):
+    stories, watched = _stories(n, watchlist_every, of)
+    wall, waits = _run(prioritizer, stories, arrival_interval)
+    return label, wall, waits, watched
+
+
+def run_priority_scheduling_benchmark():
+    # Every story must reach the (fake) model
+    llm_cache.enabled = False
+
+    rows = [
+        _scenario("burst, feed order", StoryPrioritizer(watchlist=WATCHLIST, enabled=False), BURST_STORIES, 1, 10, 0),
+        _scenario("burst, priority", StoryPrioritizer(watchlist=WATCHLIST), BURST_STORIES, 1, 10, 0),
+    ]
+    capacity = BURST_STORIES / rows[0][1]
+    interval = 1.0 / (capacity * STEADY_OVERLOAD)
+    rows += [
+        _scenario("steady, no aging", StoryPrioritizer(watchlist=WATCHLIST, aging_per_minute=0.0),
+                  STEADY_STORIES, 3, 4, interval),
+        _scenario(f"steady, aging {STEADY_AGING_PER_MINUTE:g}/min",
+                  StoryPrioritizer(watchlist=WATCHLIST, aging_per_minute=STEADY_AGING_PER_MINUTE),
+                  STEADY_STORIES, 3, 4, interval),
+    ]
+    server.stop()
+
+    print(f"\n--- Enrichment priority scheduling: {WORKERS} workers, fake Ollama latency {server.latency.spec}, watchlist {WATCHLIST} ---")
+    print(f"{'Scenario':<24}{'Wall (s)':>9}{'Watch':>7}{'p50':>8}{'p95':>8}{'max':>8}{'Other':>7}{'p50':>8}{'p95':>8}{'max':>8}")
+    for label, wall, waits, watched in rows:
+        _row(label, wall, waits, watched)
+    print(f"Time-to-insight in seconds (enqueued -> stored). Steady arrivals every {interval * 1000:.0f} ms "
+          f"({STEADY_OVERLOAD}x the {capacity:.1f} stories/s the workers sustained in the burst).")
+
+
+if __name__ == "__main__":
+    run_priority_scheduling_benchmark()
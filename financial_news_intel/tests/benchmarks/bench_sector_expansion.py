@@ -0,0 +1,68 @@
+# bench_sector_expansion.py
+#
+# Output tokens of sector-wide and regulatory impacts with and without local
+# sector expansion (core/sector_index.py). For every sector and regulator in the
+# sector index, one finding is expanded to per-ticker impacts; the model would
+# otherwise have to write all of those rows itself. Compares the completion
+# tokens of the per-ticker answer with the single finding, and the time the
+# expansion takes. Needs no model.
+#
+#   python financial_news_intel/tests/benchmarks/bench_sector_expansion.py [MAX_CONSTITUENTS]
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from financial_news_intel.agents.impact_agent import CONFIDENCE_BOUNDS
+from financial_news_intel.core.config import SECTOR_INDEX_PATH
+from financial_news_intel.core.models import ImpactDirection, ImpactedStock, ImpactedStockList, ImpactType
+from financial_news_intel.core.sector_index import sector_index
+from financial_news_intel.core.token_budget import token_counter
+
+REPEATS = 1000
+
+
+def _findings():
+    with open(SECTOR_INDEX_PATH, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    for name in sector_index.constituents:
+        yield name, ImpactType.SECTOR
+    for name in config.get("regulators", {}):
+        yield name, ImpactType.REGULATORY
+
+
+def _tokens(impacts) -> int:
+    return token_counter.count(ImpactedStockList(impacts=impacts).json())
+
+
+def run_sector_expansion_benchmark():
+    if len(sys.argv) > 1:
+        sector_index.max_constituents = int(sys.argv[1])
+
+    print(f"\n--- Sector expansion (up to {sector_index.max_constituents} constituents per sector) ---")
+    print(f"{'Finding':<22}{'Type':<12}{'Rows':>6}{'Tokens per-ticker':>19}{'Tokens finding':>16}{'Saved':>8}{'Expand (us)':>13}")
+    total_rows = total_verbose = total_compact = 0
+    for name, impact_type in _findings():
+        finding = ImpactedStock(
+            company_name=name, stock_ticker="SECTOR", impact_direction=ImpactDirection.POSITIVE,
+            confidence=CONFIDENCE_BOUNDS[impact_type][1], type=impact_type,
+        )
+        rows = sector_index.expand([finding], CONFIDENCE_BOUNDS)
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            sector_index.expand([finding], CONFIDENCE_BOUNDS)
+        micros = (time.perf_counter() - start) / REPEATS * 1e6
+
+        verbose, compact = _tokens(rows), _tokens([finding])
+        total_rows += len(rows)
+        total_verbose += verbose
+        total_compact += compact
+        print(f"{name:<22}{impact_type.value:<12}{len(rows):>6}{verbose:>19}{compact:>16}{1 - compact / verbose:>8.0%}{micros:>13.1f}")
+    print(f"{'Total':<34}{total_rows:>6}{total_verbose:>19}{total_compact:>16}{1 - total_compact / total_verbose:>8.0%}")
+    print("Rows: per-ticker impacts after expansion (a market-wide regulator keeps its single finding)")
+
+
+if __name__ == "__main__":
+    run_sector_expansion_benchmark()
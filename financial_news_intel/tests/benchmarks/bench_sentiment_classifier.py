@@ -0,0 +1,46 @@
+# bench_sentiment_classifier.py
+#
+# Evaluates the local sentiment classifier (logistic regression over the story
+# embeddings) on the golden stories: leave-one-out accuracy and LLM escalation
+# rate for several confidence thresholds, plus the per-story prediction latency.
+# Needs the embedding model only, no Ollama server.
+#
+#   python financial_news_intel/tests/benchmarks/bench_sentiment_classifier.py
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from financial_news_intel.core.embedding_model import get_embeddings
+from financial_news_intel.core.sentiment_classifier import (
+    SentimentClassifier, evaluate_classifier, load_training_examples,
+)
+
+THRESHOLDS = (0.0, 0.5, 0.6, 0.7, 0.8, 0.9)
+LATENCY_ROUNDS = 1000
+
+
+def run_sentiment_classifier_benchmark():
+    texts, labels = load_training_examples("golden")
+    embeddings = get_embeddings(texts)
+
+    print("\n--- Local Sentiment Classifier Benchmark (golden stories, leave-one-out) ---")
+    print(f"{'Threshold':<12}{'Accuracy':>10}{'Escalated':>12}{'Local acc':>12}")
+    for threshold in THRESHOLDS:
+        metrics = evaluate_classifier(embeddings, labels, threshold)
+        print(
+            f"{threshold:<12.2f}{metrics['accuracy']:>10.1%}"
+            f"{metrics['escalation_rate']:>12.1%}{metrics['local_accuracy']:>12.1%}"
+        )
+
+    classifier = SentimentClassifier().fit(embeddings, labels)
+    start = time.perf_counter()
+    for i in range(LATENCY_ROUNDS):
+        classifier.predict(embeddings[i % len(embeddings)])
+    latency_ms = (time.perf_counter() - start) * 1000 / LATENCY_ROUNDS
+    print(f"\nPrediction latency: {latency_ms:.4f} ms/story (embedding reused from deduplication)")
+
+
+if __name__ == "__main__":
+    run_sentiment_classifier_benchmark()
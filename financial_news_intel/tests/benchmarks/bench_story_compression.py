@@ -0,0 +1,121 @@
+# bench_story_compression.py
+#
+# Compares DB file size and story read latency of the structured DB with and without
+# story text compression. Uses temporary SQLite files, so the real DB is not touched.
+# The keyword index (FTS5, contentless) is on, as in production; its share of the DB
+# size is reported separately (needs SQLite's dbstat table). The zstd dictionary is
+# trained on stories built from a held-out half of the sample texts, and only stories
+# built from the other half are measured, so the dictionary has not seen them.
+#
+#   python financial_news_intel/tests/benchmarks/bench_story_compression.py [num_stories]
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from financial_news_intel.core.db_service import DatabaseService
+from financial_news_intel.core.models import ConsolidatedStory, ExtractedEntity
+from financial_news_intel.core.text_codec import zstandard
+from financial_news_intel.tests.golden_data import RAW_INPUT_ARTICLES
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..')
+
+
+def _load_sample_texts():
+    """Article bodies from the bundled datasets (short RSS summaries and long articles)."""
+    texts = [a["summary"] for a in RAW_INPUT_ARTICLES]
+    for path in ("data/mock_dataset.json", "tests/unit/test_data/test_articles_batch_complex.json"):
+        with open(os.path.join(DATA_DIR, path), "r", encoding="utf-8") as f:
+            texts.extend(a["content"] for a in json.load(f) if a.get("content"))
+    return texts
+
+
+def _split_texts(seed=0):
+    """(training texts, measured texts): a seeded, disjoint split of the sample texts."""
+    texts = _load_sample_texts()
+    random.Random(seed).shuffle(texts)
+    half = len(texts) // 2
+    return texts[:half], texts[half:]
+
+
+def _build_stories(num_stories, texts):
+    stories = []
+    for i in range(num_stories):
+        # Concatenate a few articles so sizes resemble consolidated stories
+        body = " ".join(texts[(i + k) % len(texts)] for k in range(3))
+        stories.append(ConsolidatedStory(
+            text=f"[{i}] {body}",
+            entities=ExtractedEntity(),
+            published_at="2025-12-05T09:00:00Z",
+        ))
+    return stories
+
+
+def _keyword_index_kb(db):
+    """Size of the keyword index tables, or None without dbstat."""
+    try:
+        pages = db.conn.execute("SELECT SUM(pgsize) FROM dbstat WHERE name LIKE 'Stories_FTS%'").fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+    return (pages or 0) / 1024
+
+
+def _run(mode, stories, train_samples=None):
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        db = DatabaseService(db_path=db_path, text_compression=mode)
+        if train_samples:
+            # As the CLI would on an existing DB, but on stories the run does not store
+            db.text_codec.train_dictionary(train_samples, dict_size=16 * 1024)
+
+        start = time.perf_counter()
+        for story in stories:
+            db.save_story(story)
+        write_s = time.perf_counter() - start
+
+        db.conn.execute("VACUUM")
+        size_kb = os.path.getsize(db_path) / 1024
+        index_kb = _keyword_index_kb(db)
+
+        ids = [s.unique_story_id for s in stories]
+        start = time.perf_counter()
+        for story_id in ids:
+            db.fetch_full_story_details(story_id)
+        read_ms = (time.perf_counter() - start) * 1000 / len(ids)
+
+        start = time.perf_counter()
+        for story_id in ids:
+            db.fetch_full_story_details(story_id, include_text=False)
+        read_no_text_ms = (time.perf_counter() - start) * 1000 / len(ids)
+
+        db.conn.close()
+        return size_kb, index_kb, write_s, read_ms, read_no_text_ms
+    finally:
+        os.remove(db_path)
+
+
+def run_compression_benchmark(num_stories=5000):
+    train_texts, measured_texts = _split_texts()
+    stories = _build_stories(num_stories, measured_texts)
+    train_samples = [story.text for story in _build_stories(500, train_texts)]
+    modes = [("none", False), ("zlib", False)]
+    if zstandard is not None:
+        modes += [("zstd", False), ("zstd", True)]
+
+    print(f"\n--- Story Text Compression Benchmark ({num_stories} stories) ---")
+    print(f"{'Mode':<16}{'DB size (KB)':>14}{'of which index':>16}{'Write (s)':>12}{'Read (ms)':>12}{'Read w/o text (ms)':>20}")
+    for mode, trained in modes:
+        size_kb, index_kb, write_s, read_ms, read_no_text_ms = _run(mode, stories, train_samples if trained else None)
+        label = f"{mode}+dict" if trained else mode
+        index = f"{index_kb:.1f}" if index_kb is not None else "n/a"
+        print(f"{label:<16}{size_kb:>14.1f}{index:>16}{write_s:>12.2f}{read_ms:>12.4f}{read_no_text_ms:>20.4f}")
+
+
+if __name__ == "__main__":
+    run_compression_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
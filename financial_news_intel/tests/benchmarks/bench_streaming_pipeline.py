@@ -0,0 +1,171 @@
+# bench_streaming_pipeline.py
+#
+# Batch vs streaming execution of the ingestion pipeline against the fake Ollama
+# server (tests/fake_ollama.py, started in-process). Articles are cycled from the
+# golden stories (every DUPLICATE_EVERY-th one repeats the previous article);
+# fetching, embedding + duplicate check, and storage are simulated with fixed
+# per-article delays, enrichment is the real entity + impact agents.
+#   batch      - each stage over the whole batch before the next starts (the LangGraph run)
+#   streaming  - concurrent stages with bounded queues (streaming_pipeline.py)
+# Reports, per batch size: wall time, time until the first story is indexed,
+# feed-to-index latency (p50 / p95) and the most stories held in flight at once.
+# Finally checks that a dying dedup or enrichment stage aborts the streaming run
+# instead of hanging it.
+#
+#   python financial_news_intel/tests/benchmarks/bench_streaming_pipeline.py [BATCH_SIZE ...]
+import os
+import sys
+import threading
+import time
+from functools import partial
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+BATCH_SIZES = [int(arg) for arg in sys.argv[1:]] or [20, 80, 200]
+CONCURRENCY = int(os.getenv("ENRICHMENT_CONCURRENCY", 4))
+FETCH_SECONDS, DEDUP_SECONDS, STORE_SECONDS = 0.01, 0.01, 0.005
+DUPLICATE_EVERY = 5
+QUEUE_SIZE = 8
+
+# Config is read at import: set it before loading the package
+os.environ["ENRICHMENT_CONCURRENCY"] = str(CONCURRENCY)
+
+from financial_news_intel.tests.fake_ollama import start_fake_backend
+server = start_fake_backend("lognormal:0.1,0.3", seed=5, num_parallel=CONCURRENCY)
+
+from financial_news_intel.agents.enrichment_agent import enrich_stories
+from financial_news_intel.core.config import IMPACT_BATCH_SIZE
+from financial_news_intel.core.llm_cache import llm_cache
+from financial_news_intel.core.story_priority import StoryPrioritizer
+from financial_news_intel.core.models import ConsolidatedStory, RawArticle
+from financial_news_intel.streaming_pipeline import StreamingPipeline, _percentile
+from financial_news_intel.tests.golden_data import GROUND_TRUTH_MAP
+
+GOLDEN_TEXTS = [story.text for story in GROUND_TRUTH_MAP.values()]
+
+
+class SimulatedStages:
+    """Fetch, dedup and store with fixed delays; tracks feed-to-index latency and stories in flight."""
+    def __init__(self, n: int):
+        self.n = n
+        self.seen = set()
+        self.fetched_at = {}
+        self.latencies = []
+        self.first_indexed = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def _track(self, delta: int):
+        with self._lock:
+            self.in_flight += delta
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def fetch(self, _raw_news_data=None):
+        for i in range(self.n):
+            time.sleep(FETCH_SECONDS)
+            number = i - 1 if i % DUPLICATE_EVERY == DUPLICATE_EVERY - 1 else i
+            text = f"{GOLDEN_TEXTS[number % len(GOLDEN_TEXTS)]} (Feed item {number}.)"
+            article = RawArticle(id=f"a{i}", title=f"Item {number}", content=text, source_url="", timestamp=None)
+            self.fetched_at[article.id] = time.perf_counter()
+            self._track(1)
+            yield article
+
+    def dedup(self, article: RawArticle):
+        time.sleep(DEDUP_SECONDS)
+        if article.content in self.seen:
+            self._track(-1)
+            return None
+        self.seen.add(article.content)
+        return ConsolidatedStory(text=article.content, source_articles=[article])
+
+    def store(self, story: ConsolidatedStory):
+        time.sleep(STORE_SECONDS)
+        now = time.perf_counter()
+        self.latencies.append(now - self.fetched_at[story.source_articles[0].id])
+        self.first_indexed = self.first_indexed or now - self.start
+        self._track(-1)
+        return None
+
+
+def _run_batch(n: int) -> SimulatedStages:
+    stages = SimulatedStages(n)
+    articles = list(stages.fetch())
+    stories = [story for story in map(stages.dedup, articles) if story is not None]
+    for story, error in enrich_stories(stories, max_concurrency=CONCURRENCY):
+        if error is None:
+            stages.store(story)
+        else:
+            stages._track(-1)
+    return stages
+
+
+def _run_streaming(n: int) -> SimulatedStages:
+    stages = SimulatedStages(n)
+    pipeline = StreamingPipeline(
+        fetch=stages.fetch, dedup=stages.dedup, store=stages.store,
+        enrich=partial(enrich_stories, max_concurrency=1, impact_batch_size=IMPACT_BATCH_SIZE),
+        enrich_workers=CONCURRENCY, queue_size=QUEUE_SIZE,
+    )
+    stats = pipeline.run()
+    # Failed stories leave the pipeline without being stored
+    stages._track(-stats["failed"])
+    return stages
+
+
+class _FailingPrioritizer(StoryPrioritizer):
+    """Scoring blows up on the first unique story, killing the dedup stage."""
+    def sort_key(self, story, enqueued_at=None):
+        raise RuntimeError("injected scoring failure")
+
+
+def check_stage_failures(n: int = 40, timeout: float = 30.0):
+    """A stage that dies must abort the run (run() returns) rather than block the stages around it."""
+    cases = {
+        "dedup": dict(prioritizer=_FailingPrioritizer()),
+        # A malformed enrich result raises outside the per-story error handling
+        "enrich": dict(enrich=lambda stories: None),
+    }
+    print(f"\n--- Stage failure checks ({n} articles, queues of {QUEUE_SIZE}) ---")
+    for name, overrides in cases.items():
+        stages = SimulatedStages(n)
+        settings = dict(fetch=stages.fetch, dedup=stages.dedup, store=stages.store, enrich_workers=CONCURRENCY, queue_size=QUEUE_SIZE)
+        settings.update(overrides)
+        pipeline = StreamingPipeline(**settings)
+        result = {}
+        runner = threading.Thread(target=lambda: result.update(pipeline.run()), daemon=True)
+        runner.start()
+        runner.join(timeout)
+        assert not runner.is_alive(), f"streaming run hung after the {name} stage died"
+        assert result["stage_error"], f"the {name} stage failure was not reported"
+        print(f"{name:<8} stage failure: run returned ({result['stage_error']})")
+
+
+def run_streaming_pipeline_benchmark(batch_sizes):
+    # Every story must reach the (fake) model
+    llm_cache.enabled = False
+
+    rows = []
+    for n in batch_sizes:
+        for mode, run in (("batch", _run_batch), ("streaming", _run_streaming)):
+            server.reset_stats()
+            start = time.perf_counter()
+            stages = run(n)
+            rows.append((n, mode, time.perf_counter() - start, stages))
+
+    print(f"\n--- Batch vs streaming pipeline (K={CONCURRENCY}, fake Ollama latency {server.latency.spec}, queues of {QUEUE_SIZE}) ---")
+    print(f"{'Articles':<10}{'Mode':<11}{'Wall (s)':>10}{'First indexed (s)':>19}{'p50 (s)':>9}{'p95 (s)':>9}{'Peak in flight':>16}")
+    for n, mode, wall, stages in rows:
+        print(
+            f"{n:<10}{mode:<11}{wall:>10.2f}{stages.first_indexed or 0.0:>19.2f}"
+            f"{_percentile(stages.latencies, 0.5):>9.2f}{_percentile(stages.latencies, 0.95):>9.2f}{stages.peak_in_flight:>16}"
+        )
+    print(f"Simulated per article: fetch {FETCH_SECONDS}s, embed + duplicate check {DEDUP_SECONDS}s, store {STORE_SECONDS}s; "
+          f"latency is feed-to-index time per stored story")
+    server.stop()
+    check_stage_failures()
+
+
+if __name__ == "__main__":
+    run_streaming_pipeline_benchmark(BATCH_SIZES)
@@ -0,0 +1,90 @@
+# bench_structured_output.py
+#
+# Structured output handling under sloppy and broken model answers, against the
+# fake Ollama server (tests/fake_ollama.py, started in-process). For each fault
+# mix the golden stories are enriched three ways:
+#   strict        - parse as returned, no repair, no retry (a bad answer loses the story's result)
+#   repair        - local repair (code fences, trailing text, enum case, % confidences)
+#   repair+retry  - local repair, then up to STRUCTURED_OUTPUT_MAX_RETRIES re-asks
+# Reports wall time, stories that failed, the share of answers not usable as
+# returned (parse-failure rate), answers repaired locally, retries per story and
+# answers that stayed unusable.
+#
+#   python financial_news_intel/tests/benchmarks/bench_structured_output.py [K]
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+CONCURRENCY = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+
+# Config is read at import: set it before loading the package
+os.environ["ENRICHMENT_CONCURRENCY"] = str(CONCURRENCY)
+
+from financial_news_intel.tests.fake_ollama import start_fake_backend
+server = start_fake_backend("lognormal:0.05,0.2", seed=3, num_parallel=CONCURRENCY)
+
+from financial_news_intel.agents.enrichment_agent import enrich_stories
+from financial_news_intel.core.config import STRUCTURED_OUTPUT_MAX_RETRIES
+from financial_news_intel.core.llm_cache import llm_cache
+from financial_news_intel.core.models import ConsolidatedStory
+from financial_news_intel.core.structured_output import structured_output
+from financial_news_intel.tests.golden_data import GROUND_TRUTH_MAP
+
+FAULTS = [
+    ("clean", {"sloppy_rate": 0.0, "malformed_rate": 0.0}),
+    ("30% sloppy", {"sloppy_rate": 0.3, "malformed_rate": 0.0}),
+    ("20% truncated", {"sloppy_rate": 0.0, "malformed_rate": 0.2}),
+    ("both", {"sloppy_rate": 0.3, "malformed_rate": 0.2}),
+]
+MODES = [
+    ("strict", False, 0),
+    ("repair", True, 0),
+    ("repair+retry", True, max(1, STRUCTURED_OUTPUT_MAX_RETRIES)),
+]
+
+
+def _run(faults, repair: bool, max_retries: int):
+    server.configure(**faults)
+    server.reset_stats()
+    structured_output.repair, structured_output.max_retries = repair, max_retries
+    structured_output.reset()
+    stories = [ConsolidatedStory(text=story.text) for story in GROUND_TRUTH_MAP.values()]
+
+    start = time.perf_counter()
+    results = enrich_stories(stories, max_concurrency=CONCURRENCY)
+    wall = time.perf_counter() - start
+
+    failed = sum(1 for _, error in results if error is not None)
+    answers = structured_output.total("calls") + structured_output.total("retries")
+    invalid = structured_output.total("repaired") + structured_output.total("parse_failures")
+    return {
+        "wall": wall,
+        "failed": failed,
+        "invalid_rate": invalid / answers if answers else 0.0,
+        "repaired": structured_output.total("repaired"),
+        "retries_per_story": structured_output.total("retries") / len(stories),
+        "unusable": structured_output.total("failed"),
+    }
+
+
+def run_structured_output_benchmark():
+    # Every story must reach the (fake) model
+    llm_cache.enabled = False
+
+    print(f"\n--- Structured output: repair and bounded retries (K={CONCURRENCY}, {len(GROUND_TRUTH_MAP)} golden stories) ---")
+    print(f"{'Faults':<15}{'Mode':<14}{'Wall (s)':>10}{'Failed':>8}{'Parse fail':>12}{'Repaired':>10}{'Retries/story':>15}{'Unusable':>10}")
+    for label, faults in FAULTS:
+        for mode, repair, max_retries in MODES:
+            r = _run(faults, repair, max_retries)
+            print(
+                f"{label:<15}{mode:<14}{r['wall']:>10.2f}{r['failed']:>8}{r['invalid_rate']:>12.1%}"
+                f"{r['repaired']:>10}{r['retries_per_story']:>15.2f}{r['unusable']:>10}"
+            )
+    print("Parse fail: share of model answers not usable as returned; Unusable: answers given up on after repair and retries")
+    server.stop()
+
+
+if __name__ == "__main__":
+    run_structured_output_benchmark()
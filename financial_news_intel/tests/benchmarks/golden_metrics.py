@@ -0,0 +1,30 @@
+# golden_metrics.py
+#
+# Shared accuracy helpers for the benchmark scripts that score agent output
+# against tests/golden_data.py.
+from typing import Iterable, Optional
+
+
+def normalize_sentiment(label: Optional[str]) -> str:
+    """Maps 'Positive'/'POSITIVE'/ImpactDirection.POSITIVE etc. onto one upper-case label."""
+    if label is None:
+        return ""
+    value = getattr(label, "value", label)
+    return str(value).strip().strip("'\".").upper()
+
+
+def sentiment_matches(actual: Optional[str], expected: Optional[str]) -> bool:
+    return normalize_sentiment(actual) == normalize_sentiment(expected)
+
+
+def entity_f1(actual: Iterable[str], expected: Iterable[str]) -> float:
+    """Case-insensitive F1 between two entity name collections."""
+    actual_set = {a.lower().strip() for a in actual if a}
+    expected_set = {e.lower().strip() for e in expected if e}
+    if not actual_set or not expected_set:
+        return 1.0 if actual_set == expected_set else 0.0
+
+    intersection = len(actual_set & expected_set)
+    precision = intersection / len(actual_set)
+    recall = intersection / len(expected_set)
+    return 2 * precision * recall / (precision + recall) if precision + recall else 0.0
@@ -0,0 +1,488 @@
+# fake_ollama.py
+#
+# Local stand-in for the Ollama server, for benchmarking and load-testing the
+# pipeline without a real model. Speaks the /api/chat protocol used by
+# langchain-ollama (streamed NDJSON or a single JSON reply, `format` JSON mode /
+# JSON schema, tool calls) and answers with fixtures built from
+# tests/golden_data.py. Unknown stories get a deterministic answer derived from
+# the ticker resolver. Latency distribution, concurrency limit (like
+# OLLAMA_NUM_PARALLEL / OLLAMA_MAX_QUEUE) and failure injection are configurable,
+# and can be changed at runtime via POST /fake/config.
+#
+#   python -m financial_news_intel.tests.fake_ollama --port 11435 --latency lognormal:0.8,0.4 --num-parallel 4
+#   OLLAMA_BASE_URL=http://localhost:11435 python financial_news_intel/tests/benchmarks/bench_enrichment_concurrency.py 1 2 4
+#
+# Endpoints besides the Ollama API: GET /fake/stats, POST /fake/reset, POST /fake/config.
+# Benchmarks start it in-process with start_fake_backend(), before importing the package.
+import argparse
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+_STORY_BLOCK = re.compile(r"=== STORY ID: (\S+) ===\n(.*?)(?=\n\n=== STORY ID: |\Z)", re.S)
+_WORDS = re.compile(r"[a-z0-9]+")
+
+
+class LatencyModel:
+    """
+    Simulated model time per request: a base distribution plus optional prompt-processing and
+    generation rates (tokens/s). Spec strings: 'fixed:S', 'uniform:A,B', 'normal:MU,SIGMA',
+    'lognormal:MEDIAN,SIGMA' (seconds).
+    """
+    def __init__(self, spec: str = "fixed:0", prompt_tps: float = 0.0, gen_tps: float = 0.0, seed: int = 0):
+        kind, _, params = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.params = [float(p) for p in params.split(",") if p.strip()]
+        if self.kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution '{spec}'")
+        self.spec = spec
+        self.prompt_tps = prompt_tps
+        self.gen_tps = gen_tps
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self, prompt_tokens: int = 0, output_tokens: int = 0) -> float:
+        with self._lock:
+            if self.kind == "fixed":
+                base = self.params[0] if self.params else 0.0
+            elif self.kind == "uniform":
+                base = self._rng.uniform(self.params[0], self.params[1])
+            elif self.kind == "normal":
+                base = self._rng.gauss(self.params[0], self.params[1])
+            else:
+                base = self.params[0] * math.exp(self._rng.gauss(0.0, self.params[1]))
+        base = max(0.0, base)
+        if self.prompt_tps > 0:
+            base += prompt_tokens / self.prompt_tps
+        if self.gen_tps > 0:
+            base += output_tokens / self.gen_tps
+        return base
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_WORDS.findall(text.lower()))
+
+
+def _sentiment_label(value) -> str:
+    label = str(getattr(value, "value", value) or "").capitalize()
+    return label if label in ("Positive", "Negative", "Neutral") else "Neutral"
+
+
+def _sloppy(content: str) -> str:
+    """
+    A JSON reply the way small models break it without constrained decoding: wrapped in a code
+    fence with chatter after it, enum values in the wrong case, confidences as percentages.
+    """
+    def mangle(node):
+        if isinstance(node, list):
+            return [mangle(item) for item in node]
+        if not isinstance(node, dict):
+            return node
+        node = {key: mangle(value) for key, value in node.items()}
+        if isinstance(node.get("impact_direction"), str):
+            node["impact_direction"] = node["impact_direction"].lower()
+        if isinstance(node.get("type"), str):
+            node["type"] = node["type"].upper()
+        if isinstance(node.get("confidence"), (int, float)):
+            node["confidence"] = f"{node['confidence'] * 100:.0f}%"
+        if isinstance(node.get("sentiment"), str):
+            node["sentiment"] = node["sentiment"].upper()
+        return node
+
+    return f"```json\n{json.dumps(mangle(json.loads(content)), indent=2)}\n```\nLet me know if you need anything else."
+
+
+class FixtureResponder:
+    """Builds the reply content (or tool calls) for a chat request from the golden fixtures."""
+    def __init__(self, stories=None):
+        # Imported here: loading the package reads the config, which start_fake_backend sets up first
+        from financial_news_intel.core.ticker_resolver import ticker_resolver
+        from financial_news_intel.tests.golden_data import GROUND_TRUTH_MAP
+
+        self.resolver = ticker_resolver
+        stories = GROUND_TRUTH_MAP if stories is None else stories
+        self.stories = [(_normalize(story.text)[:120], story) for story in stories.values()]
+
+    # --- Story fixtures ---
+
+    def find_story(self, text: str):
+        normalized = _normalize(text)
+        for key, story in self.stories:
+            if key and key in normalized:
+                return story
+        return None
+
+    def entities(self, text: str) -> Dict[str, List[str]]:
+        story = self.find_story(text)
+        if story is not None:
+            return story.entities.dict()
+        companies = [match.official_name for match in self.resolver.find_in_text(text)]
+        return {"companies": companies, "sectors": [], "regulators": [], "people": [], "events": []}
+
+    def sentiment(self, text: str) -> str:
+        story = self.find_story(text)
+        return _sentiment_label(story.sentiment) if story is not None else "Neutral"
+
+    def impacts(self, text: str) -> List[Dict[str, Any]]:
+        story = self.find_story(text)
+        if story is not None:
+            return [json.loads(impact.json()) for impact in story.impacted_stocks]
+        return [
+            {"company_name": match.official_name, "stock_ticker": match.stock_ticker,
+             "impact_direction": "NEUTRAL", "confidence": 1.0, "type": "direct"}
+            for match in self.resolver.find_in_text(text)
+        ]
+
+    # --- Request dispatch ---
+
+    def respond(self, request: Dict[str, Any]) -> Tuple[str, List[Dict[str, Any]]]:
+        """Returns (content, tool_calls) for an /api/chat request."""
+        messages = request.get("messages") or []
+        system = " ".join(m.get("content") or "" for m in messages if m.get("role") == "system")
+        text = "\n".join(m.get("content") or "" for m in messages if m.get("role") in ("system", "user"))
+        schema = request.get("format") if isinstance(request.get("format"), dict) else None
+        properties = set((schema or {}).get("properties", {}))
+
+        tools = request.get("tools") or []
+        if tools and not any(m.get("role") == "tool" for m in messages):
+            return "", self._tool_calls(tools, text)
+        if tools and not schema and '"impacts"' in text:
+            # Final answer of a tool-calling loop, in the JSON the prompt asks for
+            return json.dumps({"impacts": self.impacts(text)}), []
+
+        if "results" in properties:
+            results = [
+                {"story_id": story_id, "impacts": self.impacts(block)}
+                for story_id, block in _STORY_BLOCK.findall(system)
+            ]
+            return json.dumps({"results": results}), []
+        if "impacts" in properties:
+            return json.dumps({"impacts": self.impacts(text)}), []
+        if "search_query" in properties:
+            question = next((m.get("content") for m in reversed(messages) if m.get("role") == "user"), "")
+            return json.dumps({"companies_or_tickers": [], "sectors": [], "impact_direction": None, "search_query": question}), []
+        if '"companies"' in text:
+            payload = self.entities(text)
+            if "sentiment" in system.lower():
+                payload["sentiment"] = self.sentiment(text)
+            return json.dumps(payload), []
+        if "sentiment label" in system.lower():
+            return self.sentiment(text), []
+        return ("{}" if request.get("format") else "OK"), []
+
+    def _tool_calls(self, tools: List[Dict[str, Any]], text: str) -> List[Dict[str, Any]]:
+        function = tools[0].get("function", {})
+        parameters = list(function.get("parameters", {}).get("properties", {}))
+        argument = parameters[0] if parameters else "company_names"
+        companies = self.entities(text)["companies"]
+        if argument.endswith("names"):
+            return [{"function": {"name": function.get("name"), "arguments": {argument: companies}}}]
+        return [{"function": {"name": function.get("name"), "arguments": {argument: name}}} for name in companies]
+
+
+class FakeOllamaServer:
+    """
+    Threaded HTTP server implementing the parts of the Ollama API the pipeline uses.
+    At most num_parallel requests are "on the model" at a time; up to max_queue more wait
+    (0 = unbounded), beyond that requests are rejected with 503 like Ollama does.
+    model_profiles overrides latency and fault rates per requested model name (e.g. a fast but
+    sloppy small model next to a slow, reliable large one).
+    """
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 11435,
+        latency: Optional[LatencyModel] = None,
+        num_parallel: int = 1,
+        max_queue: int = 0,
+        error_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        sloppy_rate: float = 0.0,
+        hang_rate: float = 0.0,
+        hang_seconds: float = 60.0,
+        seed: int = 0,
+        model_profiles: Optional[Dict[str, Dict[str, Any]]] = None,
+    ):
+        self.responder = FixtureResponder()
+        self.latency = latency or LatencyModel()
+        self.max_queue = max_queue
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.sloppy_rate = sloppy_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.model_profiles: Dict[str, Dict[str, Any]] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._set_parallel(num_parallel)
+        self.reset_stats()
+        self._set_profiles(model_profiles or {}, seed)
+
+        handler = type("FakeOllamaHandler", (_Handler,), {"server_state": self})
+        self._httpd = ThreadingHTTPServer((host, port), handler)
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _set_parallel(self, num_parallel: int):
+        self.num_parallel = max(1, num_parallel)
+        self._slots = threading.BoundedSemaphore(self.num_parallel)
+
+    def _set_profiles(self, profiles: Dict[str, Dict[str, Any]], seed: int = 0):
+        """{model name: {"latency": spec or LatencyModel, "error_rate": .., "malformed_rate": .., "sloppy_rate": ..}}"""
+        self.model_profiles = {}
+        for model, profile in profiles.items():
+            profile = dict(profile)
+            if isinstance(profile.get("latency"), str):
+                profile["latency"] = LatencyModel(profile["latency"], seed=seed)
+            self.model_profiles[model] = profile
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {
+                "requests": 0, "completed": 0, "errors": 0, "malformed": 0, "sloppy": 0, "hangs": 0, "rejected": 0,
+                "in_flight": 0, "max_in_flight": 0, "waiting": 0, "max_waiting": 0,
+                "model_seconds": 0.0, "queue_seconds": 0.0, "prompt_tokens": 0, "output_tokens": 0,
+            }
+            self.requests_by_model: Dict[str, int] = {}
+
+    def configure(self, **settings):
+        """Runtime changes (e.g. make the backend slow or failing mid-benchmark)."""
+        if "latency" in settings:
+            self.latency = LatencyModel(
+                settings["latency"], settings.get("prompt_tps", self.latency.prompt_tps),
+                settings.get("gen_tps", self.latency.gen_tps),
+            )
+        if "num_parallel" in settings:
+            self._set_parallel(int(settings["num_parallel"]))
+        for name in ("max_queue", "error_rate", "malformed_rate", "sloppy_rate", "hang_rate", "hang_seconds"):
+            if name in settings:
+                setattr(self, name, type(getattr(self, name))(settings[name]))
+        if "models" in settings:
+            self._set_profiles(settings["models"] or {})
+
+    def _count(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                self.stats[name] += delta
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+            self.stats["max_waiting"] = max(self.stats["max_waiting"], self.stats["waiting"])
+
+    def _roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < rate
+
+    # --- Chat ---
+
+    def chat(self, request: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """Returns (HTTP status, final response body) after the simulated model time."""
+        self._count(requests=1)
+        with self._lock:
+            if self.max_queue and self.stats["waiting"] >= self.max_queue:
+                self.stats["rejected"] += 1
+                return 503, {"error": "server busy, please try again.  maximum pending requests exceeded"}
+            self.stats["waiting"] += 1
+            self.stats["max_waiting"] = max(self.stats["max_waiting"], self.stats["waiting"])
+
+        queued_at = time.perf_counter()
+        slots = self._slots
+        with slots:
+            self._count(waiting=-1, in_flight=1, queue_seconds=time.perf_counter() - queued_at)
+            try:
+                return self._generate(request)
+            finally:
+                self._count(in_flight=-1)
+
+    def _generate(self, request: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        model = request.get("model", "fake")
+        profile = self.model_profiles.get(model, {})
+        with self._lock:
+            self.requests_by_model[model] = self.requests_by_model.get(model, 0) + 1
+        content, tool_calls = self.responder.respond(request)
+        prompt_tokens = math.ceil(sum(len(m.get("content") or "") for m in request.get("messages") or []) / 4)
+        output_tokens = max(1, math.ceil((len(content) + len(json.dumps(tool_calls)) * bool(tool_calls)) / 4))
+
+        if self._roll(self.hang_rate):
+            self._count(hangs=1)
+            time.sleep(self.hang_seconds)
+        seconds = profile.get("latency", self.latency).sample(prompt_tokens, output_tokens)
+        time.sleep(seconds)
+        self._count(model_seconds=seconds)
+
+        if self._roll(profile.get("error_rate", self.error_rate)):
+            self._count(errors=1)
+            return 500, {"error": "fake-ollama: injected model failure"}
+        if self._roll(profile.get("malformed_rate", self.malformed_rate)) and content:
+            self._count(malformed=1)
+            content = content[: max(1, len(content) // 2)]
+        elif self._roll(profile.get("sloppy_rate", self.sloppy_rate)) and content.startswith("{"):
+            self._count(sloppy=1)
+            content = _sloppy(content)
+
+        self._count(completed=1, prompt_tokens=prompt_tokens, output_tokens=output_tokens)
+        message = {"role": "assistant", "content": content}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        nanos = int(seconds * 1e9)
+        return 200, {
+            "model": request.get("model", "fake"),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "message": message,
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": nanos, "load_duration": 0,
+            "prompt_eval_count": prompt_tokens, "prompt_eval_duration": nanos // 2,
+            "eval_count": output_tokens, "eval_duration": nanos - nanos // 2,
+        }
+
+    # --- Lifecycle ---
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, like Ollama
+    server_state: FakeOllamaServer = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (request timeout) while the model was "generating"
+            self.close_connection = True
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        self._send(status, json.dumps(payload).encode("utf-8"))
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_HEAD(self):
+        self._send(200, b"", "text/plain")
+
+    def do_GET(self):
+        state = self.server_state
+        if self.path == "/":
+            self._send(200, b"Ollama is running", "text/plain")
+        elif self.path == "/api/version":
+            self._send_json(200, {"version": "0.0.0-fake"})
+        elif self.path == "/api/tags":
+            self._send_json(200, {"models": [{"name": "fake", "model": "fake"}]})
+        elif self.path == "/fake/stats":
+            with state._lock:
+                stats = dict(state.stats, requests_by_model=dict(state.requests_by_model))
+            stats.update(num_parallel=state.num_parallel, latency=state.latency.spec)
+            self._send_json(200, stats)
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        state = self.server_state
+        request = self._read_json()
+        if self.path == "/api/chat":
+            status, body = state.chat(request)
+            if status != 200 or request.get("stream") is False:
+                self._send_json(status, body)
+                return
+            # Streamed reply (NDJSON): the content chunk, then the final 'done' record
+            chunk = {"model": body["model"], "created_at": body["created_at"], "message": body["message"], "done": False}
+            final = dict(body, message={"role": "assistant", "content": ""})
+            lines = json.dumps(chunk) + "\n" + json.dumps(final) + "\n"
+            self._send(200, lines.encode("utf-8"), "application/x-ndjson")
+        elif self.path == "/api/show":
+            self._send_json(200, {"modelfile": "", "parameters": "", "template": "", "capabilities": ["completion", "tools"]})
+        elif self.path == "/fake/reset":
+            state.reset_stats()
+            self._send_json(200, {"status": "reset"})
+        elif self.path == "/fake/config":
+            try:
+                state.configure(**request)
+            except (TypeError, ValueError) as e:
+                self._send_json(400, {"error": str(e)})
+                return
+            self._send_json(200, {"status": "configured"})
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+
+
+def start_fake_backend(default_latency: str = "fixed:0", seed: int = 0, **settings) -> FakeOllamaServer:
+    """
+    Starts an in-process fake Ollama server for a benchmark script, on FAKE_OLLAMA_PORT
+    (default 11435) with FAKE_OLLAMA_LATENCY (default default_latency); settings go to
+    FakeOllamaServer. Call it before importing any other package module: the config is read at
+    import, so OLLAMA_BASE_URL is pointed at the fake server first. Benchmark stories must not
+    be checkpointed to (or resumed from) the story ledger, so the ledger is disabled.
+    """
+    port = int(os.getenv("FAKE_OLLAMA_PORT", 11435))
+    os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{port}"
+    from financial_news_intel.core.story_ledger import story_ledger
+
+    story_ledger.enabled = False
+    latency = LatencyModel(os.getenv("FAKE_OLLAMA_LATENCY", default_latency), seed=seed)
+    return FakeOllamaServer(port=port, latency=latency, seed=seed, **settings).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Ollama server answering from the golden fixtures.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", default="fixed:0", help="fixed:S | uniform:A,B | normal:MU,SIGMA | lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--prompt-tps", type=float, default=0.0, help="Simulated prompt processing speed (tokens/s, 0 = free).")
+    parser.add_argument("--gen-tps", type=float, default=0.0, help="Simulated generation speed (tokens/s, 0 = free).")
+    parser.add_argument("--num-parallel", type=int, default=1, help="Requests processed at once (OLLAMA_NUM_PARALLEL).")
+    parser.add_argument("--max-queue", type=int, default=0, help="Waiting requests before 503 (OLLAMA_MAX_QUEUE, 0 = unbounded).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with HTTP 500.")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Share of replies with truncated (invalid) JSON.")
+    parser.add_argument("--sloppy-rate", type=float, default=0.0, help="Share of JSON replies that need local repair (code fence, trailing text, enum case, percent confidence).")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Share of requests that stall for --hang-seconds.")
+    parser.add_argument("--hang-seconds", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeOllamaServer(
+        host=args.host, port=args.port,
+        latency=LatencyModel(args.latency, args.prompt_tps, args.gen_tps, seed=args.seed),
+        num_parallel=args.num_parallel, max_queue=args.max_queue,
+        error_rate=args.error_rate, malformed_rate=args.malformed_rate, sloppy_rate=args.sloppy_rate,
+        hang_rate=args.hang_rate, hang_seconds=args.hang_seconds, seed=args.seed,
+    )
+    print(f"Fake Ollama listening on {server.url} (latency {args.latency}, num_parallel {args.num_parallel})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()